@@ -1,3 +1,14 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import DetectionRun
+
+
+@admin.register(DetectionRun)
+class DetectionRunAdmin(admin.ModelAdmin):
+    list_display = ('id', 'technique', 'data_bits', 'error_detected', 'step_count', 'created_at')
+    list_filter = ('technique', 'error_detected')
+    search_fields = ('input_hash',)
+    # The payload is binary; it is served decoded by the run detail endpoint
+    exclude = ('payload',)
+    readonly_fields = ('input_hash', 'technique', 'params', 'data_bits', 'error_detected', 'step_count',
+                       'summary', 'compressed', 'created_at')
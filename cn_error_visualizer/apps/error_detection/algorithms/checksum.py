@@ -1,144 +1,194 @@
 from ..services.step_tracker import StepTracker
+from ..services.bit_vector import BitVector
+from ..services.bit_utils import codeword_block_size, default_block_size
 
 def full_adder(a, b, tracker=None, step_desc="Addition"):
-    # Adds two equal length binary strings
-    # Returns (result_string, carry_out_bit)
-    n = len(a)
-    result = []
-    carry = 0
-    
-    # Iterate from LSB (right) to MSB (left)
-    for i in range(n - 1, -1, -1):
-        bit_a = 1 if a[i] == '1' else 0
-        bit_b = 1 if b[i] == '1' else 0
-        total = bit_a + bit_b + carry
-        
-        if total == 0:
-            res_bit = '0'; carry = 0
-        elif total == 1:
-            res_bit = '1'; carry = 0
-        elif total == 2:
-            res_bit = '0'; carry = 1
-        elif total == 3:
-            res_bit = '1'; carry = 1
-        else: # Should not happen
-            res_bit = '0'; carry = 0
-            
-        result.append(res_bit)
-        
-    final_res = "".join(reversed(result))
-    return final_res, carry
+    # Adds two equal length bit sequences (BitVectors or binary strings)
+    # Returns (result, carry_out_bit) with result in the type of `a`
+    a_bits = BitVector.coerce(a)
+    b_bits = BitVector.coerce(b)
+    n = len(a_bits)
+
+    total = a_bits.value + b_bits.value
+    result = BitVector(total & a_bits.mask, n)
+    carry = total >> n
+
+    return (result if isinstance(a, BitVector) else str(result)), carry
 
 def ones_complement(bits):
-    return "".join(['1' if b == '0' else '0' for b in bits])
+    if isinstance(bits, BitVector):
+        return ~bits
+    return str(~BitVector.from_string(bits))
+
+def run_checksum(data, introduce_error=False, tracker=None, block_size=None):
+    """
+    block_size: width of the summed words in bits. Defaults to 4 for inputs of
+    up to 16 bits and 8 otherwise; 16 gives the RFC 1071 Internet checksum word
+    size, 32 its 32-bit variant.
+    """
+    if tracker is None:
+        tracker = StepTracker()
+    bits = BitVector.coerce(data)
+    data = str(bits)
+    if tracker.enabled:
+        tracker.add_step("Start Checksum", f"Input Data: {data}")
 
-def run_checksum(data, introduce_error=False):
-    tracker = StepTracker()
-    tracker.add_step("Start Checksum", f"Input Data: {data}")
-    
     # Block size
-    n = len(data)
-    block_size = 8
-    if n <= 16:
-        block_size = 4
-    
+    n = len(bits)
+    if block_size is None:
+        block_size = default_block_size(n)
+    one = BitVector(1, block_size)
+
     # Padding
     rem = n % block_size
-    processed_data = data
+    processed = bits
     if rem != 0:
         padding = block_size - rem
-        processed_data = ('0' * padding) + data # Pad LEFT for number value consistency? 
-        # Or right? Standard is usually pad to fit borders.
-        # Let's pad LEFT (Leading zeros don't change value, but make blocks align).
-        tracker.add_step("Padding", f"Padded with {padding} zeros at start. Data: {processed_data}")
-        
-    blocks = [processed_data[i:i+block_size] for i in range(0, len(processed_data), block_size)]
-    tracker.add_step("Blocking", f"Blocks: {blocks}")
-    
+        # Pad LEFT (Leading zeros don't change value, but make blocks align).
+        processed = bits.pad_left(padding)
+        if tracker.enabled:
+            tracker.add_step("Padding", f"Padded with {padding} zeros at start. Data: {processed}")
+
+    # Blocks are only materialized for the trace; the sums below work on the packed value.
+    if tracker.enabled:
+        blocks = processed.blocks(block_size)
+        block_strings = [str(block) for block in blocks]
+        tracker.add_step("Blocking", f"Blocks: {block_strings}")
+
     # --- Sender Calculation ---
-    current_sum = blocks[0]
-    
-    tracker.add_step("Sender: Summation", f"Initial Sum = Block 0: {current_sum}", 
-                     state={"blocks": blocks, "current_sum": current_sum, "action": "init"})
-    
-    for i in range(1, len(blocks)):
-        next_block = blocks[i]
-        temp_sum, carry = full_adder(current_sum, next_block)
-        tracker.add_step(f"Sender: Add Block {i}", f"{current_sum} + {next_block} = {temp_sum}, Carry: {carry}",
-                         state={"operand1": current_sum, "operand2": next_block, "result": temp_sum, "carry": carry, "action": "add"})
-        
-        while carry:
-            # Wrap around carry
-            # Add carry (which is 1) to sum
-            carry_adder_input = '1'.zfill(block_size)
-            s2, c2 = full_adder(temp_sum, carry_adder_input)
-            tracker.add_step("Sender: Wrap Carry", f"Wrapped carry: {temp_sum} + 1 = {s2}, New Carry: {c2}",
-                             state={"operand1": temp_sum, "carry_added": 1, "result": s2, "new_carry": c2, "action": "wrap"})
-            temp_sum = s2
-            carry = c2
-        
-        current_sum = temp_sum
-        
-    checksum = ones_complement(current_sum)
-    tracker.add_step("Sender: Complement", f"Sum: {current_sum} -> Checksum (1s Comp): {checksum}",
-                     state={"sum": current_sum, "checksum": checksum, "action": "complement"})
-    
-    transmitted_data = processed_data + checksum # Appended at end
-    tracker.add_step("Sender: Finalize", f"Sent: {transmitted_data}")
-    
+    if tracker.verbose:
+        current_sum = blocks[0]
+
+        tracker.add_step("Sender: Summation", f"Initial Sum = Block 0: {current_sum}",
+                         state={"blocks": block_strings, "current_sum": str(current_sum), "action": "init"})
+
+        start = 1
+        resumed = tracker.resume("checksum:sum")
+        if resumed:
+            start, current_sum = resumed["index"], BitVector(resumed["sum"], block_size)
+
+        for i in range(start, len(blocks)):
+            if tracker.checkpoint_due():
+                tracker.checkpoint("checksum:sum", {"index": i, "sum": current_sum.value})
+            next_block = blocks[i]
+            temp_sum, carry = full_adder(current_sum, next_block)
+            if tracker.wants_step():
+                tracker.add_step(f"Sender: Add Block {i}", f"{current_sum} + {next_block} = {temp_sum}, Carry: {carry}",
+                                 state={"operand1": str(current_sum), "operand2": str(next_block), "result": str(temp_sum), "carry": carry, "action": "add"})
+
+            while carry:
+                # Wrap around carry
+                # Add carry (which is 1) to sum
+                s2, c2 = full_adder(temp_sum, one)
+                if tracker.wants_step():
+                    tracker.add_step("Sender: Wrap Carry", f"Wrapped carry: {temp_sum} + 1 = {s2}, New Carry: {c2}",
+                                     state={"operand1": str(temp_sum), "carry_added": 1, "result": str(s2), "new_carry": c2, "action": "wrap"})
+                temp_sum = s2
+                carry = c2
+
+            current_sum = temp_sum
+    else:
+        # Fast path: the one's complement sum of all blocks in one modular reduction
+        if tracker.enabled:
+            tracker.add_step("Sender: Summation", f"Initial Sum = Block 0: {blocks[0]}",
+                             state={"blocks": block_strings, "current_sum": str(blocks[0]), "action": "init"})
+        current_sum = BitVector(processed.ones_complement_sum(block_size), block_size)
+
+    checksum = ~current_sum
+    if tracker.enabled:
+        tracker.add_step("Sender: Complement", f"Sum: {current_sum} -> Checksum (1s Comp): {checksum}",
+                         state={"sum": str(current_sum), "checksum": str(checksum), "action": "complement"})
+
+    transmitted = processed + checksum # Appended at end
+    transmitted_data = str(transmitted)
+    if tracker.enabled:
+        tracker.add_step("Sender: Finalize", f"Sent: {transmitted_data}")
+
     # --- Channel ---
-    received_data = transmitted_data
+    received = transmitted
     if introduce_error:
         # Flip bit in data part
         pos = 0
-        flipped = '1' if received_data[pos] == '0' else '0'
-        received_data = flipped + received_data[1:]
-        tracker.add_step("Channel: Error Injection", f"Bit {pos} flipped. {transmitted_data} -> {received_data}")
-        
+        received = transmitted.flip(pos)
+        if tracker.enabled:
+            tracker.add_step("Channel: Error Injection", f"Bit {pos} flipped. {transmitted_data} -> {received}")
+    received_data = str(received)
+
     # --- Receiver ---
+    error_detected, explanation, _ = check_checksum(received, block_size, tracker)
+
+    return {
+        "original_data": data,
+        "transmitted_data": transmitted_data,
+        "received_data": received_data,
+        "error_detected": error_detected,
+        "steps": tracker.get_steps(),
+        "explanation": explanation
+    }
+
+def check_checksum(received, block_size, tracker):
+    """
+    Receiver side of the checksum: data blocks plus checksum must sum to all 1s.
+    Returns (error_detected, explanation, syndrome); the syndrome is the
+    complement of that sum, all 0s for a valid codeword.
+    """
+    one = BitVector(1, block_size)
     # Separate data and checksum
     # Last 'block_size' bits are checksum
-    rec_checksum = received_data[-block_size:]
-    rec_data = received_data[:-block_size]
-    
-    rec_blocks = [rec_data[i:i+block_size] for i in range(0, len(rec_data), block_size)]
-    # Add all received data blocks
-    
-    tracker.add_step("Receiver: Parsing", f"Data Blocks: {rec_blocks}. Received Checksum: {rec_checksum}")
-    
-    curr_rec_sum = rec_blocks[0]
-    for i in range(1, len(rec_blocks)):
-        nb = rec_blocks[i]
-        ts, c = full_adder(curr_rec_sum, nb)
-        while c:
-            ts, c = full_adder(ts, '1'.zfill(block_size))
-        curr_rec_sum = ts
-        
-    tracker.add_step("Receiver: Data Sum", f"Sum of data segments: {curr_rec_sum}")
-    
+    rec_checksum = received[-block_size:]
+    rec_data = received[:-block_size]
+
+    if tracker.enabled:
+        rec_blocks = rec_data.blocks(block_size)
+        tracker.add_step("Receiver: Parsing", f"Data Blocks: {[str(block) for block in rec_blocks]}. Received Checksum: {rec_checksum}")
+
+    # Add all received data blocks (same modular reduction as the sender)
+    curr_rec_sum = BitVector(rec_data.ones_complement_sum(block_size), block_size)
+
+    if tracker.enabled:
+        tracker.add_step("Receiver: Data Sum", f"Sum of data segments: {curr_rec_sum}")
+
     # Add received checksum to this sum
     final_sum, final_carry = full_adder(curr_rec_sum, rec_checksum)
-    tracker.add_step("Receiver: Add Checksum", f"{curr_rec_sum} + {rec_checksum} = {final_sum}, Carry: {final_carry}")
-    
+    if tracker.enabled:
+        tracker.add_step("Receiver: Add Checksum", f"{curr_rec_sum} + {rec_checksum} = {final_sum}, Carry: {final_carry}")
+
     while final_carry:
-        final_sum, final_carry = full_adder(final_sum, '1'.zfill(block_size))
-        tracker.add_step("Receiver: Wrap Carry", f"Wrapped: {final_sum}")
-        
+        final_sum, final_carry = full_adder(final_sum, one)
+        if tracker.enabled:
+            tracker.add_step("Receiver: Wrap Carry", f"Wrapped: {final_sum}")
+
     # Result should be all 1s
-    is_valid = all(b == '1' for b in final_sum)
-    
+    is_valid = final_sum.value == final_sum.mask
+
     # Complement of result should be 0
-    final_result_comp = ones_complement(final_sum)
-    
-    tracker.add_step("Receiver: Final Check", f"Sum is {final_sum}. Complement is {final_result_comp}. All 0s expected.")
-    
-    error_detected = not is_valid
-    
+    final_result_comp = ~final_sum
+
+    if tracker.enabled:
+        tracker.add_step("Receiver: Final Check", f"Sum is {final_sum}. Complement is {final_result_comp}. All 0s expected.")
+
+    explanation = "Valid (All 1s in sum)" if is_valid else "Error Detected (Sum not all 1s)"
+    return not is_valid, explanation, str(final_result_comp)
+
+def verify_checksum(received_data, tracker=None, block_size=None):
+    """
+    Receiver only: checks a codeword (data blocks + checksum) without re-encoding it.
+    block_size defaults to the size run_checksum would have picked for this codeword.
+    """
+    if tracker is None:
+        tracker = StepTracker()
+    received = BitVector.coerce(received_data)
+    if block_size is None:
+        block_size = codeword_block_size(len(received))
+    if len(received) < 2 * block_size or len(received) % block_size:
+        raise ValueError(f"A checksum codeword is a whole number of {block_size}-bit words, at least two.")
+    if tracker.enabled:
+        tracker.add_step("Start Checksum Check", f"Received Data: {received}")
+    error_detected, explanation, syndrome = check_checksum(received, block_size, tracker)
     return {
-        "original_data": data,
-        "transmitted_data": transmitted_data,
-        "received_data": received_data,
+        "received_data": str(received),
+        "syndrome": syndrome,
         "error_detected": error_detected,
         "steps": tracker.get_steps(),
-        "explanation": "Valid (All 1s in sum)" if is_valid else "Error Detected (Sum not all 1s)"
+        "explanation": explanation
     }
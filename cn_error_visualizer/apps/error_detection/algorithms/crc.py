@@ -1,115 +1,193 @@
 from ..services.step_tracker import StepTracker
+from ..services.bit_vector import BitVector
+from ..services.parallel_crc import parallel_mod2div
 
-from ..services.bit_utils import xor
+# Inputs up to this many data bits keep the bit-by-bit division trace by default.
+# Larger inputs switch to the table-driven engine.
+TRACE_BIT_LIMIT = 128
 
 def mod2div(dividend, divisor, tracker=None, stage_name="Sender"):
-    # Reference length
-    pick = len(divisor)
-    
+    """
+    Modulo-2 long division, one bit at a time.
+    Accepts BitVectors or binary strings and returns the remainder in the type of `dividend`.
+    The working chunk is kept as an int register; strings are only built for the trace.
+    """
+    trace = tracker is not None and tracker.verbose
+    dividend_bits = BitVector.coerce(dividend)
+    divisor_bits = BitVector.coerce(divisor)
+    n = len(dividend_bits)
+
+    # Reference length (the chunk cannot be wider than the dividend itself)
+    pick = min(len(divisor_bits), n)
+    fmt = '0{}b'.format(pick)
+    mask = (1 << pick) - 1
+    lead_shift = pick - 1
+    div = divisor_bits[:pick].value
+    # Bits are pulled down from the string form: shifting a large int per bit would be quadratic
+    dividend_str = str(dividend_bits)
+
     # Slicing the dividend to appropriate length for first step
-    tmp = dividend[0 : pick]
-    
-    n = len(dividend)
-    
-    if tracker:
-        tracker.add_step(f"{stage_name}: Div Start", f"Dividend: {dividend}, Divisor: {divisor}, Initial Chunk: {tmp}",
-                         state={"dividend": dividend, "divisor": divisor, "current_chunk": tmp, "action": "start"})
-    
+    tmp = dividend_bits.value >> (n - pick)
+
+    if trace:
+        divisor_str = str(divisor_bits)
+        tracker.add_step(f"{stage_name}: Div Start", f"Dividend: {dividend_str}, Divisor: {divisor_str}, Initial Chunk: {format(tmp, fmt)}",
+                         state={"dividend": dividend_str, "divisor": divisor_str, "current_chunk": format(tmp, fmt), "action": "start"})
+
+    key = f"mod2div:{stage_name}"
+    if trace:
+        resumed = tracker.resume(key)
+        if resumed:
+            pick, tmp = resumed["pick"], resumed["chunk"]
+
     while pick < n:
-        if tmp[0] == '1':
+        if trace and tracker.checkpoint_due():
+            tracker.checkpoint(key, {"pick": pick, "chunk": tmp})
+        next_bit = 1 if dividend_str[pick] == '1' else 0
+        if tmp >> lead_shift:
             # XOR with divisor
-            result = xor(divisor, tmp)
+            result = div ^ tmp
             # Drop the leading bit (which is now 0) and pull down next
-            # result[1:] + next_bit
-            next_bit = dividend[pick]
-            new_tmp = result[1:] + next_bit
-            
-            if tracker:
-                tracker.add_step(f"{stage_name}: Step (XOR)", 
-                                 f"Current: {tmp} (Starts with 1). XOR {divisor} -> {result}. Pull down {next_bit} -> New: {new_tmp}",
-                                 state={"current_chunk": tmp, "divisor": divisor, "xor_result": result, "next_bit": next_bit, "new_chunk": new_tmp, "action": "xor"})
+            new_tmp = ((result << 1) & mask) | next_bit
+
+            if trace and tracker.wants_step():
+                tmp_str, result_str, new_str = format(tmp, fmt), format(result, fmt), format(new_tmp, fmt)
+                tracker.add_step(f"{stage_name}: Step (XOR)",
+                                 f"Current: {tmp_str} (Starts with 1). XOR {divisor_str} -> {result_str}. Pull down {next_bit} -> New: {new_str}",
+                                 state={"current_chunk": tmp_str, "divisor": divisor_str, "xor_result": result_str, "next_bit": str(next_bit), "new_chunk": new_str, "action": "xor"})
             tmp = new_tmp
         else:
             # If leading bit is 0, we effectively XOR with 000...0 or just shift.
-            # result of XOR with 0 is just tmp.
             # So we just drop leading 0 and pull next bit.
-            # But mathematically: XOR with '0'*len(divisor)
-            next_bit = dividend[pick]
-            new_tmp = tmp[1:] + next_bit
-            
-            if tracker:
-                tracker.add_step(f"{stage_name}: Step (Skip)", 
-                                 f"Current: {tmp} (Starts with 0). No XOR (Shift). Pull down {next_bit} -> New: {new_tmp}",
-                                 state={"current_chunk": tmp, "divisor": divisor, "next_bit": next_bit, "new_chunk": new_tmp, "action": "skip"})
+            new_tmp = ((tmp << 1) & mask) | next_bit
+
+            if trace and tracker.wants_step():
+                tmp_str, new_str = format(tmp, fmt), format(new_tmp, fmt)
+                tracker.add_step(f"{stage_name}: Step (Skip)",
+                                 f"Current: {tmp_str} (Starts with 0). No XOR (Shift). Pull down {next_bit} -> New: {new_str}",
+                                 state={"current_chunk": tmp_str, "divisor": divisor_str, "next_bit": str(next_bit), "new_chunk": new_str, "action": "skip"})
             tmp = new_tmp
-            
+
         pick += 1
 
-    # For the last remaining bits (after loop finishes 'pick' reaches end)
-    # The 'tmp' now has length 'len(divisor)'. 
-    # But usually we perform the operation one last time?
-    # Wait, the loop runs while pick < n.
-    # In strict long division, after pulling down the last bit, we do one final check/operation.
-    
-    if tmp[0] == '1':
-        result = xor(divisor, tmp)
-        remainder = result[1:]
-        if tracker:
-            tracker.add_step(f"{stage_name}: Final Step", f"Current: {tmp}. XOR {divisor} -> {result}. Remainder: {remainder}",
-                             state={"current_chunk": tmp, "divisor": divisor, "xor_result": result, "remainder": remainder, "action": "final_xor"})
-        tmp = remainder
+    # After pulling down the last bit, one final check/operation gives the remainder.
+    if tmp >> lead_shift:
+        result = div ^ tmp
+        remainder_bits = BitVector(result & (mask >> 1), lead_shift)
+        if trace:
+            tmp_str, result_str, rem_str = format(tmp, fmt), format(result, fmt), str(remainder_bits)
+            tracker.add_step(f"{stage_name}: Final Step", f"Current: {tmp_str}. XOR {divisor_str} -> {result_str}. Remainder: {rem_str}",
+                             state={"current_chunk": tmp_str, "divisor": divisor_str, "xor_result": result_str, "remainder": rem_str, "action": "final_xor"})
     else:
-        remainder = tmp[1:]
-        if tracker:
-            tracker.add_step(f"{stage_name}: Final Step", f"Current: {tmp}. Starts with 0. Remainder: {remainder}",
-                             state={"current_chunk": tmp, "remainder": remainder, "action": "final_skip"})
-        tmp = remainder
-
-    return tmp
-
-def run_crc(data, generator="1001", introduce_error=False):
-    tracker = StepTracker()
-    tracker.add_step("Start CRC", f"Data: {data}, Generator: {generator}")
-    
+        remainder_bits = BitVector(tmp & (mask >> 1), lead_shift)
+        if trace:
+            tmp_str, rem_str = format(tmp, fmt), str(remainder_bits)
+            tracker.add_step(f"{stage_name}: Final Step", f"Current: {tmp_str}. Starts with 0. Remainder: {rem_str}",
+                             state={"current_chunk": tmp_str, "remainder": rem_str, "action": "final_skip"})
+
+    return remainder_bits if isinstance(dividend, BitVector) else str(remainder_bits)
+
+def table_division(dividend, divisor, tracker=None, stage_name="Sender"):
+    # Same result as mod2div, computed byte-at-a-time from a cached lookup table
+    # (split across the process pool for very large dividends).
+    remainder = parallel_mod2div(dividend, divisor)
+    if tracker is not None and tracker.enabled:
+        tracker.add_step(f"{stage_name}: Table Division",
+                         f"Dividend: {dividend}, Divisor: {divisor}. Remainder via lookup table: {remainder}",
+                         state={"dividend": str(dividend), "divisor": str(divisor), "remainder": str(remainder), "action": "table"})
+    return remainder
+
+def run_crc(data, generator="1001", introduce_error=False, engine="auto", tracker=None):
+    """
+    engine: 'bitwise' traces every division step, 'table' uses the lookup-table
+    engine, 'auto' picks 'bitwise' for full traces of up to TRACE_BIT_LIMIT bits.
+    """
+    if tracker is None:
+        tracker = StepTracker()
+    bits = BitVector.coerce(data)
+    data = str(bits)
+    if engine == "auto":
+        engine = "bitwise" if tracker.verbose and len(bits) <= TRACE_BIT_LIMIT else "table"
+    divide = mod2div if engine == "bitwise" else table_division
+
+    if tracker.enabled:
+        tracker.add_step("Start CRC", f"Data: {data}, Generator: {generator}")
+
     # --- Sender ---
     # Append zeros
     l_gen = len(generator)
-    appended_data = data + '0'*(l_gen-1)
-    tracker.add_step("Sender: Padding", f"Appended {l_gen-1} zeros: {appended_data}")
-    
-    remainder = mod2div(appended_data, generator, tracker, "Sender")
-    
-    encoded_data = data + remainder
-    tracker.add_step("Sender: Finalize", f"CRC Remainder: {remainder}. Transmitted: {encoded_data}")
-    
+    appended = bits.pad_right(l_gen - 1)
+    if tracker.enabled:
+        tracker.add_step("Sender: Padding", f"Appended {l_gen-1} zeros: {appended}")
+
+    remainder = divide(appended, generator, tracker, "Sender")
+
+    encoded = bits + remainder
+    encoded_data = str(encoded)
+    if tracker.enabled:
+        tracker.add_step("Sender: Finalize", f"CRC Remainder: {remainder}. Transmitted: {encoded_data}")
+
     # --- Channel ---
-    received_data = encoded_data
+    received = encoded
     if introduce_error:
         # Flip bit
         # Ensure we flip a bit that CHANGES the remainder. Usually any bit flip does.
-        # Flip the last bit of the data part.
-        pos = 0 
-        bit = received_data[pos]
-        flipped = '1' if bit == '0' else '0'
-        received_data = flipped + received_data[1:]
-        tracker.add_step("Channel: Error Injection", f"Bit {pos} flipped. {encoded_data} -> {received_data}")
-        
+        pos = 0
+        received = encoded.flip(pos)
+        if tracker.enabled:
+            tracker.add_step("Channel: Error Injection", f"Bit {pos} flipped. {encoded_data} -> {received}")
+    received_data = str(received)
+
     # --- Receiver ---
-    tracker.add_step("Receiver: Verification", f"Dividing Received Data by Generator...")
-    
-    check_remainder = mod2div(received_data, generator, tracker, "Receiver")
-    
-    # Check if remainder is all zeros
-    is_zero = all(c == '0' for c in check_remainder)
-    error_detected = not is_zero
-    
-    tracker.add_step("Result", f"Final Remainder: {check_remainder}. Error Detected: {error_detected}")
-    
+    error_detected, explanation, _ = check_crc(received, generator, divide, tracker)
+
     return {
         "original_data": data,
         "transmitted_data": encoded_data,
         "received_data": received_data,
         "error_detected": error_detected,
         "steps": tracker.get_steps(),
-        "explanation": "Detected error via non-zero remainder" if error_detected else "Transmission clean"
+        "explanation": explanation
+    }
+
+def check_crc(received, generator, divide, tracker):
+    """
+    Receiver side of CRC: the codeword must leave a zero remainder.
+    Returns (error_detected, explanation, syndrome); the syndrome is the remainder.
+    """
+    if tracker.enabled:
+        tracker.add_step("Receiver: Verification", f"Dividing Received Data by Generator...")
+
+    check_remainder = divide(received, generator, tracker, "Receiver")
+
+    # Check if remainder is all zeros
+    error_detected = check_remainder.value != 0
+
+    if tracker.enabled:
+        tracker.add_step("Result", f"Final Remainder: {check_remainder}. Error Detected: {error_detected}")
+
+    explanation = "Detected error via non-zero remainder" if error_detected else "Transmission clean"
+    return error_detected, explanation, str(check_remainder)
+
+def verify_crc(received_data, generator="1001", engine="auto", tracker=None):
+    # Receiver only: divides a codeword (data + remainder) by the generator without re-encoding it
+    if tracker is None:
+        tracker = StepTracker()
+    received = BitVector.coerce(received_data)
+    if len(received) < len(generator):
+        raise ValueError(f"A CRC codeword for a {len(generator)}-bit generator has at least {len(generator)} bits.")
+    if engine == "auto":
+        data_bits = len(received) - (len(generator) - 1)
+        engine = "bitwise" if tracker.verbose and data_bits <= TRACE_BIT_LIMIT else "table"
+    divide = mod2div if engine == "bitwise" else table_division
+
+    if tracker.enabled:
+        tracker.add_step("Start CRC Check", f"Received: {received}, Generator: {generator}")
+    error_detected, explanation, syndrome = check_crc(received, generator, divide, tracker)
+    return {
+        "received_data": str(received),
+        "syndrome": syndrome,
+        "error_detected": error_detected,
+        "steps": tracker.get_steps(),
+        "explanation": explanation
     }
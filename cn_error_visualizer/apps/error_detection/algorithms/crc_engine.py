@@ -0,0 +1,154 @@
+from functools import lru_cache
+
+from ..services.bit_vector import BitVector
+
+
+def _preset(poly, width):
+    # Full generator string including the implicit leading 1 (x^width term)
+    return '1' + format(poly, '0{}b'.format(width))
+
+
+# Standard generator polynomials (normal, MSB-first form).
+# The visualizer performs plain modulo-2 division (zero initial register,
+# no reflection, no final XOR), so these presets share the polynomial of
+# the named standard but not its init/xorout parameters.
+CRC_PRESETS = {
+    'crc-8': _preset(0x07, 8),
+    'crc-16-ccitt': _preset(0x1021, 16),
+    'crc-32': _preset(0x04C11DB7, 32),
+    'crc-32c': _preset(0x1EDC6F41, 32),
+}
+
+
+def parse_generator(generator):
+    """
+    Converts a generator string into (poly, width).
+    The leading bit is implied: mod2div always drops the top bit of each
+    XOR result, so it behaves as if the generator started with '1'.
+    """
+    width = len(generator) - 1
+    poly = int(generator[1:], 2) if width else 0
+    return poly, width
+
+
+@lru_cache(maxsize=64)
+def build_table(poly, width):
+    """
+    Builds the 256-entry byte lookup table for a generator.
+    Generators narrower than 8 bits are widened (shifted left) so the
+    same byte-at-a-time update works for every width.
+    Tables are cached per (poly, width).
+    """
+    reg_width = max(width, 8)
+    mask = (1 << reg_width) - 1
+    top = 1 << (reg_width - 1)
+    shifted_poly = poly << (reg_width - width)
+
+    table = []
+    for byte in range(256):
+        reg = byte << (reg_width - 8)
+        for _ in range(8):
+            if reg & top:
+                reg = ((reg << 1) ^ shifted_poly) & mask
+            else:
+                reg = (reg << 1) & mask
+        table.append(reg)
+    return tuple(table)
+
+
+def crc_register(bits, poly, width, register=0):
+    """
+    Feeds a bit sequence (BitVector or binary string) through the CRC register.
+    Returns the register after the update, i.e. (register * x^len(bits) + bits) * x^width mod G.
+    Leading bits that do not fill a whole byte are processed one at a time,
+    the rest byte-at-a-time via the lookup table.
+    """
+    if width == 0:
+        return 0
+
+    table = build_table(poly, width)
+    reg_width = max(width, 8)
+    mask = (1 << reg_width) - 1
+    top_shift = reg_width - 1
+    byte_shift = reg_width - 8
+    shifted_poly = poly << (reg_width - width)
+
+    reg = register << (reg_width - width)
+
+    bits = BitVector.coerce(bits)
+    head = len(bits) % 8
+    body_len = len(bits) - head
+    head_value = bits.value >> body_len
+    for shift in range(head - 1, -1, -1):
+        feedback = (reg >> top_shift) ^ ((head_value >> shift) & 1)
+        reg = (reg << 1) & mask
+        if feedback:
+            reg ^= shifted_poly
+
+    if body_len:
+        body = bits.value & ((1 << body_len) - 1)
+        for byte in body.to_bytes(body_len // 8, 'big'):
+            reg = ((reg << 8) & mask) ^ table[(reg >> byte_shift) ^ byte]
+
+    return reg >> (reg_width - width)
+
+
+def gf2_mulmod(a, b, poly, width):
+    """
+    a * b mod G over GF(2), for a and b of degree < width and
+    G = x^width + poly. Horner's rule over the bits of b, reducing as it goes.
+    """
+    top = 1 << width
+    full = top | poly
+    result = 0
+    for shift in range(width - 1, -1, -1):
+        result <<= 1
+        if result & top:
+            result ^= full
+        if (b >> shift) & 1:
+            result ^= a
+    return result
+
+
+@lru_cache(maxsize=256)
+def xpow_mod(count, poly, width):
+    """x^count mod G by square-and-multiply; cached, since chunk lengths repeat."""
+    if width == 0:
+        return 0
+    # x mod G: x itself, or the low terms of G for a degree-1 generator
+    base = 2 if width > 1 else poly
+    result = 1
+    while count:
+        if count & 1:
+            result = gf2_mulmod(result, base, poly, width)
+        base = gf2_mulmod(base, base, poly, width)
+        count >>= 1
+    return result
+
+
+def crc_combine(register_a, register_b, length_b, poly, width):
+    """
+    Register of the concatenation A || B from the registers of A and B (each
+    started from zero), like zlib's crc32_combine for any generator:
+    (A * x^|B| + B) * x^width mod G = register(A) * x^|B| mod G XOR register(B).
+    """
+    return gf2_mulmod(register_a, xpow_mod(length_b, poly, width), poly, width) ^ register_b
+
+
+def table_mod2div(dividend, divisor):
+    """
+    Table-driven equivalent of crc.mod2div: returns the remainder of
+    dividend / divisor as len(divisor) - 1 bits, in the type of `dividend`
+    (BitVector or binary string).
+    Expects len(dividend) >= len(divisor), which run_crc always satisfies.
+    """
+    poly, width = parse_generator(str(divisor))
+    bits = BitVector.coerce(dividend)
+
+    remainder = 0
+    if width:
+        # D mod G = (D_hi * x^width mod G) XOR D_lo, where D_lo is the last `width` bits
+        remainder = crc_register(bits[:-width], poly, width) ^ (bits.value & ((1 << width) - 1))
+
+    result = BitVector(remainder, width)
+    return result if isinstance(dividend, BitVector) else str(result)
@@ -0,0 +1,263 @@
+from functools import cached_property, lru_cache
+
+from ..services.step_tracker import StepTracker
+from ..services.bit_vector import BitVector
+
+OK = "ok"
+CORRECTED = "corrected"
+UNCORRECTABLE = "uncorrectable"
+
+# Codes whose codewords are at most this wide decode through a table of every
+# possible received block; wider ones compute the syndrome from byte tables.
+FULL_TABLE_MAX_BITS = 16
+
+
+class HammingCode:
+    """
+    Hamming(2^r - 1, 2^r - 1 - r) in systematic form: each codeword is the k
+    data bits followed by r check bits, MSB first. With `extended`, an overall
+    parity bit is appended (SECDED: corrects one error and detects two).
+    The parity-check matrix has one column per codeword position: distinct
+    values of weight >= 2 for data bits, unit vectors for check bits. The
+    syndrome of a single error is therefore its column, and `positions`
+    turns it back into the error position.
+    """
+
+    def __init__(self, parity_bits=3, extended=False):
+        r = parity_bits
+        self.r = r
+        self.extended = extended
+        self.base_n = (1 << r) - 1
+        self.k = self.base_n - r
+        self.n = self.base_n + (1 if extended else 0)
+        self.columns = [value for value in range(3, 1 << r) if value & (value - 1)]
+        # syndrome -> codeword position of a single-bit error
+        self.positions = {column: i for i, column in enumerate(self.columns)}
+        for j in range(r):
+            self.positions[1 << (r - 1 - j)] = self.k + j
+
+        # The generator matrix, one 256-entry table per data byte: the check
+        # bits of a data value are the XOR of its bytes' entries.
+        self._tables = []
+        for low in range(0, self.k, 8):
+            table = []
+            for byte in range(256):
+                check = 0
+                for bit in range(8):
+                    if byte >> bit & 1 and low + bit < self.k:
+                        check ^= self.columns[self.k - 1 - (low + bit)]
+                table.append(check)
+            self._tables.append(table)
+
+    @property
+    def syndrome_format(self):
+        return f'0{self.r + (1 if self.extended else 0)}b'
+
+    @property
+    def name(self):
+        return f"Hamming({self.n},{self.k})" + (" SECDED" if self.extended else "")
+
+    def parity(self, data):
+        check = 0
+        for table in self._tables:
+            check ^= table[data & 0xFF]
+            data >>= 8
+        return check
+
+    def encode(self, data):
+        word = (data << self.r) | self.parity(data)
+        if self.extended:
+            word = (word << 1) | (bin(word).count('1') & 1)
+        return word
+
+    def decode(self, word):
+        """
+        Returns (data, syndrome, status, position) for one received block.
+        position is the corrected bit within the block, or None. The syndrome
+        of an extended code carries the overall parity as its last bit.
+        """
+        overall = 0
+        if self.extended:
+            overall = bin(word).count('1') & 1
+            word >>= 1
+        syndrome = self.parity(word >> self.r) ^ (word & ((1 << self.r) - 1))
+        full_syndrome = (syndrome << 1) | overall if self.extended else syndrome
+
+        if not syndrome and not overall:
+            return word >> self.r, full_syndrome, OK, None
+        if self.extended and not overall:
+            # Non-zero syndrome with even overall parity: two errors
+            return word >> self.r, full_syndrome, UNCORRECTABLE, None
+        if not syndrome:
+            # Only the overall parity bit is wrong
+            return word >> self.r, full_syndrome, CORRECTED, self.base_n
+        position = self.positions[syndrome]
+        word ^= 1 << (self.base_n - 1 - position)
+        return word >> self.r, full_syndrome, CORRECTED, position
+
+    @cached_property
+    def encode_table(self):
+        # data block string -> codeword string, for the batched encoder
+        return {format(data, f'0{self.k}b'): format(self.encode(data), f'0{self.n}b')
+                for data in range(1 << self.k)}
+
+    @cached_property
+    def decode_table(self):
+        # received block string -> (data string, syndrome string, status, position)
+        table = {}
+        for word in range(1 << self.n):
+            data, syndrome, status, position = self.decode(word)
+            table[format(word, f'0{self.n}b')] = (format(data, f'0{self.k}b'), format(syndrome, self.syndrome_format),
+                                                  status, position)
+        return table
+
+    def encode_message(self, text):
+        """Codewords of every k-bit block of `text` (a multiple of k bits), in one pass."""
+        k = self.k
+        if self.n <= FULL_TABLE_MAX_BITS:
+            table = self.encode_table
+            return "".join([table[text[i:i + k]] for i in range(0, len(text), k)])
+        fmt = f'0{self.n}b'
+        encode = self.encode
+        return "".join([format(encode(int(text[i:i + k], 2)), fmt) for i in range(0, len(text), k)])
+
+    def decode_message(self, text):
+        """
+        Decodes every n-bit block of `text` in one pass.
+        Returns (data text, syndrome strings, statuses, positions), one entry per block.
+        """
+        n = self.n
+        if n <= FULL_TABLE_MAX_BITS:
+            table = self.decode_table
+            decoded = [table[text[i:i + n]] for i in range(0, len(text), n)]
+        else:
+            fmt, syndrome_fmt = f'0{self.k}b', self.syndrome_format
+            decoded = []
+            for i in range(0, len(text), n):
+                data, syndrome, status, position = self.decode(int(text[i:i + n], 2))
+                decoded.append((format(data, fmt), format(syndrome, syndrome_fmt), status, position))
+        if not decoded:
+            return "", [], [], []
+        data, syndromes, statuses, positions = zip(*decoded)
+        return "".join(data), syndromes, statuses, positions
+
+
+@lru_cache(maxsize=16)
+def hamming_code(parity_bits=3, extended=False):
+    # Tables are built once per code and shared by every request
+    return HammingCode(parity_bits, extended)
+
+
+def run_hamming(data, introduce_error=False, tracker=None, parity_bits=3, extended=False):
+    """
+    parity_bits: r check bits per block, giving Hamming(2^r - 1, 2^r - 1 - r);
+    3 is Hamming(7,4). extended adds an overall parity bit per block (SECDED).
+    The data is padded on the right to whole k-bit blocks.
+    """
+    if tracker is None:
+        tracker = StepTracker()
+    bits = BitVector.coerce(data)
+    data = str(bits)
+    code = hamming_code(parity_bits, extended)
+    k, n = code.k, code.n
+    if tracker.enabled:
+        tracker.add_step("Start Hamming", f"Input Data: {data}")
+        tracker.add_step("Configuration", f"{code.name}: {k} data bits and {n - k} check bits per block.")
+
+    # Padding
+    padding = -len(bits) % k
+    processed = bits.pad_right(padding) if padding else bits
+    if padding and tracker.enabled:
+        tracker.add_step("Padding", f"Added {padding} zero(s) to end. Data: {processed}")
+    text = str(processed)
+
+    # --- Sender ---
+    transmitted_data = code.encode_message(text)
+    if tracker.verbose:
+        for i in range(0, len(text) // k):
+            if not tracker.wants_step():
+                continue
+            block, codeword = text[i * k:(i + 1) * k], transmitted_data[i * n:(i + 1) * n]
+            tracker.add_step(f"Sender: Block {i}", f"Data {block} -> check bits {codeword[k:]}. Codeword: {codeword}",
+                             state={"block": i, "data": block, "check_bits": codeword[k:], "codeword": codeword})
+    if tracker.enabled:
+        tracker.add_step("Sender: Finalize", f"{len(text) // k} block(s) encoded. Transmitted: {transmitted_data}")
+
+    # --- Channel ---
+    received_data = transmitted_data
+    if introduce_error:
+        # Flip the first bit (a single error, so the receiver can correct it)
+        received_data = ('1' if transmitted_data[0] == '0' else '0') + transmitted_data[1:]
+        if tracker.enabled:
+            tracker.add_step("Channel: Error Injection", f"Bit 0 flipped. {transmitted_data} -> {received_data}")
+
+    # --- Receiver ---
+    result = decode_received(code, received_data, tracker)
+    corrected_data = result.pop("decoded_data")[:len(bits)]
+    return dict({
+        "original_data": data,
+        "transmitted_data": transmitted_data,
+        "received_data": received_data,
+        "corrected_data": corrected_data,
+    }, **result)
+
+
+def decode_received(code, received_data, tracker):
+    """
+    Receiver side: decodes every block and corrects what the code can.
+    error_detected is true when any block had a non-zero syndrome;
+    error_corrected when every such block was corrected.
+    """
+    n = code.n
+    if tracker.enabled:
+        tracker.add_step("Receiver: Start Check", f"Received Data: {received_data}")
+    decoded, syndromes, statuses, positions = code.decode_message(received_data)
+
+    if tracker.verbose:
+        for i, (syndrome, status, position) in enumerate(zip(syndromes, statuses, positions)):
+            if not tracker.wants_step():
+                continue
+            action = f"bit {position} corrected" if status == CORRECTED else status
+            tracker.add_step(f"Receiver: Block {i}", f"Syndrome {syndrome}: {action}.",
+                             state={"block": i, "received": received_data[i * n:(i + 1) * n],
+                                    "syndrome": syndrome, "status": status,
+                                    "position": position})
+
+    corrected = [i * n + position for i, position in enumerate(positions) if position is not None]
+    uncorrectable = [i for i, status in enumerate(statuses) if status == UNCORRECTABLE]
+    error_detected = bool(corrected or uncorrectable)
+    if uncorrectable:
+        explanation = f"Error Detected: {len(uncorrectable)} block(s) with two errors could not be corrected."
+    elif corrected:
+        explanation = f"Corrected: {len(corrected)} single-bit error(s) fixed."
+    else:
+        explanation = "Accepted: All syndromes are zero."
+
+    if tracker.enabled:
+        tracker.add_step("Receiver: Decoding",
+                         f"{len(statuses)} block(s): {len(corrected)} corrected, {len(uncorrectable)} uncorrectable.",
+                         state={"corrected_bits": corrected[:100], "uncorrectable_blocks": uncorrectable[:100]})
+        tracker.add_step("Result", explanation, state={"error_detected": error_detected})
+
+    return {
+        "decoded_data": decoded,
+        "error_detected": error_detected,
+        "error_corrected": error_detected and not uncorrectable,
+        "corrections": len(corrected),
+        "uncorrectable_blocks": len(uncorrectable),
+        "syndrome": "".join(syndromes),
+        "steps": tracker.get_steps(),
+        "explanation": explanation,
+    }
+
+
+def verify_hamming(received_data, tracker=None, parity_bits=3, extended=False):
+    # Receiver only: decodes and corrects received codewords without re-encoding
+    if tracker is None:
+        tracker = StepTracker()
+    received = BitVector.coerce(received_data)
+    code = hamming_code(parity_bits, extended)
+    if not len(received) or len(received) % code.n:
+        raise ValueError(f"A {code.name} codeword is a whole number of {code.n}-bit blocks.")
+    result = decode_received(code, str(received), tracker)
+    return dict({"received_data": str(received), "corrected_data": result.pop("decoded_data")}, **result)
@@ -1,110 +1,131 @@
 from ..services.step_tracker import StepTracker
+from ..services.bit_vector import BitVector
+from ..services.bit_utils import codeword_block_size, default_block_size
+
+def run_lrc(data, introduce_error=False, tracker=None, block_size=None):
+    """
+    block_size: bits per row of the parity matrix. Defaults to 4 for inputs of
+    up to 16 bits and 8 otherwise.
+    """
+    if tracker is None:
+        tracker = StepTracker()
+    bits = BitVector.coerce(data)
+    data = str(bits)
+    if tracker.enabled:
+        tracker.add_step("Start LRC", f"Input Data: {data}")
 
-def run_lrc(data, introduce_error=False):
-    tracker = StepTracker()
-    tracker.add_step("Start LRC", f"Input Data: {data}")
-    
     # Block size determination
-    n = len(data)
-    block_size = 8
-    if n <= 16:
-        block_size = 4
-        
-    tracker.add_step("Configuration", f"Block Size set to {block_size} bits.")
-    
+    n = len(bits)
+    if block_size is None:
+        block_size = default_block_size(n)
+
+    if tracker.enabled:
+        tracker.add_step("Configuration", f"Block Size set to {block_size} bits.")
+
     # Padding
     padding_needed = block_size - (n % block_size)
     if padding_needed == block_size:
         padding_needed = 0
-        
-    processed_data = data
+
+    processed = bits
     if padding_needed > 0:
-        processed_data = data + ('0' * padding_needed)
-        tracker.add_step("Padding", f"Added {padding_needed} zero(s) to end. Data: {processed_data}")
-        
-    # Split into blocks
-    blocks = [processed_data[i:i+block_size] for i in range(0, len(processed_data), block_size)]
-    tracker.add_step("Blocking", f"Data split into {len(blocks)} blocks: {blocks}", state={"blocks": blocks})
-    
+        processed = bits.pad_right(padding_needed)
+        if tracker.enabled:
+            tracker.add_step("Padding", f"Added {padding_needed} zero(s) to end. Data: {processed}")
+
+    # Split into blocks (rows of the parity matrix); only materialized for the trace
+    if tracker.enabled:
+        block_strings = [str(block) for block in processed.blocks(block_size)]
+        tracker.add_step("Blocking", f"Data split into {len(block_strings)} blocks: {block_strings}", state={"blocks": block_strings})
+
     # --- Sender Side ---
-    lrc_bits = []
-    tracker.add_step("Sender: Calculating Column Parity", "Iterating columns...")
-    
-    for col in range(block_size):
-        ones_count = 0
-        col_bits = []
-        for block in blocks:
-            bit = block[col]
-            col_bits.append(bit)
-            if bit == '1':
-                ones_count += 1
-        
-        parity = '1' if ones_count % 2 != 0 else '0'
-        lrc_bits.append(parity)
-        tracker.add_step(f"Sender: Column {col}", f"Bits: {col_bits}. 1s count: {ones_count}. Parity: {parity}",
-                         state={"highlight_col": col, "column_bits": col_bits, "count": ones_count, "parity_bit": parity, "blocks": blocks})
-        
-    lrc_block = "".join(lrc_bits)
-    transmitted_data = processed_data + lrc_block
-    
-    tracker.add_step("Sender: Finalize", f"LRC Block: {lrc_block}. Transmitted: {transmitted_data}")
-    
+    # Column parities of all blocks at once: XOR-fold of the packed rows
+    lrc_block = BitVector(processed.xor_fold(block_size), block_size)
+    if tracker.enabled:
+        tracker.add_step("Sender: Calculating Column Parity", "Iterating columns...")
+
+    if tracker.verbose:
+        for col in range(block_size):
+            if not tracker.wants_step():
+                continue
+            col_bits = [block[col] for block in block_strings]
+            ones_count = col_bits.count('1')
+            parity = '1' if lrc_block[col] else '0'
+            tracker.add_step(f"Sender: Column {col}", f"Bits: {col_bits}. 1s count: {ones_count}. Parity: {parity}",
+                             state={"highlight_col": col, "column_bits": col_bits, "count": ones_count, "parity_bit": parity, "blocks": block_strings})
+
+    transmitted = processed + lrc_block
+    transmitted_data = str(transmitted)
+
+    if tracker.enabled:
+        tracker.add_step("Sender: Finalize", f"LRC Block: {lrc_block}. Transmitted: {transmitted_data}")
+
     # --- Channel ---
-    received_data = transmitted_data
+    received = transmitted
     if introduce_error:
         # Flip a bit in the data part
         pos = 0 # Flip first bit
-        flipped = '1' if received_data[pos] == '0' else '0'
-        received_data = flipped + received_data[1:]
-        tracker.add_step("Channel: Error Injection", f"Bit at index {pos} flipped. {transmitted_data} -> {received_data}")
-        
+        received = transmitted.flip(pos)
+        if tracker.enabled:
+            tracker.add_step("Channel: Error Injection", f"Bit at index {pos} flipped. {transmitted_data} -> {received}")
+    received_data = str(received)
+
     # --- Receiver Side ---
-    tracker.add_step("Receiver: Start Check", f"Received Data: {received_data}")
-    
+    error_detected, explanation, _ = check_lrc(received, block_size, tracker)
+
+    return {
+        "original_data": data,
+        "transmitted_data": transmitted_data,
+        "received_data": received_data,
+        "error_detected": error_detected,
+        "steps": tracker.get_steps(),
+        "explanation": explanation
+    }
+
+def check_lrc(received, block_size, tracker):
+    """
+    Receiver side of LRC: the XOR of all blocks, LRC block included, must be zero.
+    Returns (error_detected, explanation, syndrome).
+    """
+    if tracker.enabled:
+        tracker.add_step("Receiver: Start Check", f"Received Data: {received}")
+
     # Split received data
-    # We know block_size. Total length must be multiple of block_size? No, data blocks + 1 LRC block.
-    # So total length should be divisible by block_size.
-    
-    rec_blocks = [received_data[i:i+block_size] for i in range(0, len(received_data), block_size)]
-    tracker.add_step("Receiver: Blocking", f"Received blocks: {rec_blocks}")
-    
-    lrc_check_bits = []
-    error_found = False
-    
-    for col in range(block_size):
-        ones_count = 0
-        for block in rec_blocks: # This includes the received LRC block effectively?
-             # Wait. The receiver checks parity of ALL blocks INCLUDING the LRC block.
-             # If correct, column sums should be even (0).
-             if block[col] == '1':
-                 ones_count += 1
-        
-        result_parity = '1' if ones_count % 2 != 0 else '0'
-        lrc_check_bits.append(result_parity)
-        
-    final_check = "".join(lrc_check_bits)
-    # If final_check is all '0's, then no error (assuming even parity logic holds for the whole set including LRC)
-    
-    # Logic:
-    # Data columns + LRC column = Even parity total?
-    # Sender: Data sums to X. LRC = X % 2.
-    # Receiver: Data + LRC. Sums should be 0 mod 2. 
-    # Yes.
-    
-    is_zero = all(c == '0' for c in final_check)
-    error_detected = not is_zero
-    
-    tracker.add_step("Receiver: Validation", f"Computed Parity of all blocks (including LRC): {final_check}")
-    
+    # Total length is data blocks + 1 LRC block, so it divides evenly by block_size.
+    if tracker.enabled:
+        tracker.add_step("Receiver: Blocking", f"Received blocks: {[str(block) for block in received.blocks(block_size)]}")
+
+    # The receiver checks parity of ALL blocks INCLUDING the LRC block.
+    # If correct, every column sums to even parity (0).
+    final_check = BitVector(received.xor_fold(block_size), block_size)
+
+    error_detected = final_check.value != 0
+
+    if tracker.enabled:
+        tracker.add_step("Receiver: Validation", f"Computed Parity of all blocks (including LRC): {final_check}")
+
     if error_detected:
         explanation = "Error Detected: Columns do not sum to even parity."
     else:
         explanation = "Accepted: All columns sum to even parity."
-        
+    return error_detected, explanation, str(final_check)
+
+def verify_lrc(received_data, tracker=None, block_size=None):
+    """
+    Receiver only: checks a codeword (padded data blocks + LRC block) without re-encoding it.
+    block_size defaults to the size run_lrc would have picked for this codeword.
+    """
+    if tracker is None:
+        tracker = StepTracker()
+    received = BitVector.coerce(received_data)
+    if block_size is None:
+        block_size = codeword_block_size(len(received))
+    if len(received) < 2 * block_size or len(received) % block_size:
+        raise ValueError(f"An LRC codeword is a whole number of {block_size}-bit blocks, at least two.")
+    error_detected, explanation, syndrome = check_lrc(received, block_size, tracker)
     return {
-        "original_data": data,
-        "transmitted_data": transmitted_data,
-        "received_data": received_data,
+        "received_data": str(received),
+        "syndrome": syndrome,
         "error_detected": error_detected,
         "steps": tracker.get_steps(),
         "explanation": explanation
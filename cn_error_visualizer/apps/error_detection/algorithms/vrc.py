@@ -1,71 +1,117 @@
 from ..services.step_tracker import StepTracker
+from ..services.bit_vector import BitVector
+
+def run_vrc(data, introduce_error=False, tracker=None):
+    if tracker is None:
+        tracker = StepTracker()
+    bits = BitVector.coerce(data)
+    data = str(bits)
+    if tracker.enabled:
+        tracker.add_step("Start VRC", f"Input Data: {data}")
 
-def run_vrc(data, introduce_error=False):
-    tracker = StepTracker()
-    tracker.add_step("Start VRC", f"Input Data: {data}")
-    
     # --- Sender Side ---
-    ones_count = 0
-    tracker.add_step("Sender: Counting 1s", "Iterating through bits...")
-    
-    for i, bit in enumerate(data):
-        if bit == '1':
-            ones_count += 1
-            tracker.add_step(f"Sender: Bit {i}", f"Found '1'. Current count: {ones_count}", 
-                             state={"index": i, "bit": bit, "count": ones_count, "action": "increment"})
-        else:
-            tracker.add_step(f"Sender: Bit {i}", f"Found '0'. Current count: {ones_count}",
-                             state={"index": i, "bit": bit, "count": ones_count, "action": "skip"})
-            
-    parity_bit = '1' if ones_count % 2 != 0 else '0'
-    transmitted_data = data + parity_bit
-    
-    tracker.add_step("Sender: Parity Calculation", 
-                     f"Total 1s: {ones_count}. {ones_count} is {'Odd' if ones_count % 2 else 'Even'}. Parity Bit: {parity_bit}",
-                     state={"data": data, "parity": parity_bit})
-    
+    # Per-bit steps only in full trace mode; otherwise a single popcount
+    if tracker.enabled:
+        tracker.add_step("Sender: Counting 1s", "Iterating through bits...")
+
+    if tracker.verbose:
+        start, ones_count = 0, 0
+        resumed = tracker.resume("vrc:count")
+        if resumed:
+            start, ones_count = resumed["index"], resumed["count"]
+
+        for i in range(start, len(data)):
+            if tracker.checkpoint_due():
+                tracker.checkpoint("vrc:count", {"index": i, "count": ones_count})
+            bit = data[i]
+            if bit == '1':
+                ones_count += 1
+                if tracker.wants_step():
+                    tracker.add_step(f"Sender: Bit {i}", f"Found '1'. Current count: {ones_count}",
+                                     state={"index": i, "bit": bit, "count": ones_count, "action": "increment"})
+            elif tracker.wants_step():
+                tracker.add_step(f"Sender: Bit {i}", f"Found '0'. Current count: {ones_count}",
+                                 state={"index": i, "bit": bit, "count": ones_count, "action": "skip"})
+    else:
+        ones_count = bits.count()
+
+    parity = ones_count & 1
+    parity_bit = '1' if parity else '0'
+    transmitted = bits + BitVector(parity, 1)
+    transmitted_data = str(transmitted)
+
+    if tracker.enabled:
+        tracker.add_step("Sender: Parity Calculation",
+                         f"Total 1s: {ones_count}. {ones_count} is {'Odd' if ones_count % 2 else 'Even'}. Parity Bit: {parity_bit}",
+                         state={"data": data, "parity": parity_bit})
+
     # --- Channel ---
-    received_data = transmitted_data
+    received = transmitted
     if introduce_error:
         # Flip the first bit (index 0)
-        bit = received_data[0]
-        flipped = '1' if bit == '0' else '0'
-        received_data = flipped + received_data[1:]
-        tracker.add_step("Channel: Error Injection", 
-                         f"Noise introduced! Bit 0 flipped. {transmitted_data} -> {received_data}")
-    else:
+        received = transmitted.flip(0)
+        if tracker.enabled:
+            tracker.add_step("Channel: Error Injection",
+                             f"Noise introduced! Bit 0 flipped. {transmitted_data} -> {received}")
+    elif tracker.enabled:
         tracker.add_step("Channel", "Transmission successful. No errors.")
+    received_data = str(received)
 
     # --- Receiver Side ---
-    tracker.add_step("Receiver: Start Check", f"Received Data: {received_data}")
-    
-    rec_data_only = received_data[:-1]
-    rec_parity = received_data[-1]
-    
-    rec_ones_count = 0
-    for bit in rec_data_only:
-        if bit == '1':
-            rec_ones_count += 1
-            
+    error_detected, explanation, _ = check_vrc(received, tracker)
+
+    return {
+        "original_data": data,
+        "transmitted_data": transmitted_data,
+        "received_data": received_data,
+        "error_detected": error_detected,
+        "steps": tracker.get_steps(),
+        "explanation": explanation
+    }
+
+def check_vrc(received, tracker):
+    """
+    Receiver side of VRC: the parity bit must match the parity of the data bits.
+    Returns (error_detected, explanation, syndrome); the syndrome is the
+    parity of the whole codeword, '0' for a valid one.
+    """
+    if tracker.enabled:
+        tracker.add_step("Receiver: Start Check", f"Received Data: {received}")
+
+    rec_data_only = received[:-1]
+    rec_parity = '1' if received[-1] else '0'
+
+    rec_ones_count = rec_data_only.count()
     calc_parity = '1' if rec_ones_count % 2 != 0 else '0'
-    
+
     error_detected = (calc_parity != rec_parity)
-    
-    tracker.add_step("Receiver: Verification", 
-                     f"Count of 1s in data part: {rec_ones_count}. "
-                     f"Expected Parity: {calc_parity}. Received Parity: {rec_parity}.")
-    
+
+    if tracker.enabled:
+        tracker.add_step("Receiver: Verification",
+                         f"Count of 1s in data part: {rec_ones_count}. "
+                         f"Expected Parity: {calc_parity}. Received Parity: {rec_parity}.")
+
     if error_detected:
         explanation = "Error Detected: Parity mismatch."
     else:
         explanation = "Accepted: Parity matches."
-        
-    tracker.add_step("Result", explanation, state={"error_detected": error_detected})
-    
+
+    if tracker.enabled:
+        tracker.add_step("Result", explanation, state={"error_detected": error_detected})
+
+    return error_detected, explanation, '1' if error_detected else '0'
+
+def verify_vrc(received_data, tracker=None):
+    # Receiver only: checks a codeword (data + parity bit) without re-encoding it
+    if tracker is None:
+        tracker = StepTracker()
+    received = BitVector.coerce(received_data)
+    if len(received) < 2:
+        raise ValueError("A VRC codeword needs at least one data bit and the parity bit.")
+    error_detected, explanation, syndrome = check_vrc(received, tracker)
     return {
-        "original_data": data,
-        "transmitted_data": transmitted_data,
-        "received_data": received_data,
+        "received_data": str(received),
+        "syndrome": syndrome,
         "error_detected": error_detected,
         "steps": tracker.get_steps(),
         "explanation": explanation
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .serializers import AsyncDetectionRequestSerializer
+from ..services.async_runner import run_detection, DetectionTimeout
+from ..services import json_backend
+from ..services.data_codec import encode_result_data
+from ..services.json_backend import aiter_json, should_stream
+from ..services.metrics import annotate, timed_phase
+from ..services.trace_format import COLUMNAR, encode_result
+from .renderers import COLUMNAR_MEDIA_TYPE
+
+
+@csrf_exempt
+@require_POST
+async def detect_error_async(request):
+    """
+    Native async counterpart of DetectErrorView for ASGI deployments.
+    Validation runs inline; the algorithm runs in an executor, so the event
+    loop keeps serving other requests. If the client disconnects, Django
+    cancels this coroutine and the queued work is dropped with it.
+    """
+    with timed_phase(request, 'validate'):
+        if request.content_type == 'application/octet-stream':
+            # Raw frame upload: parameters come from the query string
+            body = dict(request.GET.items(), data=request.body)
+        else:
+            try:
+                body = json_backend.loads(request.body or b'{}')
+            except ValueError:
+                body = None
+        serializer = AsyncDetectionRequestSerializer(data=body)
+        valid = body is not None and serializer.is_valid()
+    if body is None:
+        return JsonResponse({'error': 'Request body must be JSON.'}, status=400)
+    if not valid:
+        return JsonResponse(serializer.errors, status=400)
+
+    params = serializer.validated_data
+    annotate(request, technique=params['technique'])
+    timeout = params.get('timeout') or getattr(settings, 'ERROR_DETECTION_ASYNC_TIMEOUT', 30)
+    try:
+        with timed_phase(request, 'algorithm'):
+            result = await run_detection(serializer.to_run_params(), params.get('step_limit'), timeout)
+    except DetectionTimeout as e:
+        return JsonResponse({'error': str(e)}, status=504)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+    annotate(request, result=result)
+    trace_format = params['trace_format']
+    content_type = 'application/json'
+    if COLUMNAR_MEDIA_TYPE in request.headers.get('Accept', ''):
+        trace_format, content_type = COLUMNAR, COLUMNAR_MEDIA_TYPE
+    result = encode_result(encode_result_data(result, params['encoding']), trace_format)
+    if content_type != COLUMNAR_MEDIA_TYPE and should_stream(result):
+        return StreamingHttpResponse(aiter_json(result), content_type=content_type)
+    # Encoded eagerly, so rendering is timed here rather than by the middleware
+    with timed_phase(request, 'render'):
+        return HttpResponse(json_backend.dumps(result), content_type=content_type)
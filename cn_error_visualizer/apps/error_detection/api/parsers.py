@@ -0,0 +1,33 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from ..services import json_backend
+
+
+class OctetStreamParser(BaseParser):
+    """
+    Raw frame upload: the body is the data itself, other parameters
+    (technique, bit_length, ...) come from the query string.
+    """
+    media_type = 'application/octet-stream'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream.read() if stream is not None else b''
+
+
+class FastJSONParser(JSONParser):
+    # JSON request bodies parsed with services.json_backend
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return json_backend.loads(stream.read() if stream is not None else b'')
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+def request_payload(request, field='data'):
+    # Serializer input for a DRF request, merging query parameters into raw uploads
+    if isinstance(request.data, bytes):
+        payload = request.query_params.dict()
+        payload[field] = request.data
+        return payload
+    return request.data
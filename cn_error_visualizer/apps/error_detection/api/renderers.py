@@ -0,0 +1,49 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from ..services import json_backend
+from ..services.step_stream import ERROR, format_event
+from ..services.trace_format import COLUMNAR, encode_result
+
+COLUMNAR_MEDIA_TYPE = 'application/vnd.error-detection.columnar+json'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    application/json renderer backed by services.json_backend (orjson when
+    installed, the standard library otherwise). Output is compact UTF-8.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json_backend.dumps(data)
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """
+    Selected with `Accept: application/vnd.error-detection.columnar+json` or
+    `?format=columnar`; sends `steps` in the columnar trace format.
+    """
+    media_type = COLUMNAR_MEDIA_TYPE
+    format = COLUMNAR
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = encode_result(data, COLUMNAR)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets EventSource clients (`Accept: text/event-stream`) through content
+    negotiation. Steps are streamed by the view itself; responses rendered
+    here are errors, sent as a single `error` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return format_event(ERROR, data)
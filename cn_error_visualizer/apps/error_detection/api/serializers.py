@@ -1,19 +1,416 @@
+from django.conf import settings
 from rest_framework import serializers
+from ..algorithms.crc_engine import CRC_PRESETS
+from ..services.algorithm_factory import COMPARE, TECHNIQUES
+from ..services.step_tracker import StepTracker
+from ..services.bit_utils import default_block_size
+from ..services.result_cache import ALGORITHM_VERSION
+from ..services.ber_simulator import BSC, CHANNELS
+from ..services.pattern_sweep import MAX_WEIGHT
+from ..services.trace_format import FORMATS, STEPS
+from ..services.file_checks import TECHNIQUES as FILE_TECHNIQUES
+from ..services.incremental import ENCODE, MODES, TECHNIQUES as SESSION_TECHNIQUES
+from ..services.data_codec import BINARY, ENCODINGS, RAW, decode_data, encode_bits, is_bit_string
+
+
+class BitStringField(serializers.CharField):
+    """'0'/'1' text, checked in linear time (a regex is much slower on megabit inputs)."""
+    default_error_messages = {'invalid_bits': 'Must contain only 0s and 1s.'}
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        if not is_bit_string(value):
+            self.fail('invalid_bits')
+        return value
+
+
+class EncodedDataField(serializers.Field):
+    # Text for binary/hex/base64 data, bytes for a raw application/octet-stream body
+    default_error_messages = {
+        'invalid': 'Data must be a string.',
+        'blank': 'This field may not be blank.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, (bytes, bytearray)):
+            value = bytes(data)
+        elif isinstance(data, str):
+            value = data.strip()
+        else:
+            self.fail('invalid')
+        if not value:
+            self.fail('blank')
+        return value
+
+
+class TechniqueListField(serializers.ListField):
+    # A list, or comma-separated text for query strings and form data
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [item.strip() for item in data.split(',') if item.strip()]
+        return super().to_internal_value(data)
+
+
+def resolve_preset(attrs):
+    # A named CRC preset replaces the generator it stands for
+    if attrs.get('preset'):
+        attrs['generator'] = CRC_PRESETS[attrs['preset']]
+    return attrs
+
 
 class ErrorDetectionRequestSerializer(serializers.Serializer):
-    TECHNIQUE_CHOICES = [
+    # Detect-only techniques; the simulator and the pattern sweep model these
+    DETECTION_CHOICES = [
         ('vrc', 'VRC'),
         ('lrc', 'LRC'),
         ('crc', 'CRC'),
         ('checksum', 'Checksum'),
     ]
+    TECHNIQUE_CHOICES = DETECTION_CHOICES + [('hamming', 'Hamming')]
+    # Fields a subclass drops, with the error returned when a request still sends one
+    rejected_fields = {}
     
-    technique = serializers.ChoiceField(choices=TECHNIQUE_CHOICES)
-    data = serializers.RegexField(regex=r'^[01]+$', error_messages={'invalid': 'Data must contain only 0s and 1s.'})
+    technique = serializers.ChoiceField(choices=TECHNIQUE_CHOICES + [(COMPARE, 'Compare techniques')],
+                                        help_text="'all' runs several techniques on the data (detect-error only)")
+    techniques = TechniqueListField(child=serializers.ChoiceField(choices=TECHNIQUE_CHOICES), required=False,
+                                    allow_empty=False,
+                                    help_text="With technique=all: the techniques to compare (default: every one)")
+    data = EncodedDataField(help_text="Bits as 0/1 text, or hex/base64 text as set by encoding")
+    encoding = serializers.ChoiceField(choices=ENCODINGS, default=BINARY,
+                                       help_text="Encoding of data; the response data fields use the same one")
+    bit_length = serializers.IntegerField(min_value=1, required=False,
+                                          help_text="Use only the first N bits of data (hex/base64/raw carry whole bytes)")
     generator = serializers.RegexField(regex=r'^[01]+$', required=False, default="1001", help_text="Required for CRC")
+    preset = serializers.ChoiceField(choices=sorted(CRC_PRESETS), required=False,
+                                     help_text="Named CRC generator; overrides generator")
+    engine = serializers.ChoiceField(choices=['auto', 'bitwise', 'table'], default='auto',
+                                     help_text="CRC engine: bitwise trace, lookup table, or auto by input size")
+    block_size = serializers.IntegerField(min_value=2, max_value=64, required=False,
+                                          help_text="LRC row / checksum word width in bits, e.g. 16 for the RFC 1071 Internet checksum")
+    parity_bits = serializers.IntegerField(min_value=2, max_value=6, default=3,
+                                           help_text="Hamming check bits r per block: Hamming(2^r-1, 2^r-1-r), 3 is (7,4)")
+    secded = serializers.BooleanField(default=False, help_text="Hamming: add an overall parity bit (SECDED)")
     introduce_error = serializers.BooleanField(default=False)
+    trace = serializers.ChoiceField(choices=StepTracker.MODES, default=StepTracker.FULL,
+                                    help_text="full: every step, summary: phase boundaries only, off: result only")
+    step_limit = serializers.IntegerField(min_value=1, required=False,
+                                          help_text="Return only the first N steps; fetch the rest by run_id")
+    trace_format = serializers.ChoiceField(choices=FORMATS, default=STEPS,
+                                           help_text="steps: list of step objects, columnar: compact delta-encoded trace")
     
     def validate(self, attrs):
+        for name, message in self.rejected_fields.items():
+            if name in self.initial_data:
+                raise serializers.ValidationError({name: message})
+        # Raw octet-stream bodies arrive as bytes, whatever encoding says
+        if isinstance(attrs['data'], bytes):
+            attrs['encoding'] = RAW
+        try:
+            attrs['data'] = decode_data(attrs['data'], attrs['encoding'], attrs.get('bit_length'))
+        except ValueError as e:
+            raise serializers.ValidationError({"data": str(e)})
+        resolve_preset(attrs)
         if attrs['technique'] == 'crc' and not attrs.get('generator'):
             raise serializers.ValidationError({"generator": "Generator polynomial is required for CRC."})
+        if attrs.get('step_limit') and attrs['trace'] != StepTracker.FULL:
+            raise serializers.ValidationError({"step_limit": "Paged steps require trace='full'."})
+        if attrs['technique'] == COMPARE:
+            # Views that can return a combined response opt in through the serializer context
+            if not self.context.get('allow_compare'):
+                raise serializers.ValidationError({"technique": "technique='all' is only available on /api/detect-error/."})
+            if attrs.get('step_limit'):
+                raise serializers.ValidationError({"step_limit": "Paged steps need a single technique."})
+            requested = set(attrs.get('techniques') or TECHNIQUES)
+            attrs['techniques'] = [technique for technique in TECHNIQUES if technique in requested]
+        return attrs
+
+    def to_run_params(self):
+        # Keyword arguments for AlgorithmFactory.run_algorithm
+        params = self.validated_data
+        return {
+            'technique': params['technique'],
+            'data': params['data'],
+            'generator': params.get('generator'),
+            'engine': params.get('engine'),
+            'block_size': params.get('block_size'),
+            'parity_bits': params['parity_bits'],
+            'secded': params['secded'],
+            'introduce_error': params['introduce_error'],
+            'trace': params['trace'],
+        }
+
+    def to_compare_params(self):
+        # Keyword arguments for AlgorithmFactory.compare (technique='all')
+        params = self.to_run_params()
+        del params['technique']
+        params['techniques'] = self.validated_data['techniques']
+        return params
+
+
+class VerificationRequestSerializer(serializers.Serializer):
+    technique = serializers.ChoiceField(choices=ErrorDetectionRequestSerializer.TECHNIQUE_CHOICES)
+    received_data = EncodedDataField(help_text="Received codeword (data followed by its check bits)")
+    encoding = serializers.ChoiceField(choices=ENCODINGS, default=BINARY)
+    bit_length = serializers.IntegerField(min_value=1, required=False,
+                                          help_text="Use only the first N bits of received_data")
+    generator = serializers.RegexField(regex=r'^[01]+$', required=False, default="1001", help_text="Required for CRC")
+    preset = serializers.ChoiceField(choices=sorted(CRC_PRESETS), required=False)
+    engine = serializers.ChoiceField(choices=['auto', 'bitwise', 'table'], default='auto')
+    block_size = serializers.IntegerField(min_value=2, max_value=64, required=False,
+                                          help_text="LRC row / checksum word width; defaults to the sender's default")
+    parity_bits = serializers.IntegerField(min_value=2, max_value=6, default=3,
+                                           help_text="Hamming check bits r per block: Hamming(2^r-1, 2^r-1-r), 3 is (7,4)")
+    secded = serializers.BooleanField(default=False, help_text="Hamming: add an overall parity bit (SECDED)")
+    trace = serializers.ChoiceField(choices=StepTracker.MODES, default=StepTracker.FULL)
+
+    def validate(self, attrs):
+        if isinstance(attrs['received_data'], bytes):
+            attrs['encoding'] = RAW
+        try:
+            attrs['received_data'] = decode_data(attrs['received_data'], attrs['encoding'], attrs.get('bit_length'))
+        except ValueError as e:
+            raise serializers.ValidationError({"received_data": str(e)})
+        resolve_preset(attrs)
+        return attrs
+
+    def to_verify_params(self):
+        # Keyword arguments for AlgorithmFactory.verify
+        params = self.validated_data
+        return {
+            'technique': params['technique'],
+            'received_data': params['received_data'],
+            'generator': params.get('generator'),
+            'engine': params.get('engine'),
+            'block_size': params.get('block_size'),
+            'parity_bits': params['parity_bits'],
+            'secded': params['secded'],
+            'trace': params['trace'],
+        }
+
+
+class SessionCreateSerializer(serializers.Serializer):
+    technique = serializers.ChoiceField(choices=SESSION_TECHNIQUES)
+    mode = serializers.ChoiceField(choices=MODES, default=ENCODE,
+                                   help_text="encode: compute the check bits of the stream, verify: check a received codeword")
+    generator = serializers.RegexField(regex=r'^[01]+$', required=False, default="1001", help_text="Required for CRC")
+    preset = serializers.ChoiceField(choices=sorted(CRC_PRESETS), required=False)
+    block_size = serializers.IntegerField(min_value=2, max_value=64, required=False,
+                                          help_text="Checksum word width; defaults to the one-shot default for the final length")
+
+    def validate(self, attrs):
+        return resolve_preset(attrs)
+
+
+class SessionChunkSerializer(serializers.Serializer):
+    data = EncodedDataField()
+    encoding = serializers.ChoiceField(choices=ENCODINGS, default=BINARY)
+    bit_length = serializers.IntegerField(min_value=1, required=False)
+    offset = serializers.IntegerField(min_value=0, required=False,
+                                      help_text="Bit position of this chunk in the stream, checked against the bits received")
+
+    def validate(self, attrs):
+        if isinstance(attrs['data'], bytes):
+            attrs['encoding'] = RAW
+        try:
+            attrs['data'] = decode_data(attrs['data'], attrs['encoding'], attrs.get('bit_length'))
+        except ValueError as e:
+            raise serializers.ValidationError({"data": str(e)})
+        return attrs
+
+
+class FileCheckRequestSerializer(serializers.Serializer):
+    # Options of a file upload, from the query string or the multipart form
+    techniques = serializers.ListField(child=serializers.ChoiceField(choices=FILE_TECHNIQUES),
+                                       default=list(FILE_TECHNIQUES), allow_empty=False)
+    generator = serializers.RegexField(regex=r'^[01]+$', required=False, help_text="CRC generator (default crc-32)")
+    preset = serializers.ChoiceField(choices=sorted(CRC_PRESETS), required=False)
+    block_size = serializers.IntegerField(min_value=2, max_value=64, required=False,
+                                          help_text="Checksum word / LRC row width (default 16 / 8)")
+
+    def validate(self, attrs):
+        return resolve_preset(attrs)
+
+
+class AsyncDetectionRequestSerializer(ErrorDetectionRequestSerializer):
+    timeout = serializers.FloatField(min_value=0.01, required=False,
+                                     help_text="Seconds to wait for the result; capped by the server default")
+
+    def validate_timeout(self, value):
+        return min(value, getattr(settings, 'ERROR_DETECTION_ASYNC_TIMEOUT', 30))
+
+
+class CacheableDetectionRequestSerializer(ErrorDetectionRequestSerializer):
+    # GET form of a detection; paged runs get a run_id of their own, so they stay POST-only
+    step_limit = None
+    rejected_fields = {'step_limit': "Paged steps are only available with POST."}
+
+    def canonical_query(self):
+        """
+        Query parameters of the canonical URL for these inputs, as sorted
+        (name, value) pairs. Defaults and parameters the technique ignores are
+        left out and a preset is replaced by its generator, so every
+        equivalent request maps to one URL and one cache entry. The data is
+        re-encoded from the decoded bits (lowercase hex, padded base64, no
+        bits cut off by bit_length), so different spellings of the same bits
+        converge too; the encoding itself is kept, since it also selects the
+        encoding of the response. `v` is the algorithm version: bumping it
+        moves every canonical URL, so responses cached under the old one are
+        never served for the new algorithms.
+        """
+        params = self.validated_data
+        technique = params['technique']
+        bits = params['data']
+        query = {'technique': technique, 'data': encode_bits(bits, params['encoding']), 'v': ALGORITHM_VERSION}
+        selected = [technique]
+        if technique == COMPARE:
+            selected = params['techniques']
+            if len(selected) < len(TECHNIQUES):
+                query['techniques'] = ",".join(selected)
+        if params['encoding'] != BINARY:
+            query['encoding'] = params['encoding']
+            # Hex and base64 carry whole bytes
+            if len(bits) % 8:
+                query['bit_length'] = len(bits)
+        if 'crc' in selected:
+            query['generator'] = params['generator']
+            if params['engine'] != 'auto':
+                query['engine'] = params['engine']
+        block_size = params.get('block_size')
+        if ('lrc' in selected or 'checksum' in selected) and block_size and block_size != default_block_size(len(bits)):
+            query['block_size'] = block_size
+        if 'hamming' in selected:
+            if params['parity_bits'] != 3:
+                query['parity_bits'] = params['parity_bits']
+            if params['secded']:
+                query['secded'] = 'true'
+        if params['introduce_error']:
+            query['introduce_error'] = 'true'
+        if params['trace'] != StepTracker.FULL:
+            query['trace'] = params['trace']
+        if params['trace_format'] != STEPS:
+            query['trace_format'] = params['trace_format']
+        return sorted((name, str(value)) for name, value in query.items())
+
+
+class StreamDetectionRequestSerializer(ErrorDetectionRequestSerializer):
+    # Steps are sent as they are produced: nothing to page or re-encode
+    step_limit = None
+    trace_format = None
+
+
+class BatchItemSerializer(ErrorDetectionRequestSerializer):
+    # Batch items always return every step; a run_id per item would outlive the batch
+    step_limit = None
+    rejected_fields = {'step_limit': "Paged steps are only available on /api/detect-error/."}
+
+
+class BatchDetectionRequestSerializer(serializers.Serializer):
+    # Items are validated one by one with BatchItemSerializer so
+    # a bad item is reported on its own instead of rejecting the batch.
+    items = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_items(self, value):
+        max_items = getattr(settings, 'ERROR_DETECTION_BATCH_MAX_ITEMS', 10000)
+        if len(value) > max_items:
+            raise serializers.ValidationError(f"A batch may contain at most {max_items} items.")
+        return value
+
+
+class StepRangeSerializer(serializers.Serializer):
+    # Populated from the ?from=&to=&trace_format= query parameters
+    start = serializers.IntegerField(min_value=0, default=0)
+    stop = serializers.IntegerField(min_value=1)
+    trace_format = serializers.ChoiceField(choices=FORMATS, default=STEPS)
+
+    def validate(self, attrs):
+        if attrs['stop'] <= attrs['start']:
+            raise serializers.ValidationError({"to": "'to' must be greater than 'from'."})
+        return attrs
+
+
+class RunHistorySerializer(serializers.Serializer):
+    # Populated from the query parameters of the run history endpoint
+    technique = serializers.ChoiceField(choices=ErrorDetectionRequestSerializer.TECHNIQUE_CHOICES, required=False)
+    error_detected = serializers.BooleanField(required=False)
+    input_hash = serializers.RegexField(regex=r'^[0-9a-f]{64}$', required=False,
+                                        help_text="Runs of one set of inputs (the result cache key)")
+    since = serializers.DateTimeField(required=False, help_text="Runs created at or after this time")
+    until = serializers.DateTimeField(required=False, help_text="Runs created before this time")
+    cursor = serializers.IntegerField(min_value=1, required=False, help_text="next_cursor of the previous page")
+    limit = serializers.IntegerField(min_value=1, default=50, help_text="Runs per page; capped by the server")
+
+    def validate_limit(self, value):
+        return min(value, getattr(settings, 'ERROR_DETECTION_RUN_HISTORY_MAX_LIMIT', 200))
+
+
+class SimulationRequestSerializer(serializers.Serializer):
+    techniques = serializers.ListField(
+        child=serializers.ChoiceField(choices=ErrorDetectionRequestSerializer.DETECTION_CHOICES),
+        default=['vrc', 'lrc', 'crc', 'checksum'], allow_empty=False,
+    )
+    data = BitStringField(error_messages={'invalid_bits': 'Data must contain only 0s and 1s.'})
+    generator = serializers.RegexField(regex=r'^[01]+$', required=False, default="1001")
+    preset = serializers.ChoiceField(choices=sorted(CRC_PRESETS), required=False)
+    block_size = serializers.IntegerField(min_value=2, max_value=64, required=False)
+    channel = serializers.ChoiceField(choices=CHANNELS, default=BSC,
+                                      help_text="bsc: independent bit flips, burst: one error burst per frame")
+    bers = serializers.ListField(child=serializers.FloatField(min_value=0, max_value=1), required=False,
+                                 help_text="Bit-error rates to sweep (bsc channel)")
+    burst_lengths = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False,
+                                          help_text="Burst lengths to sweep (burst channel)")
+    burst_probability = serializers.FloatField(min_value=0, max_value=1, default=1.0,
+                                               help_text="Chance that a frame is hit by a burst")
+    trials = serializers.IntegerField(min_value=1, default=10000)
+    seed = serializers.IntegerField(required=False, help_text="Omit for a random seed; it is returned for replays")
+
+    def validate_trials(self, value):
+        max_trials = getattr(settings, 'ERROR_DETECTION_SIMULATION_MAX_TRIALS', 10_000_000)
+        if value > max_trials:
+            raise serializers.ValidationError(f"At most {max_trials} trials per point.")
+        return value
+
+    def validate(self, attrs):
+        resolve_preset(attrs)
+        key = 'bers' if attrs['channel'] == BSC else 'burst_lengths'
+        if not attrs.get(key):
+            raise serializers.ValidationError({key: f"Required for the {attrs['channel']} channel."})
+        points = len(attrs['techniques']) * len(attrs[key])
+        max_points = getattr(settings, 'ERROR_DETECTION_SIMULATION_MAX_POINTS', 64)
+        if points > max_points:
+            raise serializers.ValidationError(f"A sweep may contain at most {max_points} technique/channel points.")
+        attrs['values'] = attrs[key]
+        return attrs
+
+
+class PatternSweepRequestSerializer(serializers.Serializer):
+    techniques = serializers.ListField(
+        child=serializers.ChoiceField(choices=ErrorDetectionRequestSerializer.DETECTION_CHOICES),
+        default=['vrc', 'lrc', 'crc', 'checksum'], allow_empty=False,
+    )
+    data = BitStringField(required=False, error_messages={'invalid_bits': 'Data must contain only 0s and 1s.'})
+    frame_length = serializers.IntegerField(min_value=1, required=False,
+                                            help_text="Sweep an all-zero frame of this many bits instead of data")
+    generator = serializers.RegexField(regex=r'^[01]+$', required=False, default="1001")
+    preset = serializers.ChoiceField(choices=sorted(CRC_PRESETS), required=False)
+    block_size = serializers.IntegerField(min_value=2, max_value=64, required=False)
+    max_weight = serializers.IntegerField(min_value=1, max_value=MAX_WEIGHT, default=MAX_WEIGHT)
+    examples = serializers.IntegerField(min_value=0, max_value=100, default=5,
+                                        help_text="Undetected patterns listed per weight")
+
+    def validate_frame_length(self, value):
+        # Checked before the all-zero frame is built
+        max_bits = getattr(settings, 'ERROR_DETECTION_SWEEP_MAX_BITS', 2048)
+        if value > max_bits:
+            raise serializers.ValidationError(f"Sweeps are limited to {max_bits}-bit frames.")
+        return value
+
+    def validate(self, attrs):
+        resolve_preset(attrs)
+        if 'data' not in attrs:
+            if 'frame_length' not in attrs:
+                raise serializers.ValidationError("Provide either data or frame_length.")
+            attrs['data'] = '0' * attrs['frame_length']
+        max_bits = getattr(settings, 'ERROR_DETECTION_SWEEP_MAX_BITS', 2048)
+        if len(attrs['data']) > max_bits:
+            raise serializers.ValidationError({"data": f"Sweeps are limited to {max_bits}-bit frames."})
         return attrs
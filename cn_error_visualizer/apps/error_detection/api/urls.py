@@ -1,6 +1,28 @@
 from django.urls import path
-from .views import DetectErrorView
+from .async_views import detect_error_async
+from .views import (
+    DetectErrorView, DetectErrorStreamView, StepRangeView, BatchDetectErrorView, CacheStatsView, SimulateView, ErrorPatternSweepView, MetricsView, VerifyView,
+    SessionCreateView, SessionView, SessionChunkView, SessionFinalizeView, FileCheckView,
+    RunHistoryView, RunDetailView,
+)
 
 urlpatterns = [
     path('detect-error/', DetectErrorView.as_view(), name='detect-error'),
+    path('detect-error/async/', detect_error_async, name='detect-error-async'),
+    path('detect-error/stream/', DetectErrorStreamView.as_view(), name='detect-error-stream'),
+    path('detect-error/batch/', BatchDetectErrorView.as_view(), name='detect-error-batch'),
+    path('detect-error/<str:run_id>/steps/', StepRangeView.as_view(), name='detect-error-steps'),
+    path('verify/', VerifyView.as_view(), name='verify'),
+    path('sessions/', SessionCreateView.as_view(), name='session-create'),
+    path('sessions/<str:session_id>/', SessionView.as_view(), name='session'),
+    path('sessions/<str:session_id>/chunks/', SessionChunkView.as_view(), name='session-chunks'),
+    path('sessions/<str:session_id>/finalize/', SessionFinalizeView.as_view(), name='session-finalize'),
+    path('file-checks/', FileCheckView.as_view(), name='file-checks'),
+    path('runs/', RunHistoryView.as_view(), name='runs'),
+    path('runs/<int:run_id>/', RunDetailView.as_view(), name='run-detail'),
+    path('simulate/', SimulateView.as_view(), name='simulate'),
+    path('error-patterns/', ErrorPatternSweepView.as_view(), name='error-patterns'),
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+    # No trailing slash: the path Prometheus scrapes by convention
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
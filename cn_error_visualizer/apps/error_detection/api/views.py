@@ -1,23 +1,499 @@
+import hashlib
+import random
+import time
+from functools import partial
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponsePermanentRedirect, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import ErrorDetectionRequestSerializer
-from ..services.algorithm_factory import AlgorithmFactory
+from rest_framework.settings import api_settings
+from .parsers import OctetStreamParser, request_payload
+from .renderers import ColumnarJSONRenderer, EventStreamRenderer, FastJSONRenderer
+from .serializers import (
+    ErrorDetectionRequestSerializer, StepRangeSerializer, BatchDetectionRequestSerializer, SimulationRequestSerializer,
+    PatternSweepRequestSerializer, VerificationRequestSerializer, FileCheckRequestSerializer, SessionCreateSerializer, SessionChunkSerializer,
+    RunHistorySerializer, StreamDetectionRequestSerializer, CacheableDetectionRequestSerializer, BatchItemSerializer,
+)
+from ..services.algorithm_factory import COMPARE, AlgorithmFactory
+from ..services.batch_runner import run_batch
+from ..services.data_codec import encode_result_data
+from ..services.file_checks import build_digests, run_checks
+from ..services.http_compression import compress, iter_compress, negotiate
+from ..services.incremental import (
+    SessionError, append_chunk, create_session, delete_session, finalize_session, load_session,
+)
+from ..services.json_backend import iter_json, should_stream
+from ..services.ber_simulator import run_simulation
+from ..services.metrics import annotate, registry, timed_phase
+from ..services.pattern_sweep import run_sweep
+from ..services.run_store import get_writer, load_stored_run, run_history
+from ..services.step_replay import run_paged, load_run, replay_steps
+from ..services.step_stream import StepStream, StreamsBusy, aiter_events, iter_events
+from ..services.trace_format import COLUMNAR, STEPS, encode_result
+
+# Views returning traces also offer the columnar format through content negotiation
+TRACE_RENDERERS = list(api_settings.DEFAULT_RENDERER_CLASSES) + [ColumnarJSONRenderer]
 
 class DetectErrorView(APIView):
+    renderer_classes = TRACE_RENDERERS
+    parser_classes = list(api_settings.DEFAULT_PARSER_CLASSES) + [OctetStreamParser]
+
+    def get_authenticators(self):
+        # GET results do not depend on the user, and not reading the session keeps
+        # `Vary: Cookie` off the cacheable responses. POST keeps the default
+        # authenticators, and with them CSRF checks for session users.
+        if self.request.method in ('GET', 'HEAD'):
+            return []
+        return super().get_authenticators()
+
     def post(self, request):
-        serializer = ErrorDetectionRequestSerializer(data=request.data)
-        if serializer.is_valid():
+        with timed_phase(request, 'validate'):
+            serializer = ErrorDetectionRequestSerializer(data=request_payload(request), context={'allow_compare': True})
+            valid = serializer.is_valid()
+        if valid:
             params = serializer.validated_data
+            run_params = serializer.to_run_params()
+            annotate(request, technique=params['technique'])
             try:
-                result = AlgorithmFactory.run_algorithm(
-                    technique=params['technique'],
-                    data=params['data'],
-                    generator=params.get('generator'),
-                    introduce_error=params['introduce_error']
-                )
+                if params['technique'] == COMPARE:
+                    return Response(_compare(request, serializer), status=status.HTTP_200_OK)
+                with timed_phase(request, 'algorithm'):
+                    if params.get('step_limit'):
+                        result = run_paged(run_params, params['step_limit'])
+                    else:
+                        result = AlgorithmFactory.run_algorithm(**run_params)
+                annotate(request, result=result)
+                with timed_phase(request, 'render'):
+                    result = encode_result_data(result, params['encoding'])
+                    result = encode_result(result, params['trace_format'])
+                if type(request.accepted_renderer) is FastJSONRenderer and should_stream(result):
+                    # Large traces go out chunk by chunk instead of as one rendered string
+                    return StreamingHttpResponse(iter_json(result), content_type='application/json')
                 return Response(result, status=status.HTTP_200_OK)
             except Exception as e:
                 return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def get(self, request):
+        """
+        Cacheable form of post(), with the same parameters in the query string.
+        Equivalent queries are redirected to one canonical URL, which includes
+        the algorithm version. Responses carry a strong ETag and a long-lived
+        Cache-Control, so browsers and proxies reuse them and revalidate with
+        If-None-Match, answered by a 304 without running the algorithm. The
+        ETag hashes the canonical query (the inputs and the algorithm version)
+        and the representation. Bodies are gzip/brotli-compressed per
+        Accept-Encoding. Paging (step_limit) is POST-only.
+        """
+        with timed_phase(request, 'validate'):
+            serializer = CacheableDetectionRequestSerializer(data=request.query_params.dict(),
+                                                             context={'allow_compare': True})
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        query = serializer.canonical_query()
+        if 'format' in request.query_params:
+            query.append(('format', request.query_params['format']))
+        if parse_qsl(request.META.get('QUERY_STRING', ''), keep_blank_values=True) != query:
+            return _canonical_redirect(request, query)
+
+        params = serializer.validated_data
+        run_params = serializer.to_run_params()
+        annotate(request, technique=params['technique'])
+        renderer = request.accepted_renderer
+        coding = negotiate(request.headers.get('Accept-Encoding'))
+        representation = ":".join([urlencode(query), renderer.media_type, coding or "identity"])
+        etag = '"%s"' % hashlib.sha256(representation.encode()).hexdigest()[:40]
+        if any(tag == '*' or tag.removeprefix('W/') == etag
+               for tag in parse_etags(request.headers.get('If-None-Match', ''))):
+            return _cacheable(HttpResponse(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        try:
+            if params['technique'] == COMPARE:
+                result = _compare(request, serializer)
+            else:
+                with timed_phase(request, 'algorithm'):
+                    result = AlgorithmFactory.run_algorithm(**run_params)
+                annotate(request, result=result)
+                result = encode_result(encode_result_data(result, params['encoding']), params['trace_format'])
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if not isinstance(renderer, FastJSONRenderer):
+            # The browsable API page is rendered per request, neither cached nor compressed
+            return Response(result, status=status.HTTP_200_OK)
+        with timed_phase(request, 'render'):
+            if type(renderer) is FastJSONRenderer and should_stream(result):
+                body = iter_json(result)
+                response = StreamingHttpResponse(iter_compress(body, coding) if coding else body,
+                                                 content_type=renderer.media_type)
+            else:
+                body = renderer.render(result, renderer.media_type, self.get_renderer_context())
+                if len(body) < getattr(settings, 'ERROR_DETECTION_COMPRESS_MIN_BYTES', 1024):
+                    coding = None
+                response = HttpResponse(compress(body, coding) if coding else body, content_type=renderer.media_type)
+        if coding:
+            response['Content-Encoding'] = coding
+        return _cacheable(response, etag)
+
+def _compare(request, serializer):
+    """
+    Combined response of technique='all': the input once, then each
+    technique's result (without the input) and the seconds it took.
+    """
+    params = serializer.validated_data
+    trace_format = COLUMNAR if isinstance(request.accepted_renderer, ColumnarJSONRenderer) else params['trace_format']
+    with timed_phase(request, 'algorithm'):
+        started = time.perf_counter()
+        outcomes = AlgorithmFactory.compare(**serializer.to_compare_params())
+        seconds = time.perf_counter() - started
+    with timed_phase(request, 'render'):
+        shared = encode_result_data({'original_data': str(params['data'])}, params['encoding'])
+        results = {}
+        for technique, (result, technique_seconds) in outcomes.items():
+            result = encode_result(encode_result_data(result, params['encoding']), trace_format)
+            result = {key: value for key, value in result.items() if key not in shared}
+            results[technique] = dict(result, seconds=round(technique_seconds, 6))
+    return dict(shared, techniques=list(outcomes), seconds=round(seconds, 6), results=results)
+
+def _cacheable(response, etag=None):
+    # Detection output is a pure function of the canonical URL, algorithm version included, so it never goes stale
+    if etag is not None:
+        response['ETag'] = etag
+    patch_cache_control(response, public=True, immutable=True,
+                        max_age=getattr(settings, 'ERROR_DETECTION_GET_MAX_AGE', 365 * 24 * 60 * 60))
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
+
+def _canonical_redirect(request, query):
+    # The target moves when ALGORITHM_VERSION is bumped, so the redirect itself is only cached briefly
+    response = HttpResponsePermanentRedirect(f"{request.path}?{urlencode(query)}")
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'ERROR_DETECTION_GET_REDIRECT_MAX_AGE', 3600))
+    return response
+
+class DetectErrorStreamView(APIView):
+    """
+    Steps as Server-Sent Events while the algorithm produces them: `steps`
+    events ({"from": index, "steps": [...]}) and a final `result` event
+    (the result without steps, plus total_steps) or `error` event.
+    GET reads the parameters from the query string, for EventSource;
+    POST takes the same body as DetectErrorView.
+    """
+    renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES) + [EventStreamRenderer]
+    parser_classes = list(api_settings.DEFAULT_PARSER_CLASSES) + [OctetStreamParser]
+
+    def get(self, request):
+        return self.stream(request, request.query_params.dict())
+
+    def post(self, request):
+        return self.stream(request, request_payload(request))
+
+    def stream(self, request, payload):
+        with timed_phase(request, 'validate'):
+            serializer = StreamDetectionRequestSerializer(data=payload)
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+        annotate(request, technique=params['technique'])
+        stream = StepStream.from_settings()
+        try:
+            stream.start(serializer.to_run_params())
+        except StreamsBusy as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+        encode = partial(encode_result_data, encoding=params['encoding'])
+        # Under ASGI the events come from an async iterator, so no worker thread waits on a slow client
+        if isinstance(request._request, ASGIRequest):
+            events = aiter_events(stream, encode)
+        else:
+            events = iter_events(stream, encode)
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Tells nginx to pass events through instead of buffering the response
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+class VerifyView(APIView):
+    # Receiver-side check of a codeword the caller already has
+    parser_classes = list(api_settings.DEFAULT_PARSER_CLASSES) + [OctetStreamParser]
+
+    def post(self, request):
+        with timed_phase(request, 'validate'):
+            serializer = VerificationRequestSerializer(data=request_payload(request, 'received_data'))
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+        annotate(request, technique=params['technique'])
+        try:
+            with timed_phase(request, 'algorithm'):
+                result = AlgorithmFactory.verify(**serializer.to_verify_params())
+        except ValueError as e:
+            return Response({'received_data': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+        annotate(request, result=result)
+        with timed_phase(request, 'render'):
+            result = encode_result_data(result, params['encoding'])
+        return Response(result, status=status.HTTP_200_OK)
+
+class SessionCreateView(APIView):
+    # Incremental CRC/checksum over data that arrives in chunks
+    def post(self, request):
+        serializer = SessionCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        session_id = create_session(params['technique'], params['mode'],
+                                    generator=params.get('generator'), block_size=params.get('block_size'))
+        return Response({
+            'session_id': session_id,
+            'expires_in': getattr(settings, 'ERROR_DETECTION_SESSION_TTL', 15 * 60),
+        }, status=status.HTTP_201_CREATED)
+
+def _session_not_found():
+    return Response({'error': 'Unknown or expired session_id.'}, status=status.HTTP_404_NOT_FOUND)
+
+def _session_conflict(error):
+    return Response({'error': str(error), 'bits_received': error.bits_received}, status=status.HTTP_409_CONFLICT)
+
+class SessionView(APIView):
+    def delete(self, request, session_id):
+        if load_session(session_id) is None:
+            return _session_not_found()
+        try:
+            delete_session(session_id)
+        except SessionError as e:
+            return _session_conflict(e)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class SessionChunkView(APIView):
+    parser_classes = list(api_settings.DEFAULT_PARSER_CLASSES) + [OctetStreamParser]
+
+    def post(self, request, session_id):
+        with timed_phase(request, 'validate'):
+            serializer = SessionChunkSerializer(data=request_payload(request))
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        session = load_session(session_id)
+        if session is None:
+            return _session_not_found()
+        annotate(request, technique=session['state']['technique'])
+        params = serializer.validated_data
+        try:
+            with timed_phase(request, 'algorithm'):
+                received = append_chunk(session_id, params['data'], params.get('offset'))
+        except SessionError as e:
+            return _session_conflict(e)
+        if received is None:
+            return _session_not_found()
+        return Response({'session_id': session_id, 'bits_received': received}, status=status.HTTP_200_OK)
+
+class SessionFinalizeView(APIView):
+    def post(self, request, session_id):
+        session = load_session(session_id)
+        if session is None:
+            return _session_not_found()
+        annotate(request, technique=session['state']['technique'])
+        try:
+            result = finalize_session(session_id)
+        except SessionError as e:
+            return _session_conflict(e)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if result is None:
+            return _session_not_found()
+        return Response(result, status=status.HTTP_200_OK)
+
+class FileCheckView(APIView):
+    """
+    CRC / checksum / LRC of an uploaded file, computed chunk by chunk.
+    Accepts a multipart `file` field (Django spools large uploads to disk) or
+    a raw application/octet-stream body, which is read straight from the
+    request stream instead of being parsed into memory.
+    """
+
+    def post(self, request):
+        chunk_size = getattr(settings, 'ERROR_DETECTION_FILE_CHUNK_BYTES', 1 << 20)
+        raw = request.content_type.startswith('application/octet-stream')
+        serializer = FileCheckRequestSerializer(data=request.query_params if raw else request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if raw:
+            stream = request.stream
+            chunks = iter(lambda: stream.read(chunk_size), b'') if stream is not None else iter(())
+        else:
+            upload = request.data.get('file')
+            if upload is None or not hasattr(upload, 'chunks'):
+                return Response({'file': ['Upload a file, or send the data as application/octet-stream.']},
+                                status=status.HTTP_400_BAD_REQUEST)
+            chunks = upload.chunks(chunk_size)
+
+        params = serializer.validated_data
+        digests = build_digests(params['techniques'], params.get('generator'), params.get('block_size'))
+        with timed_phase(request, 'algorithm'):
+            report = run_checks(chunks, digests)
+        return Response(report, status=status.HTTP_200_OK)
+
+class StepRangeView(APIView):
+    renderer_classes = TRACE_RENDERERS
+
+    def get(self, request, run_id):
+        serializer = StepRangeSerializer(data={
+            'start': request.query_params.get('from', 0),
+            'stop': request.query_params.get('to'),
+            'trace_format': request.query_params.get('trace_format', STEPS),
+        })
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        run = load_run(run_id)
+        if run is None:
+            return Response({'error': 'Unknown or expired run_id.'}, status=status.HTTP_404_NOT_FOUND)
+
+        start = serializer.validated_data['start']
+        max_window = getattr(settings, 'ERROR_DETECTION_MAX_STEP_WINDOW', 5000)
+        stop = min(serializer.validated_data['stop'], start + max_window)
+        with timed_phase(request, 'algorithm'):
+            steps = replay_steps(run, start, stop)
+        return Response(encode_result({
+            'run_id': run_id,
+            'from': start,
+            'to': start + len(steps),
+            'total_steps': run['total_steps'],
+            'steps': steps,
+        }, serializer.validated_data['trace_format']), status=status.HTTP_200_OK)
+
+class RunHistoryView(APIView):
+    # Stored runs, newest first; send next_cursor back as cursor for the next page
+    def get(self, request):
+        serializer = RunHistorySerializer(data=request.query_params.dict())
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        with timed_phase(request, 'algorithm'):
+            runs, next_cursor = run_history(**serializer.validated_data)
+        return Response({'results': runs, 'next_cursor': next_cursor}, status=status.HTTP_200_OK)
+
+class RunDetailView(APIView):
+    # One stored run with its full result and trace, for replay and audit
+    def get(self, request, run_id):
+        with timed_phase(request, 'algorithm'):
+            run = load_stored_run(run_id)
+        if run is None:
+            return Response({'error': 'Unknown run id.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(run, status=status.HTTP_200_OK)
+
+class BatchDetectErrorView(APIView):
+    def post(self, request):
+        with timed_phase(request, 'validate'):
+            serializer = BatchDetectionRequestSerializer(data=request.data)
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validate every item first, then run only the valid ones
+        results = []
+        valid_indexes, run_items, output_formats = [], [], []
+        with timed_phase(request, 'validate'):
+            for index, item in enumerate(serializer.validated_data['items']):
+                item_serializer = BatchItemSerializer(data=item)
+                if item_serializer.is_valid():
+                    valid_indexes.append(index)
+                    run_items.append(item_serializer.to_run_params())
+                    item_params = item_serializer.validated_data
+                    output_formats.append((item_params['encoding'], item_params['trace_format']))
+                    results.append(None)
+                else:
+                    results.append({'index': index, 'errors': item_serializer.errors})
+
+        with timed_phase(request, 'algorithm'):
+            outcomes = run_batch(run_items)
+        for index, outcome, (encoding, trace_format) in zip(valid_indexes, outcomes, output_formats):
+            if 'result' in outcome:
+                result = encode_result_data(outcome['result'], encoding)
+                outcome = dict(outcome, result=encode_result(result, trace_format))
+            results[index] = dict(outcome, index=index)
+
+        failed = sum(1 for item in results if 'result' not in item)
+        return Response({
+            'succeeded': len(results) - failed,
+            'failed': failed,
+            'results': results,
+        }, status=status.HTTP_200_OK)
+
+class CacheStatsView(APIView):
+    def get(self, request):
+        return Response(AlgorithmFactory.cache_stats(), status=status.HTTP_200_OK)
+
+class SimulateView(APIView):
+    def post(self, request):
+        with timed_phase(request, 'validate'):
+            serializer = SimulationRequestSerializer(data=request.data)
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+        seed = params.get('seed')
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+        with timed_phase(request, 'algorithm'):
+            results = run_simulation(
+                params['techniques'], params['data'],
+                channel=params['channel'],
+                values=params['values'],
+                trials=params['trials'],
+                seed=seed,
+                generator=params.get('generator'),
+                block_size=params.get('block_size'),
+                burst_probability=params['burst_probability'],
+            )
+        return Response({'seed': seed, 'results': results}, status=status.HTTP_200_OK)
+
+class ErrorPatternSweepView(APIView):
+    def post(self, request):
+        with timed_phase(request, 'validate'):
+            serializer = PatternSweepRequestSerializer(data=request.data)
+            valid = serializer.is_valid()
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+        with timed_phase(request, 'algorithm'):
+            reports = run_sweep(
+                params['techniques'], params['data'],
+                max_weight=params['max_weight'],
+                max_examples=params['examples'],
+                generator=params.get('generator'),
+                block_size=params.get('block_size'),
+            )
+        return Response({'data_bits': len(params['data']), 'results': reports}, status=status.HTTP_200_OK)
+
+class MetricsView(APIView):
+    # Prometheus text exposition of this process's request metrics
+    def get(self, request):
+        cache = AlgorithmFactory.cache_stats()
+        extra = []
+        for name in ('hits', 'misses', 'evictions'):
+            extra += [f"# TYPE error_detection_result_cache_{name}_total counter",
+                      f"error_detection_result_cache_{name}_total {cache[name]}"]
+        for name in ('entries', 'bytes'):
+            extra += [f"# TYPE error_detection_result_cache_{name} gauge",
+                      f"error_detection_result_cache_{name} {cache[name]}"]
+        store = get_writer().stats()
+        for name in ('written', 'dropped', 'failed'):
+            extra += [f"# TYPE error_detection_run_store_{name}_total counter",
+                      f"error_detection_run_store_{name}_total {store[name]}"]
+        for name in ('pending', 'pending_bytes'):
+            extra += [f"# TYPE error_detection_run_store_{name} gauge",
+                      f"error_detection_run_store_{name} {store[name]}"]
+        return HttpResponse(registry.export(extra), content_type='text/plain; version=0.0.4; charset=utf-8')
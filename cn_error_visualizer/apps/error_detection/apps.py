@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ErrorDetectionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.error_detection'
+
+    def ready(self):
+        # Registers the system checks
+        from . import checks
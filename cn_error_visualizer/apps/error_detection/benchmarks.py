@@ -0,0 +1,223 @@
+"""
+Offline micro-benchmarks for the algorithm modules.
+Run with `python manage.py benchmark`; see that command for saving baselines
+and comparing against them.
+"""
+import json
+import platform
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from functools import partial
+
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from .algorithms.checksum import full_adder, run_checksum
+from .algorithms.crc import mod2div, run_crc
+from .algorithms.crc_engine import CRC_PRESETS
+from .algorithms.hamming import run_hamming
+from .algorithms.lrc import run_lrc
+from .algorithms.vrc import run_vrc
+from .services import json_backend
+from .services.bit_utils import xor
+from .services.step_tracker import StepTracker
+
+SIZES = (16, 256, 4096, 65536, 1048576)
+QUICK_SIZES = (16, 256, 4096)
+GENERATORS = {
+    'g4': '1001',
+    'crc-8': CRC_PRESETS['crc-8'],
+    'crc-16-ccitt': CRC_PRESETS['crc-16-ccitt'],
+    'crc-32': CRC_PRESETS['crc-32'],
+}
+# Hamming codes as (parity_bits, extended): table decoding up to 16-bit blocks, computed beyond
+HAMMING_CODES = {
+    '7-4': (3, False),
+    '16-11-secded': (4, True),
+    '64-57-secded': (6, True),
+}
+# Full traces keep one step per bit; past this size they only measure allocation
+FULL_TRACE_MAX_BITS = 65536
+# Bit-by-bit long division runs one Python iteration per input bit
+BITWISE_MAX_BITS = 65536
+# Width of the operands passed to full_adder and xor
+WORD_SIZES = (8, 16, 32, 64, 1024)
+# VRC input sizes whose full traces (about one step per bit) are rendered as JSON
+RENDER_SIZES = (4096, 65536)
+# Peak memory changes smaller than this are allocator noise, not regressions
+MEMORY_NOISE_BYTES = 4096
+
+
+def random_bits(length, seed=0):
+    rng = random.Random(f"{seed}:{length}")
+    return format(rng.getrandbits(length), f'0{length}b')
+
+
+class Case:
+    """
+    One benchmark: `func(*args)` with a stable name used as the baseline key.
+    `payload` marks run_* cases whose result is a full API response.
+    """
+
+    def __init__(self, name, func, args, payload=False):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.payload = payload
+
+    def __call__(self):
+        return self.func(*self.args)
+
+
+def _run_case(run, trace):
+    # Each call gets a fresh tracker so steps do not accumulate across repeats
+    def call(data, *args):
+        return run(data, *args, tracker=StepTracker(trace))
+    return call
+
+
+def build_cases(sizes=SIZES):
+    cases = []
+    for size in sizes:
+        data = random_bits(size)
+        for trace in StepTracker.MODES:
+            if trace == StepTracker.FULL and size > FULL_TRACE_MAX_BITS:
+                continue
+            suffix = f"bits={size}/trace={trace}"
+            cases.append(Case(f"run_vrc/{suffix}", _run_case(run_vrc, trace), (data, False), payload=True))
+            cases.append(Case(f"run_lrc/{suffix}", _run_case(run_lrc, trace), (data, False), payload=True))
+            cases.append(Case(f"run_checksum/{suffix}", _run_case(run_checksum, trace), (data, False), payload=True))
+            for code_name, (parity_bits, extended) in HAMMING_CODES.items():
+                run = partial(run_hamming, parity_bits=parity_bits, extended=extended)
+                cases.append(Case(f"run_hamming/{code_name}/{suffix}", _run_case(run, trace), (data, True), payload=True))
+            for gen_name, generator in GENERATORS.items():
+                cases.append(Case(f"run_crc/{gen_name}/{suffix}", _run_case(run_crc, trace),
+                                  (data, generator, False), payload=True))
+
+        if size <= BITWISE_MAX_BITS:
+            for gen_name, generator in GENERATORS.items():
+                dividend = data + '0' * (len(generator) - 1)
+                cases.append(Case(f"mod2div/{gen_name}/bits={size}", mod2div, (dividend, generator)))
+
+    for size in sizes:
+        if size in RENDER_SIZES:
+            cases.extend(build_render_cases(size))
+
+    for width in WORD_SIZES:
+        a, b = random_bits(width, seed=1), random_bits(width, seed=2)
+        cases.append(Case(f"full_adder/bits={width}", full_adder, (a, b)))
+        cases.append(Case(f"xor/bits={width}", xor, (a, b)))
+    return cases
+
+
+def _render(backend, stream):
+    def call(result):
+        with override_settings(ERROR_DETECTION_JSON_BACKEND=backend):
+            if stream:
+                for _ in json_backend.iter_json(result):
+                    pass
+            else:
+                json_backend.dumps(result)
+    return call
+
+
+def build_render_cases(size):
+    """
+    Renders one large full trace with DRF's stock JSONRenderer and with each
+    json_backend path (whole string and streamed chunks).
+    """
+    result = run_vrc(random_bits(size), tracker=StepTracker(StepTracker.FULL))
+    suffix = f"steps={len(result['steps'])}"
+    cases = [Case(f"render/drf/{suffix}", JSONRenderer().render, (result,))]
+    backends = ['json'] + (['orjson'] if json_backend.orjson is not None else [])
+    for backend in backends:
+        cases.append(Case(f"render/{backend}/{suffix}", _render(backend, False), (result,)))
+        cases.append(Case(f"render/{backend}-stream/{suffix}", _render(backend, True), (result,)))
+    return cases
+
+
+def measure(case, min_time=0.2, repeat=3):
+    """
+    Times `case` in rounds of at least `min_time` seconds and keeps the best
+    round. Peak memory is taken from a separate traced call, since
+    tracemalloc slows down the calls it watches.
+    """
+    best = None
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time or calls == 0:
+            case()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        per_call = elapsed / calls
+        if best is None or per_call < best:
+            best = per_call
+
+    tracemalloc.start()
+    try:
+        result = case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    record = {
+        "ops_per_sec": 1.0 / best if best else float('inf'),
+        "seconds_per_op": best,
+        "peak_bytes": peak,
+    }
+    if case.payload:
+        record["steps"] = len(result["steps"])
+        record["payload_bytes"] = len(json.dumps(result, separators=(',', ':')))
+    return record
+
+
+def run_suite(cases, min_time=0.2, repeat=3, progress=None):
+    results = {}
+    for case in cases:
+        results[case.name] = measure(case, min_time, repeat)
+        if progress:
+            progress(case.name, results[case.name])
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "min_time": min_time,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Regressions of `current` against `baseline` (both run_suite outputs):
+    throughput more than `threshold` below the baseline, or peak memory more
+    than `threshold` above it. Cases missing from either side are ignored.
+    Returns (regressions, improvements) as lists of dicts.
+    """
+    regressions, improvements = [], []
+    base_results = baseline.get("results", {})
+    for name, record in current.get("results", {}).items():
+        base = base_results.get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in (("ops_per_sec", True), ("peak_bytes", False)):
+            old, new = base.get(metric), record.get(metric)
+            if not old or new is None:
+                continue
+            if metric == "peak_bytes" and abs(new - old) < MEMORY_NOISE_BYTES:
+                continue
+            change = (new - old) / old
+            entry = {"case": name, "metric": metric, "baseline": old, "current": new, "change": change}
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(entry)
+            elif -worse > threshold:
+                improvements.append(entry)
+    return regressions, improvements
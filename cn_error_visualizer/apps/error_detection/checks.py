@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+def _local_cache_warning(setting, feature, check_id):
+    # State kept in a per-process cache is lost whenever a follow-up request reaches another worker
+    alias = getattr(settings, setting, 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    if backend.endswith('LocMemCache'):
+        return [Warning(
+            f"{setting} ('{alias}') is a local-memory cache, so {feature} only work with a single worker process.",
+            hint="Point it at a cache shared by all workers (Redis, Memcached or the database cache).",
+            id=check_id,
+        )]
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def check_session_cache(app_configs, **kwargs):
+    return _local_cache_warning('ERROR_DETECTION_SESSION_CACHE', "incremental sessions", 'error_detection.W001')
+
+
+@register(Tags.caches, deploy=True)
+def check_run_cache(app_configs, **kwargs):
+    return _local_cache_warning('ERROR_DETECTION_RUN_CACHE', "paged step requests", 'error_detection.W002')
@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmarks import QUICK_SIZES, SIZES, build_cases, compare, run_suite
+
+
+class Command(BaseCommand):
+    help = ("Micro-benchmarks the algorithm modules over input sizes, CRC generators and trace modes. "
+            "Optionally saves the results as a JSON baseline or fails on regressions against one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quick', action='store_true', help=f"Only sizes {', '.join(map(str, QUICK_SIZES))} bits")
+        parser.add_argument('--only', default='', help="Run cases whose name contains this text")
+        parser.add_argument('--min-time', type=float, default=0.2, help="Minimum seconds per timing round")
+        parser.add_argument('--repeat', type=int, default=3, help="Timing rounds per case (best is kept)")
+        parser.add_argument('--save', metavar='PATH', help="Write the results to a JSON baseline file")
+        parser.add_argument('--compare', metavar='PATH', help="Compare against a saved baseline")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Allowed relative slowdown or memory growth before failing (default 0.2)")
+
+    def handle(self, *args, **options):
+        cases = build_cases(QUICK_SIZES if options['quick'] else SIZES)
+        if options['only']:
+            cases = [case for case in cases if options['only'] in case.name]
+        if not cases:
+            raise CommandError("No benchmark cases match.")
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {e}")
+
+        def progress(name, record):
+            line = f"{name:<48} {record['ops_per_sec']:>14,.1f} ops/s  {record['peak_bytes']:>12,} B peak"
+            if 'steps' in record:
+                line += f"  {record['steps']:>8} steps  {record['payload_bytes']:>12,} B json"
+            self.stdout.write(line)
+
+        report = run_suite(cases, options['min_time'], options['repeat'], progress)
+
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['save']}"))
+
+        if baseline is None:
+            return
+
+        regressions, improvements = compare(baseline, report, options['threshold'])
+        for entry in improvements:
+            self.stdout.write(self.style.SUCCESS(
+                f"improved  {entry['case']} {entry['metric']}: {entry['change']:+.1%}"))
+        for entry in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"regressed {entry['case']} {entry['metric']}: {entry['change']:+.1%} "
+                f"({entry['baseline']:,.1f} -> {entry['current']:,.1f})"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark regression(s) beyond {options['threshold']:.0%}.")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...algorithms.crc_engine import CRC_PRESETS
+from ...services.file_checks import DEFAULT_CHUNK_BYTES, TECHNIQUES, check_file
+
+
+class Command(BaseCommand):
+    help = ("Computes CRC, checksum and LRC over a file of any size, reading it through mmap "
+            "in fixed-size chunks, and reports the throughput.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to check")
+        parser.add_argument('--technique', nargs='+', choices=TECHNIQUES, default=list(TECHNIQUES),
+                            help="Techniques to run (default: all)")
+        parser.add_argument('--preset', choices=sorted(CRC_PRESETS), default='crc-32', help="CRC generator preset")
+        parser.add_argument('--generator', help="CRC generator bits; overrides --preset")
+        parser.add_argument('--block-size', type=int,
+                            help="Checksum word / LRC row width in bits (default: 16 for checksum, 8 for LRC)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_BYTES, help="Bytes per chunk")
+        parser.add_argument('--sidecar', metavar='PATH', help="Write per-chunk check values as JSON lines")
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        generator = options['generator'] or CRC_PRESETS[options['preset']]
+        if not generator or set(generator) - {'0', '1'}:
+            raise CommandError("--generator must contain only 0s and 1s.")
+        if options['block_size'] is not None and not 2 <= options['block_size'] <= 64:
+            raise CommandError("--block-size must be between 2 and 64.")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        try:
+            report = check_file(options['path'], options['technique'], generator, options['block_size'],
+                                options['chunk_size'], options['sidecar'])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for name, result in report['results'].items():
+            self.stdout.write(f"{name:<9} 0x{result['hex']}  ({result['bits']})")
+        throughput = f"{report['mb_per_sec']:,.1f} MB/s" if report['mb_per_sec'] else "n/a"
+        self.stdout.write(f"{report['bytes']:,} bytes in {report['chunks']} chunk(s), "
+                          f"{report['seconds']:.3f} s: {throughput}")
+        if options['sidecar']:
+            self.stdout.write(self.style.SUCCESS(f"Per-chunk results written to {options['sidecar']}"))
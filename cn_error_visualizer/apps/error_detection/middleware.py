@@ -0,0 +1,68 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .services.metrics import PhaseTimer, registry
+
+
+class PhaseTimingMiddleware:
+    """
+    Times API requests by phase and records them in the metrics registry.
+    Views report validation and algorithm time through `timed_phase`; the
+    render phase is measured here, from the moment Django starts rendering the
+    view's response (process_template_response) until it is complete. Must be
+    the last entry in MIDDLEWARE so nothing else runs inside that interval.
+    Works for sync and async views without forcing a thread switch.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = getattr(settings, 'ERROR_DETECTION_METRICS_PREFIX', '/api/')
+        self.server_timing = getattr(settings, 'ERROR_DETECTION_SERVER_TIMING', True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not request.path.startswith(self.prefix):
+            return self.get_response(request)
+        request.phase_timer = PhaseTimer()
+        response = self.get_response(request)
+        self._finish(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not request.path.startswith(self.prefix):
+            return await self.get_response(request)
+        request.phase_timer = PhaseTimer()
+        response = await self.get_response(request)
+        self._finish(request, response)
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before a DRF Response is rendered
+        timer = getattr(request, 'phase_timer', None)
+        if timer is not None:
+            timer.render_started = time.perf_counter()
+        return response
+
+    def _finish(self, request, response):
+        timer = request.phase_timer
+        now = time.perf_counter()
+        if timer.render_started is not None:
+            timer.add("render", now - timer.render_started)
+        total = now - timer.started
+
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+        match = request.resolver_match
+        endpoint = match.url_name if match and match.url_name else "unmatched"
+        registry.record(timer, endpoint, response.status_code, total, size)
+
+        if self.server_timing:
+            response['Server-Timing'] = timer.server_timing(total)
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetectionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_hash', models.CharField(max_length=64)),
+                ('technique', models.CharField(max_length=16)),
+                ('params', models.JSONField(default=dict)),
+                ('data_bits', models.PositiveBigIntegerField()),
+                ('error_detected', models.BooleanField()),
+                ('step_count', models.PositiveIntegerField(default=0)),
+                ('summary', models.JSONField(default=dict)),
+                ('payload', models.BinaryField(null=True)),
+                ('compressed', models.BooleanField(default=False)),
+                ('payload_size', models.PositiveBigIntegerField(default=0)),
+                ('duration', models.FloatField(null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['input_hash'], name='run_input_hash_idx'), models.Index(fields=['technique', '-id'], name='run_technique_id_idx'), models.Index(fields=['created_at'], name='run_created_at_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,41 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class DetectionRun(models.Model):
+    """
+    One computed detection run, written in batches by services.run_store.
+    input_hash is the result cache key (canonical_key of the inputs), so a
+    repeat request finds its stored result through the index. `payload` holds
+    the full result as JSON, trace included, zlib-compressed when `compressed`
+    is set; it is empty when the result was too large to keep. `duration`
+    (seconds the algorithm took, null when it ran out of process) and
+    `payload_size` (uncompressed bytes) tell whether reading the result back
+    beats recomputing it.
+    """
+    input_hash = models.CharField(max_length=64)
+    technique = models.CharField(max_length=16)
+    # Inputs other than the data itself (generator, block_size, trace, ...)
+    params = models.JSONField(default=dict)
+    data_bits = models.PositiveBigIntegerField()
+    error_detected = models.BooleanField()
+    step_count = models.PositiveIntegerField(default=0)
+    # Scalar result fields and short strings (explanation, remainder, ...)
+    summary = models.JSONField(default=dict)
+    payload = models.BinaryField(null=True)
+    compressed = models.BooleanField(default=False)
+    payload_size = models.PositiveBigIntegerField(default=0)
+    duration = models.FloatField(null=True)
+    # Set when the run finishes, not when its batch is flushed
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['input_hash'], name='run_input_hash_idx'),
+            # History pages walk ids downwards, optionally within one technique
+            models.Index(fields=['technique', '-id'], name='run_technique_id_idx'),
+            models.Index(fields=['created_at'], name='run_created_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.technique} run {self.pk} ({self.data_bits} bits)"
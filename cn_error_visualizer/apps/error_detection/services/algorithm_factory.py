@@ -1,29 +1,153 @@
-from ..algorithms.vrc import run_vrc
-from ..algorithms.lrc import run_lrc
-from ..algorithms.crc import run_crc
-from ..algorithms.checksum import run_checksum
+import time
+from multiprocessing import parent_process
+
+from django.conf import settings
+
+from ..algorithms.vrc import run_vrc, verify_vrc
+from ..algorithms.lrc import run_lrc, verify_lrc
+from ..algorithms.crc import run_crc, verify_crc
+from ..algorithms.checksum import run_checksum, verify_checksum
+from ..algorithms.hamming import run_hamming, verify_hamming
+from . import run_store
+from .bit_vector import BitVector
+from .process_pool import get_process_pool, worker_count
+from .step_tracker import StepTracker
+from .result_cache import canonical_key, get_result_cache
+
+# technique value that compares several techniques on one input
+COMPARE = 'all'
+# Every technique, in the order compare() reports them
+TECHNIQUES = ('vrc', 'lrc', 'crc', 'checksum', 'hamming')
+
+
+def _timed_run(params):
+    # Top-level so the process pool can pickle it; returns (result, seconds)
+    started = time.perf_counter()
+    result = AlgorithmFactory.run_algorithm(**params)
+    return result, time.perf_counter() - started
+
 
 class AlgorithmFactory:
     @staticmethod
     def run_algorithm(technique, data, **kwargs):
+        # Results are a pure function of the inputs, so they are memoized.
+        # Runs with a caller-supplied tracker (windows/checkpoints) bypass the cache.
+        # Cache misses are served from the persisted run store when it has them,
+        # and computed runs are queued for it.
+        if kwargs.get('tracker') is not None or not kwargs.get('use_cache', True):
+            return AlgorithmFactory._run(technique, data, **kwargs)
+
+        cache = get_result_cache()
+        key = canonical_key(technique, data, **kwargs)
+        result = cache.get(key)
+        if result is None:
+            result = run_store.lookup(key, len(data))
+            if result is None:
+                started = time.perf_counter()
+                result = AlgorithmFactory._run(technique, data, **kwargs)
+                run_store.record(key, dict(kwargs, technique=technique, data=data), result,
+                                 time.perf_counter() - started)
+            cache.set(key, result)
+            result = dict(result)
+        return result
+
+    @staticmethod
+    def compare(data, techniques=TECHNIQUES, **kwargs):
+        """
+        Runs several techniques on one input, parsed once: every technique gets
+        the same BitVector and the same channel (introduce_error flips bit 0 of
+        each codeword), and each result keeps its own cache entry. Inputs of at
+        least ERROR_DETECTION_COMPARE_PARALLEL_MIN_BITS run concurrently, one
+        technique per process-pool worker, when there is more than one worker.
+        Returns {technique: (result, seconds)} in the order of `techniques`.
+        """
+        bits = BitVector.coerce(data)
+        items = [dict(kwargs, technique=technique, data=bits) for technique in techniques]
+        parallel = (len(items) > 1 and worker_count() > 1 and parent_process() is None
+                    and len(bits) >= getattr(settings, 'ERROR_DETECTION_COMPARE_PARALLEL_MIN_BITS', 65536))
+        if parallel:
+            outcomes = AlgorithmFactory._compare_parallel(items)
+        else:
+            outcomes = [_timed_run(item) for item in items]
+        return dict(zip(techniques, outcomes))
+
+    @staticmethod
+    def _compare_parallel(items):
+        # Techniques in the cache or the run store are answered here, as in run_algorithm;
+        # the others go to the pool and are cached and recorded on return
+        cache = get_result_cache()
+        outcomes, pending = [], []
+        for index, item in enumerate(items):
+            started = time.perf_counter()
+            key = canonical_key(**item)
+            result = cache.get(key)
+            if result is None:
+                result = run_store.lookup(key, len(item['data']))
+                if result is not None:
+                    cache.set(key, result)
+                    result = dict(result)
+            outcomes.append(None if result is None else (result, time.perf_counter() - started))
+            if result is None:
+                pending.append((index, key, item))
+        jobs = [get_process_pool().submit(_timed_run, dict(item, use_cache=False)) for _, _, item in pending]
+        for (index, key, item), job in zip(pending, jobs):
+            result, seconds = job.result()
+            cache.set(key, result)
+            run_store.record(key, item, result, seconds)
+            outcomes[index] = (dict(result), seconds)
+        return outcomes
+
+    @staticmethod
+    def cache_stats():
+        return get_result_cache().stats()
+
+    @staticmethod
+    def _run(technique, data, **kwargs):
         technique = technique.lower()
         introduce_error = kwargs.get('introduce_error', False)
-        
-        # Validation
-        if not all(c in '01' for c in data):
-            # Try to handle or let it fail?
-            # Better to return error structure or let views handle it.
-            # Assuming clean input from view.
-            pass
+        # 'full' (every step), 'summary' (phase boundaries) or 'off' (result only)
+        # A preconfigured tracker (step windows, checkpoints) may be passed in directly
+        tracker = kwargs.get('tracker') or StepTracker(kwargs.get('trace') or StepTracker.FULL)
+        # Data is validated by the API serializers; it may be a '0'/'1' string or a BitVector
+
+        if technique == 'vrc':
+            return run_vrc(data, introduce_error, tracker=tracker)
+        elif technique == 'lrc':
+            return run_lrc(data, introduce_error, tracker=tracker, block_size=kwargs.get('block_size'))
+        elif technique == 'crc':
+            generator = kwargs.get('generator') or '1001'
+            engine = kwargs.get('engine') or 'auto'
+            return run_crc(data, generator, introduce_error, engine, tracker=tracker)
+        elif technique == 'checksum':
+            return run_checksum(data, introduce_error, tracker=tracker, block_size=kwargs.get('block_size'))
+        elif technique == 'hamming':
+            return run_hamming(data, introduce_error, tracker=tracker,
+                               parity_bits=kwargs.get('parity_bits') or 3, extended=bool(kwargs.get('secded')))
+        else:
+            raise ValueError(f"Unknown technique: {technique}")
+
+    @staticmethod
+    def verify(technique, received_data, **kwargs):
+        """
+        Receiver-only check of a codeword: no sender recomputation and no
+        channel. Not cached; the check costs about as much as hashing the key.
+        Raises ValueError when the codeword length cannot fit the technique.
+        """
+        technique = technique.lower()
+        tracker = kwargs.get('tracker') or StepTracker(kwargs.get('trace') or StepTracker.FULL)
 
         if technique == 'vrc':
-            return run_vrc(data, introduce_error)
+            return verify_vrc(received_data, tracker=tracker)
         elif technique == 'lrc':
-            return run_lrc(data, introduce_error)
+            return verify_lrc(received_data, tracker=tracker, block_size=kwargs.get('block_size'))
         elif technique == 'crc':
-            generator = kwargs.get('generator', '1001')
-            return run_crc(data, generator, introduce_error)
+            generator = kwargs.get('generator') or '1001'
+            engine = kwargs.get('engine') or 'auto'
+            return verify_crc(received_data, generator, engine, tracker=tracker)
         elif technique == 'checksum':
-            return run_checksum(data, introduce_error)
+            return verify_checksum(received_data, tracker=tracker, block_size=kwargs.get('block_size'))
+        elif technique == 'hamming':
+            return verify_hamming(received_data, tracker=tracker,
+                                  parity_bits=kwargs.get('parity_bits') or 3, extended=bool(kwargs.get('secded')))
         else:
             raise ValueError(f"Unknown technique: {technique}")
@@ -0,0 +1,101 @@
+import asyncio
+import atexit
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .algorithm_factory import AlgorithmFactory
+from . import run_store
+from .process_pool import get_process_pool, worker_count
+from .result_cache import canonical_key, get_result_cache
+from .step_replay import run_paged
+
+
+class DetectionTimeout(Exception):
+    pass
+
+
+_threads = None
+_threads_lock = threading.Lock()
+# One semaphore per event loop, bounding process-pool jobs in flight
+_process_slots = weakref.WeakKeyDictionary()
+
+
+def get_thread_pool():
+    global _threads
+    with _threads_lock:
+        if _threads is None:
+            _threads = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ERROR_DETECTION_ASYNC_THREADS', 4),
+                thread_name_prefix='error-detection',
+            )
+            atexit.register(_threads.shutdown)
+        return _threads
+
+
+def _slots():
+    loop = asyncio.get_running_loop()
+    slots = _process_slots.get(loop)
+    if slots is None:
+        slots = _process_slots[loop] = asyncio.Semaphore(worker_count())
+    return slots
+
+
+def run_uncached(params):
+    # Top-level so the process pool can pickle it; caching happens in the caller's process
+    return AlgorithmFactory.run_algorithm(use_cache=False, **params)
+
+
+def _is_heavy(params, step_limit):
+    # Paged runs store checkpoints in this process's cache, so they stay on threads
+    if step_limit:
+        return False
+    return len(params['data']) >= getattr(settings, 'ERROR_DETECTION_ASYNC_PROCESS_MIN_BITS', 65536)
+
+
+async def run_detection(params, step_limit=None, timeout=None):
+    """
+    Runs a detection without blocking the event loop.
+    Small inputs go to a bounded thread pool; large ones to the shared process
+    pool, at most one job per worker so the rest wait here, where they can
+    still be cancelled. On timeout or client disconnect a queued job is
+    dropped; a job that already started finishes in the background and its
+    result is still cached for the next identical request.
+    :param timeout: Seconds to wait for the result; raises DetectionTimeout.
+    """
+    cache = get_result_cache()
+    key = None
+    if not step_limit:
+        key = canonical_key(**params)
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    def store(future):
+        if key is not None and not future.cancelled() and future.exception() is None:
+            cache.set(key, future.result())
+            run_store.record(key, params, future.result())
+
+    async def wait(future):
+        future.add_done_callback(store)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    async def dispatch():
+        if step_limit:
+            return await wait(get_thread_pool().submit(run_paged, params, step_limit))
+        if not _is_heavy(params, step_limit):
+            return await wait(get_thread_pool().submit(run_uncached, params))
+        async with _slots():
+            return await wait(get_process_pool().submit(run_uncached, params))
+
+    try:
+        result = await asyncio.wait_for(dispatch(), timeout)
+    except asyncio.TimeoutError:
+        raise DetectionTimeout(f"Detection did not finish within {timeout:g}s.")
+    return dict(result)
@@ -0,0 +1,38 @@
+from django.conf import settings
+
+from .algorithm_factory import AlgorithmFactory
+from . import run_store
+from .process_pool import get_process_pool, worker_count
+from .result_cache import canonical_key
+
+
+def run_item(params):
+    """
+    Runs one batch item, turning failures into a per-item error
+    instead of failing the whole batch.
+    """
+    try:
+        return {"result": AlgorithmFactory.run_algorithm(**params)}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def run_batch(items):
+    """
+    Runs AlgorithmFactory.run_algorithm for every item (a dict of its keyword arguments).
+    Results come back in input order. Batches smaller than
+    ERROR_DETECTION_BATCH_PARALLEL_MIN run inline, since spreading them over
+    the process pool would cost more than the work itself.
+    """
+    workers = worker_count()
+    if workers == 1 or len(items) < getattr(settings, 'ERROR_DETECTION_BATCH_PARALLEL_MIN', 8):
+        return [run_item(item) for item in items]
+
+    # A few chunks per worker keeps pickling overhead low without starving the pool
+    chunksize = max(1, len(items) // (workers * 4))
+    outcomes = list(get_process_pool().map(run_item, items, chunksize=chunksize))
+    # Workers do not write the run store; their results are queued from here
+    for item, outcome in zip(items, outcomes):
+        if "result" in outcome:
+            run_store.record(canonical_key(**item), item, outcome["result"])
+    return outcomes
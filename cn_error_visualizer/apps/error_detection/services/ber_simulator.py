@@ -0,0 +1,164 @@
+import math
+import random
+
+from django.conf import settings
+
+from .algorithm_factory import AlgorithmFactory
+from .bit_utils import default_block_size
+from .process_pool import get_process_pool, worker_count
+from .syndromes import build_check
+
+BSC = 'bsc'
+BURST = 'burst'
+CHANNELS = (BSC, BURST)
+
+
+def wilson_interval(successes, total, z=1.96):
+    """95% Wilson score interval for a binomial proportion."""
+    if total == 0:
+        return [0.0, 1.0]
+    p = successes / total
+    z2 = z * z
+    denom = 1 + z2 / total
+    centre = (p + z2 / (2 * total)) / denom
+    half = z * math.sqrt(p * (1 - p) / total + z2 / (4 * total * total)) / denom
+    return [max(0.0, centre - half), min(1.0, centre + half)]
+
+
+def bsc_errors(rng, length, trials, ber):
+    """
+    Binary symmetric channel over `trials` frames of `length` bits.
+    Yields the flipped positions of every frame that has at least one error.
+    Gaps between flips are drawn from a geometric distribution over the whole
+    stream of frames, so the cost grows with the number of errors, not of bits.
+    """
+    if ber <= 0:
+        return
+    if ber >= 1:
+        every = list(range(length))
+        for _ in range(trials):
+            yield every
+        return
+
+    # Gap to the next flip is floor(log(U) / log(1 - ber)); locals keep the loop tight
+    scale = 1.0 / math.log1p(-ber)
+    draw, log = rng.random, math.log
+    total_bits = length * trials
+    pos = -1
+    frame_start, frame_end = 0, 0
+    positions = []
+    while True:
+        pos += 1 + int(log(1.0 - draw()) * scale)
+        if pos >= total_bits:
+            break
+        if pos >= frame_end:
+            if positions:
+                yield positions
+            frame_start = pos - pos % length
+            frame_end = frame_start + length
+            positions = []
+        positions.append(pos - frame_start)
+    if positions:
+        yield positions
+
+
+def burst_errors(rng, length, trials, burst_length, probability=1.0):
+    """
+    Burst channel: with `probability` per frame, a burst of `burst_length` bits
+    starts at a uniform position. Its first and last bits are flipped, the bits
+    in between are flipped with probability 1/2.
+    """
+    burst_length = min(burst_length, length)
+    inner = max(burst_length - 2, 0)
+    for _ in range(trials):
+        if probability < 1 and rng.random() >= probability:
+            continue
+        start = rng.randrange(length - burst_length + 1)
+        pattern = rng.getrandbits(inner) if inner else 0
+        positions = [start]
+        positions.extend(start + 1 + i for i in range(inner) if (pattern >> i) & 1)
+        if burst_length > 1:
+            positions.append(start + burst_length - 1)
+        yield positions
+
+
+def simulate_batch(task):
+    """
+    Runs one batch of trials. Top-level so it can be sent to the process pool.
+    Returns (errored_frames, undetected_frames).
+    """
+    check, channel, value, trials, seed, burst_probability = task
+    rng = random.Random(seed)
+    if channel == BSC:
+        frames = bsc_errors(rng, check.length, trials, value)
+    else:
+        frames = burst_errors(rng, check.length, trials, value, burst_probability)
+
+    errored = undetected = 0
+    detects = check.detects
+    for positions in frames:
+        errored += 1
+        if not detects(positions):
+            undetected += 1
+    return errored, undetected
+
+
+def run_simulation(techniques, data, channel=BSC, values=(1e-3,), trials=10000, seed=0,
+                   generator=None, block_size=None, burst_probability=1.0):
+    """
+    Monte Carlo detection rates of each technique for the frame `data`.
+    :param values: BERs to sweep for the BSC channel, burst lengths for the burst channel.
+    Trials are split into fixed-size batches whose RNG streams are seeded from
+    (seed, technique, channel, value, batch index), so results do not depend on
+    how many workers ran them.
+    """
+    batch_trials = getattr(settings, 'ERROR_DETECTION_SIMULATION_BATCH', 50000)
+
+    tasks, owners = [], []
+    points = []
+    for technique in techniques:
+        effective_block = block_size or default_block_size(len(data))
+        # Internal codeword: kept out of the result cache, the run store and the metrics
+        codeword = AlgorithmFactory.run_algorithm(
+            technique, data, generator=generator, block_size=effective_block, trace='off', use_cache=False,
+        )['transmitted_data']
+        check = build_check(technique, codeword, generator=generator, block_size=effective_block)
+
+        for value in values:
+            point = {
+                "technique": technique,
+                "channel": channel,
+                ("ber" if channel == BSC else "burst_length"): value,
+                "codeword_bits": check.length,
+                "trials": trials,
+            }
+            points.append(point)
+            for index, start in enumerate(range(0, trials, batch_trials)):
+                batch_seed = f"{seed}:{technique}:{channel}:{value}:{index}"
+                tasks.append((check, channel, value, min(batch_trials, trials - start), batch_seed, burst_probability))
+                owners.append(len(points) - 1)
+
+    if worker_count() > 1 and len(tasks) > 1:
+        outcomes = get_process_pool().map(simulate_batch, tasks)
+    else:
+        outcomes = map(simulate_batch, tasks)
+
+    totals = [[0, 0] for _ in points]
+    for owner, (errored, undetected) in zip(owners, outcomes):
+        totals[owner][0] += errored
+        totals[owner][1] += undetected
+
+    for point, (errored, undetected) in zip(points, totals):
+        detected = errored - undetected
+        point.update({
+            "clean": point["trials"] - errored,
+            "detected": detected,
+            "undetected": undetected,
+            # Share of errored frames that were caught
+            "detection_rate": detected / errored if errored else None,
+            "detection_ci": wilson_interval(detected, errored),
+            # Share of all frames delivered corrupted without detection
+            "undetected_rate": undetected / point["trials"],
+            "undetected_ci": wilson_interval(undetected, point["trials"]),
+        })
+    return points
@@ -1,23 +1,38 @@
+from .bit_vector import BitVector
+
+
 def xor(a, b):
     """
-    Performs bitwise XOR on two binary strings of equal length.
-    Returns the result as a binary string.
+    Performs bitwise XOR on two bit sequences of equal length.
+    Accepts BitVectors or binary strings; returns the same type as `b`.
     """
-    res = []
-    for i in range(len(b)):
-        if a[i] == b[i]:
-            res.append('0')
-        else:
-            res.append('1')
-    return "".join(res)
+    if isinstance(b, BitVector):
+        return BitVector.coerce(a) ^ b
+    width = len(b)
+    result = BitVector.from_string(a[:width]) ^ BitVector.from_string(b)
+    return result.to_string()
+
 
 def calculate_parity(bits):
     """
     Returns '1' if number of 1s is odd, '0' otherwise.
-    Manual counting implementation.
+    Counts with a single popcount over the packed bits.
+    """
+    return '1' if BitVector.coerce(bits).parity() else '0'
+
+
+def default_block_size(data_length):
+    """
+    Block size used by LRC and checksum when none is requested:
+    4 bits for inputs of up to 16 bits, 8 bits otherwise.
+    """
+    return 4 if data_length <= 16 else 8
+
+
+def codeword_block_size(codeword_length):
+    """
+    The default_block_size the sender used for an LRC/checksum codeword of
+    this length: the padded data plus one 4-bit check block is at most 20 bits
+    exactly when the data was at most 16 bits.
     """
-    ones = 0
-    for bit in bits:
-        if bit == '1':
-            ones += 1
-    return '1' if ones % 2 != 0 else '0'
+    return 4 if codeword_length <= 20 else 8
@@ -0,0 +1,184 @@
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(value):
+        return bin(value).count('1')
+
+
+class BitVector:
+    """
+    Fixed-length bit sequence packed into a Python int.
+    Index 0 is the leftmost (most significant) bit, matching the '0'/'1'
+    strings used by the API, so slicing and indexing behave like the string form.
+    """
+    __slots__ = ('value', 'length')
+
+    def __init__(self, value=0, length=0):
+        self.value = value
+        self.length = length
+
+    @classmethod
+    def from_string(cls, bits):
+        return cls(int(bits, 2) if bits else 0, len(bits))
+
+    @classmethod
+    def from_bytes(cls, data, length=None):
+        """
+        Bits of `data`, most significant bit of the first byte first.
+        :param length: Keep only the first `length` bits (default: all of them).
+        """
+        total = len(data) * 8
+        if length is None:
+            length = total
+        elif length > total:
+            raise ValueError(f"bit_length {length} exceeds the {total} bits supplied")
+        return cls(int.from_bytes(data, 'big') >> (total - length), length)
+
+    @classmethod
+    def coerce(cls, bits):
+        # Accepts either a BitVector or a '0'/'1' string
+        if isinstance(bits, cls):
+            return bits
+        return cls.from_string(bits)
+
+    @classmethod
+    def zeros(cls, length):
+        return cls(0, length)
+
+    @classmethod
+    def ones(cls, length):
+        return cls((1 << length) - 1, length)
+
+    @property
+    def mask(self):
+        return (1 << self.length) - 1
+
+    def to_string(self):
+        if not self.length:
+            return ''
+        return format(self.value, '0{}b'.format(self.length))
+
+    __str__ = to_string
+
+    def to_bytes(self):
+        # Zero-padded on the right to a whole number of bytes
+        pad = -self.length % 8
+        return (self.value << pad).to_bytes((self.length + pad) // 8, 'big')
+
+    def __repr__(self):
+        return "BitVector('{}')".format(self.to_string())
+
+    def __len__(self):
+        return self.length
+
+    def __int__(self):
+        return self.value
+
+    def __eq__(self, other):
+        if not isinstance(other, BitVector):
+            return NotImplemented
+        return self.length == other.length and self.value == other.value
+
+    def __hash__(self):
+        return hash((self.value, self.length))
+
+    def __iter__(self):
+        # Shifting a large int per bit is quadratic; go through the string form once
+        return map(int, self.to_string())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step != 1:
+                raise ValueError("BitVector slices do not support a step")
+            width = max(stop - start, 0)
+            return BitVector((self.value >> (self.length - start - width)) & ((1 << width) - 1), width)
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError("BitVector index out of range")
+        return (self.value >> (self.length - 1 - key)) & 1
+
+    def _check_length(self, other):
+        if self.length != other.length:
+            raise ValueError("BitVector lengths differ: {} != {}".format(self.length, other.length))
+
+    def __xor__(self, other):
+        self._check_length(other)
+        return BitVector(self.value ^ other.value, self.length)
+
+    def __and__(self, other):
+        self._check_length(other)
+        return BitVector(self.value & other.value, self.length)
+
+    def __or__(self, other):
+        self._check_length(other)
+        return BitVector(self.value | other.value, self.length)
+
+    def __invert__(self):
+        return BitVector(self.value ^ self.mask, self.length)
+
+    def __lshift__(self, count):
+        # Logical shift, length is preserved
+        return BitVector((self.value << count) & self.mask, self.length)
+
+    def __rshift__(self, count):
+        return BitVector(self.value >> count, self.length)
+
+    def __add__(self, other):
+        # Concatenation, like string +
+        return BitVector((self.value << other.length) | other.value, self.length + other.length)
+
+    def count(self):
+        """Number of 1 bits (popcount)."""
+        return _popcount(self.value)
+
+    def parity(self):
+        """1 if the number of 1 bits is odd, 0 otherwise."""
+        return _popcount(self.value) & 1
+
+    def xor_fold(self, size):
+        """
+        XOR of all `size`-bit blocks (blocks aligned to the right end), i.e. the
+        even-parity bit of every column when the blocks are stacked as rows.
+        Folds the upper half of the blocks onto the lower half until one block
+        is left, so the work is a handful of big-int operations, not one per block.
+        """
+        value = self.value
+        count = -(-self.length // size)
+        while count > 1:
+            keep = count - count // 2
+            low_bits = keep * size
+            value = (value & ((1 << low_bits) - 1)) ^ (value >> low_bits)
+            count = keep
+        return value
+
+    def ones_complement_sum(self, size):
+        """
+        One's complement (end-around carry) sum of the `size`-bit blocks,
+        blocks aligned to the right end as if left-padded with zeros.
+        Since 2^size = 1 mod (2^size - 1), the sum is just value mod (2^size - 1),
+        except that a non-zero input never sums to 0 (it gives all 1s instead).
+        """
+        modulus = (1 << size) - 1
+        if not self.value:
+            return 0
+        return self.value % modulus or modulus
+
+    def flip(self, index):
+        return BitVector(self.value ^ (1 << (self.length - 1 - index)), self.length)
+
+    def pad_left(self, count):
+        return BitVector(self.value, self.length + count)
+
+    def pad_right(self, count):
+        return BitVector(self.value << count, self.length + count)
+
+    def blocks(self, size):
+        """
+        Splits into consecutive blocks of `size` bits (the last one may be shorter),
+        like [bits[i:i+size] for i in range(0, len(bits), size)].
+        """
+        bits = self.to_string()
+        return [BitVector(int(bits[i:i + size], 2), len(bits[i:i + size]))
+                for i in range(0, self.length, size)]
@@ -0,0 +1,101 @@
+import base64
+import binascii
+
+from .bit_vector import BitVector
+
+BINARY = 'binary'
+HEX = 'hex'
+BASE64 = 'base64'
+# Body sent as application/octet-stream; answered in base64, since JSON cannot carry raw bytes
+RAW = 'raw'
+ENCODINGS = (BINARY, HEX, BASE64)
+
+# Result fields holding bit strings that are re-encoded for the response
+DATA_FIELDS = ('original_data', 'transmitted_data', 'received_data', 'corrected_data')
+
+
+def parse_bit_string(text):
+    """
+    BitVector of a '0'/'1' string, or None if it holds anything else.
+    int(text, 2) checks every character in C, in linear time; it also
+    accepts a sign, a '0b' prefix, underscores, surrounding spaces and
+    non-ASCII digits, which are ruled out first.
+    """
+    if not text or not text.isascii() or text[0] not in '01' or text[-1] not in '01' or '_' in text:
+        return None
+    if len(text) > 1 and text[1] in 'bB':
+        return None
+    try:
+        value = int(text, 2)
+    except ValueError:
+        return None
+    return BitVector(value, len(text))
+
+
+def is_bit_string(text):
+    return parse_bit_string(text) is not None
+
+
+def decode_data(data, encoding=BINARY, bit_length=None):
+    """
+    Parses request data into a BitVector.
+    :param data: Text for binary/hex/base64, bytes for raw.
+    :param bit_length: Number of leading bits to keep; hex, base64 and raw
+                       data otherwise always carry a multiple of 8 bits.
+    Raises ValueError with a user-facing message on malformed input.
+    """
+    if encoding == BINARY:
+        bits = parse_bit_string(data)
+        if bits is None:
+            raise ValueError("Data must contain only 0s and 1s.")
+        if bit_length is not None:
+            if bit_length > len(bits):
+                raise ValueError(f"bit_length {bit_length} exceeds the {len(bits)} bits supplied")
+            bits = bits[:bit_length]
+        return bits
+
+    if encoding == HEX:
+        try:
+            raw = binascii.unhexlify(data)
+        except (binascii.Error, ValueError):
+            raise ValueError("Data must be an even number of hexadecimal digits.")
+    elif encoding == BASE64:
+        try:
+            raw = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            raise ValueError("Data must be valid base64.")
+    elif encoding == RAW:
+        raw = bytes(data)
+    else:
+        raise ValueError(f"Unknown encoding: {encoding}")
+
+    if not raw:
+        raise ValueError("Data must not be empty.")
+    return BitVector.from_bytes(raw, bit_length)
+
+
+def encode_bits(bits, encoding=BINARY):
+    # Inverse of decode_data for the response; raw input is answered in base64
+    bits = BitVector.coerce(bits)
+    if encoding == BINARY:
+        return str(bits)
+    if encoding == HEX:
+        return bits.to_bytes().hex()
+    return base64.b64encode(bits.to_bytes()).decode('ascii')
+
+
+def encode_result_data(result, encoding):
+    """
+    Re-encodes the data fields of a result for non-binary requests and adds
+    their exact bit lengths, which hex/base64 round up to whole bytes.
+    """
+    if encoding == BINARY:
+        return result
+    result = dict(result)
+    for field in DATA_FIELDS:
+        value = result.get(field)
+        if isinstance(value, str):
+            result[field] = encode_bits(value, encoding)
+            result[field.replace('_data', '_bits')] = len(value)
+    result['data_encoding'] = BASE64 if encoding == RAW else encoding
+    return result
@@ -0,0 +1,225 @@
+import binascii
+import json
+import mmap
+import os
+import time
+import zlib
+from math import gcd
+
+from ..algorithms.crc_engine import CRC_PRESETS, crc_register, parse_generator
+from .bit_vector import BitVector
+
+TECHNIQUES = ("crc", "checksum", "lrc")
+DEFAULT_CHUNK_BYTES = 1 << 20
+
+# Bit-reversal of every byte value. zlib's CRC-32 is the reflected algorithm:
+# feeding it bit-reversed bytes runs the plain MSB-first division, with the
+# register bit-reversed as well.
+_REVERSED_BYTES = bytes(int(format(byte, '08b')[::-1], 2) for byte in range(256))
+
+
+def _reverse_bits(value, width):
+    return int(format(value, f'0{width}b')[::-1], 2)
+
+
+class CRCDigest:
+    """
+    Running CRC remainder over byte chunks: the remainder run_crc appends to
+    the same bytes (zero initial register, no reflection, no final XOR).
+    crc-32 runs in zlib and crc-16-ccitt in binascii (CRC-16/XMODEM is exactly
+    this division); other generators use the table engine in Python.
+    """
+    name = "crc"
+
+    def __init__(self, generator):
+        self.generator = generator
+        self.poly, self.width = parse_generator(generator)
+        self.register = 0
+        if generator == CRC_PRESETS['crc-32']:
+            self._update = self._update_zlib
+        elif generator == CRC_PRESETS['crc-16-ccitt']:
+            self._update = self._update_hqx
+        else:
+            self._update = self._update_table
+
+    def fresh(self):
+        return CRCDigest(self.generator)
+
+    def _update_zlib(self, chunk):
+        # zlib complements the register on the way in and out; the stored
+        # register is the plain one, bit-reversed back at the end.
+        reflected = _reverse_bits(self.register, 32)
+        reflected = ~zlib.crc32(bytes(chunk).translate(_REVERSED_BYTES), reflected ^ 0xFFFFFFFF) & 0xFFFFFFFF
+        self.register = _reverse_bits(reflected, 32)
+
+    def _update_hqx(self, chunk):
+        self.register = binascii.crc_hqx(chunk, self.register)
+
+    def _update_table(self, chunk):
+        self.register = crc_register(BitVector.from_bytes(chunk), self.poly, self.width, self.register)
+
+    def update(self, chunk):
+        if len(chunk):
+            self._update(chunk)
+
+    def result(self):
+        return _check_result(self.register, self.width, generator=self.generator)
+
+
+class ChecksumDigest:
+    """
+    Running one's complement checksum over byte chunks, as run_checksum
+    computes it for the whole input (words aligned to the end of the data).
+    """
+    name = "checksum"
+
+    def __init__(self, block_size=16):
+        self.block_size = block_size
+        self.modulus = (1 << block_size) - 1
+        self.accumulator = 0
+        self.nonzero = False
+
+    def fresh(self):
+        return ChecksumDigest(self.block_size)
+
+    def update(self, chunk):
+        value = int.from_bytes(chunk, 'big')
+        shift = (8 * len(chunk)) % self.block_size
+        self.accumulator = ((self.accumulator << shift) + value % self.modulus) % self.modulus
+        self.nonzero = self.nonzero or value != 0
+
+    def result(self):
+        total = (self.accumulator or self.modulus) if self.nonzero else 0
+        return _check_result(self.modulus ^ total, self.block_size, block_size=self.block_size)
+
+
+class LRCDigest:
+    """
+    Running LRC block over byte chunks: the column parity run_lrc computes
+    after padding the data on the right to whole blocks. Bytes that do not
+    yet fill a whole number of blocks are held until the next chunk.
+    """
+    name = "lrc"
+
+    def __init__(self, block_size=8):
+        self.block_size = block_size
+        # Smallest number of bytes that is also a whole number of blocks
+        self.align = block_size // gcd(block_size, 8)
+        self.accumulator = 0
+        self.pending = b''
+
+    def fresh(self):
+        return LRCDigest(self.block_size)
+
+    def update(self, chunk):
+        if self.pending:
+            chunk = self.pending + bytes(chunk)
+        usable = len(chunk) - len(chunk) % self.align
+        self.pending = bytes(chunk[usable:])
+        if usable:
+            self.accumulator ^= BitVector.from_bytes(chunk[:usable]).xor_fold(self.block_size)
+
+    def result(self):
+        value = self.accumulator
+        if self.pending:
+            tail = BitVector.from_bytes(self.pending)
+            tail = tail.pad_right(-len(tail) % self.block_size)
+            value ^= tail.xor_fold(self.block_size)
+        return _check_result(value, self.block_size, block_size=self.block_size)
+
+
+def _check_result(value, width, **extra):
+    result = {"bits": str(BitVector(value, width)), "hex": format(value, f'0{-(-width // 4)}x')}
+    result.update(extra)
+    return result
+
+
+def build_digests(techniques, generator=None, block_size=None):
+    """
+    One digest per technique. block_size defaults to 16 for the checksum
+    (the RFC 1071 Internet checksum word) and 8 for LRC (byte columns).
+    """
+    digests = []
+    for technique in techniques:
+        if technique == "crc":
+            digests.append(CRCDigest(generator or CRC_PRESETS['crc-32']))
+        elif technique == "checksum":
+            digests.append(ChecksumDigest(block_size or 16))
+        elif technique == "lrc":
+            digests.append(LRCDigest(block_size or 8))
+        else:
+            raise ValueError(f"Unknown technique: {technique}")
+    return digests
+
+
+def run_checks(chunks, digests, on_chunk=None):
+    """
+    Feeds byte chunks (bytes or memoryviews) through every digest.
+    :param on_chunk: Called as on_chunk(index, offset, length, results) with
+                     each chunk's own check values; computing them costs a
+                     second pass over the chunk, so only pass it when needed.
+    Returns the results with the byte count, elapsed time and throughput.
+    """
+    total = 0
+    index = 0
+    started = time.perf_counter()
+    for chunk in chunks:
+        for digest in digests:
+            digest.update(chunk)
+        if on_chunk is not None:
+            results = {}
+            for digest in digests:
+                own = digest.fresh()
+                own.update(chunk)
+                results[digest.name] = own.result()
+            on_chunk(index, total, len(chunk), results)
+        total += len(chunk)
+        index += 1
+    seconds = time.perf_counter() - started
+    return {
+        "bytes": total,
+        "chunks": index,
+        "seconds": round(seconds, 6),
+        "mb_per_sec": round(total / seconds / 1e6, 3) if seconds > 0 else None,
+        "results": {digest.name: digest.result() for digest in digests},
+    }
+
+
+def iter_file_chunks(path, chunk_size=DEFAULT_CHUNK_BYTES):
+    """
+    Zero-copy memoryview slices of a memory-mapped file. Pages are mapped
+    read-only and file-backed, so memory use does not grow with the file.
+    Callers must not keep the slices after moving on to the next one.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, 'madvise'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    chunk = view[offset:offset + chunk_size]
+                    yield chunk
+                    chunk.release()
+            finally:
+                view.release()
+
+
+def check_file(path, techniques=TECHNIQUES, generator=None, block_size=None, chunk_size=DEFAULT_CHUNK_BYTES,
+               sidecar=None):
+    """
+    CRC / checksum / LRC of a file of any size in constant memory.
+    :param sidecar: Optional path of a JSON-lines file receiving the check
+                    values of every chunk, to locate corruption later.
+    """
+    digests = build_digests(techniques, generator, block_size)
+    if sidecar is None:
+        return run_checks(iter_file_chunks(path, chunk_size), digests)
+
+    with open(sidecar, 'w') as out:
+        def write_chunk(index, offset, length, results):
+            out.write(json.dumps({"index": index, "offset": offset, "length": length, "results": results}) + "\n")
+        return run_checks(iter_file_chunks(path, chunk_size), digests, on_chunk=write_chunk)
@@ -0,0 +1,70 @@
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is used alone without it
+    brotli = None
+
+BROTLI = "br"
+GZIP = "gzip"
+
+
+def available_codings():
+    # In order of preference
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def negotiate(accept_encoding):
+    """
+    Content coding for an Accept-Encoding header: the preferred coding the
+    client accepts with a non-zero q-value, or None for an uncompressed body.
+    """
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for coding in available_codings():
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def _compressor(coding):
+    # Fast levels: a trace is compressed on every full response, and its
+    # repetitive JSON shrinks almost as much as at the slowest level.
+    if coding == BROTLI:
+        return brotli.Compressor(quality=getattr(settings, 'ERROR_DETECTION_BROTLI_QUALITY', 4))
+    # wbits 31: zlib stream with a gzip header and trailer
+    return zlib.compressobj(getattr(settings, 'ERROR_DETECTION_GZIP_LEVEL', 5), zlib.DEFLATED, 31)
+
+
+def compress(body, coding):
+    compressor = _compressor(coding)
+    if coding == BROTLI:
+        return compressor.process(body) + compressor.finish()
+    return compressor.compress(body) + compressor.flush()
+
+
+def iter_compress(chunks, coding):
+    # Compresses a streamed body chunk by chunk; chunks that compress to nothing are held back
+    compressor = _compressor(coding)
+    if coding == BROTLI:
+        process, finish = compressor.process, compressor.finish
+    else:
+        process, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
@@ -0,0 +1,217 @@
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..algorithms.crc_engine import crc_register, parse_generator
+from .bit_utils import codeword_block_size, default_block_size
+from .bit_vector import BitVector
+
+SESSION_CACHE_KEY = "error_detection:session:{}"
+SESSION_LOCK_KEY = "error_detection:session-lock:{}"
+
+ENCODE = "encode"
+VERIFY = "verify"
+MODES = (ENCODE, VERIFY)
+TECHNIQUES = ("crc", "checksum")
+
+# Checksums without a fixed block size accumulate modulo 2^8 - 1; 2^4 - 1 = 15
+# divides 255, so the sum for either default block size can be derived at the end.
+_DEFAULT_ACCUMULATOR_BITS = 8
+
+
+class SessionError(Exception):
+    """
+    A chunk arrived out of order (its offset does not match the bits received
+    so far), or another request is updating the session at the same time.
+    """
+
+    def __init__(self, message, bits_received=None):
+        super().__init__(message)
+        self.bits_received = bits_received
+
+
+def new_state(technique, generator=None, block_size=None):
+    """
+    Empty running state of a CRC or checksum over a stream of chunks.
+    State is a plain dict so it can be stored in any Django cache.
+    """
+    state = {"technique": technique, "length": 0}
+    if technique == "crc":
+        poly, width = parse_generator(generator or "1001")
+        state.update(generator=generator or "1001", poly=poly, width=width, register=0, tail=0, tail_length=0)
+    elif technique == "checksum":
+        state.update(block_size=block_size, accumulator=0, nonzero=False)
+    else:
+        raise ValueError(f"Incremental sessions support crc and checksum, not {technique}")
+    return state
+
+
+def update(state, chunk):
+    """
+    Feeds the next chunk (BitVector or '0'/'1' string) into the state, in place.
+    Costs time proportional to the chunk only.
+    - CRC: the register absorbs everything but the last `width` bits seen, which
+      are held back because a receiver adds them to the remainder instead
+      (table_mod2div does the same split on a whole message).
+    - Checksum: the one's complement sum of right-aligned blocks is the stream's
+      value mod 2^b - 1, so each chunk shifts the accumulator by its length mod b.
+    """
+    chunk = BitVector.coerce(chunk)
+    n = len(chunk)
+    if state["technique"] == "crc":
+        width = state["width"]
+        combined = (state["tail"] << n) | chunk.value
+        combined_length = state["tail_length"] + n
+        if combined_length > width:
+            feed = BitVector(combined >> width, combined_length - width)
+            state["register"] = crc_register(feed, state["poly"], width, state["register"])
+            state["tail"] = combined & ((1 << width) - 1)
+            state["tail_length"] = width
+        else:
+            state["tail"], state["tail_length"] = combined, combined_length
+    else:
+        bits = state["block_size"] or _DEFAULT_ACCUMULATOR_BITS
+        modulus = (1 << bits) - 1
+        state["accumulator"] = ((state["accumulator"] << (n % bits)) + chunk.value % modulus) % modulus
+        state["nonzero"] = state["nonzero"] or chunk.value != 0
+    state["length"] += n
+    return state
+
+
+def finalize(state, mode=ENCODE):
+    """
+    Result for the whole stream, identical to the one-shot functions:
+    - encode: the CRC remainder / checksum run_crc / run_checksum append.
+    - verify: the receiver check of verify_crc / verify_checksum, treating the
+      stream as a received codeword.
+    Raises ValueError when the stream is too short or misaligned for `mode`.
+    """
+    length = state["length"]
+    if not length:
+        raise ValueError("No data has been appended.")
+    if state["technique"] == "crc":
+        return _finalize_crc(state, mode)
+    return _finalize_checksum(state, mode)
+
+
+def _finalize_crc(state, mode):
+    width, tail = state["width"], BitVector(state["tail"], state["tail_length"])
+    if mode == ENCODE:
+        remainder = crc_register(tail, state["poly"], width, state["register"])
+        return {"technique": "crc", "data_bits": state["length"], "generator": state["generator"],
+                "remainder": str(BitVector(remainder, width))}
+
+    if state["length"] < width + 1:
+        raise ValueError(f"A CRC codeword for a {width + 1}-bit generator has at least {width + 1} bits.")
+    syndrome = state["register"] ^ tail.value
+    error_detected = syndrome != 0
+    return {"technique": "crc", "received_bits": state["length"], "generator": state["generator"],
+            "syndrome": str(BitVector(syndrome, width)), "error_detected": error_detected,
+            "explanation": "Detected error via non-zero remainder" if error_detected else "Transmission clean"}
+
+
+def _finalize_checksum(state, mode):
+    length = state["length"]
+    block_size = state["block_size"]
+    if block_size is None:
+        block_size = default_block_size(length) if mode == ENCODE else codeword_block_size(length)
+    modulus = (1 << block_size) - 1
+    # Same value as BitVector.ones_complement_sum over the whole stream
+    total = (state["accumulator"] % modulus or modulus) if state["nonzero"] else 0
+
+    if mode == ENCODE:
+        return {"technique": "checksum", "data_bits": length, "block_size": block_size,
+                "checksum": str(BitVector(modulus ^ total, block_size))}
+
+    if length < 2 * block_size or length % block_size:
+        raise ValueError(f"A checksum codeword is a whole number of {block_size}-bit words, at least two.")
+    is_valid = total == modulus
+    return {"technique": "checksum", "received_bits": length, "block_size": block_size,
+            "syndrome": str(BitVector(modulus ^ total, block_size)), "error_detected": not is_valid,
+            "explanation": "Valid (All 1s in sum)" if is_valid else "Error Detected (Sum not all 1s)"}
+
+
+# --- Server-side sessions ---
+# Kept in the ERROR_DETECTION_SESSION_CACHE cache; every append renews the TTL.
+# With several worker processes that cache must be shared (Redis, Memcached,
+# database): a LocMemCache is private to each process. Updates hold a per-session
+# lock taken with cache.add, which is atomic on those backends, so a chunk
+# sent while another is still being applied is refused (SessionError) instead
+# of overwriting it; `offset` also lets clients detect a lost or repeated chunk.
+
+def _cache():
+    return caches[getattr(settings, 'ERROR_DETECTION_SESSION_CACHE', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'ERROR_DETECTION_SESSION_TTL', 15 * 60)
+
+
+@contextmanager
+def _locked(session_id):
+    # The lock expires on its own if the process holding it dies
+    cache = _cache()
+    lock_key = SESSION_LOCK_KEY.format(session_id)
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, timeout=getattr(settings, 'ERROR_DETECTION_SESSION_LOCK_TIMEOUT', 60)):
+        session = load_session(session_id)
+        raise SessionError("Another request is updating this session; send the chunk again.",
+                           session["state"]["length"] if session is not None else None)
+    try:
+        yield
+    finally:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def create_session(technique, mode=ENCODE, generator=None, block_size=None):
+    session_id = uuid.uuid4().hex
+    session = {"mode": mode, "state": new_state(technique, generator, block_size)}
+    _cache().set(SESSION_CACHE_KEY.format(session_id), session, timeout=_timeout())
+    return session_id
+
+
+def load_session(session_id):
+    return _cache().get(SESSION_CACHE_KEY.format(session_id))
+
+
+def append_chunk(session_id, chunk, offset=None):
+    """
+    Applies a chunk under the session lock and returns the number of bits
+    received, or None when the session has expired.
+    :param offset: Bit position the client believes the chunk starts at;
+                   SessionError if it differs from the bits received so far.
+    """
+    with _locked(session_id):
+        session = load_session(session_id)
+        if session is None:
+            return None
+        state = session["state"]
+        if offset is not None and offset != state["length"]:
+            raise SessionError(f"Chunk offset {offset} does not match the {state['length']} bits received.",
+                               state["length"])
+        update(state, chunk)
+        _cache().set(SESSION_CACHE_KEY.format(session_id), session, timeout=_timeout())
+        return state["length"]
+
+
+def finalize_session(session_id):
+    """
+    Result of the whole stream, or None when the session has expired.
+    The session is kept if the stream cannot be finalized yet (ValueError).
+    """
+    with _locked(session_id):
+        session = load_session(session_id)
+        if session is None:
+            return None
+        result = finalize(session["state"], session["mode"])
+        _cache().delete(SESSION_CACHE_KEY.format(session_id))
+        return result
+
+
+def delete_session(session_id):
+    # Under the lock, so an append in progress cannot store the session again
+    with _locked(session_id):
+        _cache().delete(SESSION_CACHE_KEY.format(session_id))
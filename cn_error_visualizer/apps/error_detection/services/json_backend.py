@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional accelerated backend
+    orjson = None
+
+# Steps per chunk when streaming a trace
+STREAM_CHUNK_STEPS = 256
+
+_fallback_encoder = JSONEncoder()
+
+
+def backend_name():
+    """
+    JSON backend selected by ERROR_DETECTION_JSON_BACKEND: 'orjson', 'json'
+    (standard library), or 'auto' for orjson when it is installed.
+    """
+    choice = getattr(settings, 'ERROR_DETECTION_JSON_BACKEND', 'auto')
+    if choice == 'orjson' and orjson is None:
+        raise ImproperlyConfigured("ERROR_DETECTION_JSON_BACKEND is 'orjson' but orjson is not installed.")
+    if choice == 'json' or orjson is None:
+        return 'json'
+    return 'orjson'
+
+
+def dumps(obj):
+    # Compact UTF-8 JSON bytes; types JSON lacks (dates, decimals, ...) go through DRF's encoder
+    if backend_name() == 'orjson':
+        try:
+            return orjson.dumps(obj, default=_fallback_encoder.default)
+        except TypeError:
+            # Non-string keys (list indexes in validation errors) become strings,
+            # as with json; the option slows down every dump, so it is only a retry
+            return orjson.dumps(obj, default=_fallback_encoder.default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, cls=JSONEncoder, ensure_ascii=False, allow_nan=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    if backend_name() == 'orjson':
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def iter_json(result, chunk_steps=STREAM_CHUNK_STEPS):
+    """
+    Encodes a result piece by piece: the fields around `steps` first, then the
+    steps a chunk at a time, so a large trace is never held as one string.
+    Yields bytes that join to a JSON object equal to dumps(result).
+    """
+    steps = result["steps"]
+    head = {key: value for key, value in result.items() if key != "steps"}
+    if head:
+        yield dumps(head)[:-1] + b',"steps":['
+    else:
+        yield b'{"steps":['
+    for start in range(0, len(steps), chunk_steps):
+        chunk = dumps(steps[start:start + chunk_steps])[1:-1]
+        yield chunk if start == 0 else b',' + chunk
+    yield b']}'
+
+
+async def aiter_json(result, chunk_steps=STREAM_CHUNK_STEPS):
+    # iter_json for ASGI responses; yields control to the event loop between chunks
+    for piece in iter_json(result, chunk_steps):
+        yield piece
+        await asyncio.sleep(0)
+
+
+def should_stream(result):
+    # Step lists above ERROR_DETECTION_STREAM_MIN_STEPS are streamed instead of rendered at once
+    steps = result.get("steps")
+    return isinstance(steps, list) and len(steps) >= getattr(settings, 'ERROR_DETECTION_STREAM_MIN_STEPS', 5000)
@@ -0,0 +1,158 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STEP_BUCKETS = (0, 10, 100, 1000, 10000, 100000, 1000000)
+SIZE_BUCKETS = (1000, 10000, 100000, 1000000, 10000000, 100000000)
+
+PHASES = ("validate", "algorithm", "render")
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label tuple."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        # Counts are kept per bucket and accumulated when exported
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def export(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            labels = _format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._series = {}
+
+    def inc(self, label_values, amount=1):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def export(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{{{_format_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _format_labels(names, values):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+class MetricsRegistry:
+    """
+    Request metrics of this process, exported in the Prometheus text format.
+    Each server process keeps its own registry; Prometheus sums them when it
+    scrapes every worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        labels = ("endpoint", "technique")
+        self.requests = Counter("error_detection_requests_total", "Requests handled.", labels + ("status",))
+        self.latency = Histogram("error_detection_request_seconds", "Total request latency.", labels,
+                                 LATENCY_BUCKETS)
+        self.phases = Histogram("error_detection_phase_seconds",
+                                "Time spent in validation, the algorithm and response rendering.",
+                                labels + ("phase",), LATENCY_BUCKETS)
+        self.steps = Histogram("error_detection_steps", "Trace steps returned per request.", labels, STEP_BUCKETS)
+        self.sizes = Histogram("error_detection_response_bytes", "Response body size.", labels, SIZE_BUCKETS)
+
+    def record(self, timer, endpoint, status_code, total, size=None):
+        labels = (endpoint, timer.technique or "none")
+        with self._lock:
+            self.requests.inc(labels + (str(status_code),))
+            self.latency.observe(labels, total)
+            for phase, seconds in timer.phases.items():
+                self.phases.observe(labels + (phase,), seconds)
+            if timer.steps is not None:
+                self.steps.observe(labels, timer.steps)
+            if size is not None:
+                self.sizes.observe(labels, size)
+
+    def export(self, extra=()):
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.phases, self.steps, self.sizes):
+                lines.extend(metric.export())
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class PhaseTimer:
+    """
+    Per-request phase durations, attached to the request by
+    PhaseTimingMiddleware. Views fill in the technique and step count.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.render_started = None
+        self.phases = {}
+        self.technique = None
+        self.steps = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total):
+        # Server-Timing durations are in milliseconds
+        parts = [f"{phase};dur={self.phases[phase] * 1000:.2f}" for phase in PHASES if phase in self.phases]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+@contextmanager
+def timed_phase(request, phase):
+    """
+    Adds the duration of the block to `phase` of the request's PhaseTimer.
+    Does nothing when the timing middleware is not installed.
+    """
+    timer = getattr(request, 'phase_timer', None)
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(phase, time.perf_counter() - start)
+
+
+def annotate(request, technique=None, result=None):
+    # Labels the request's metrics with the technique and the trace size
+    timer = getattr(request, 'phase_timer', None)
+    if timer is None:
+        return
+    if technique:
+        timer.technique = technique
+    if result is not None and isinstance(result.get("steps"), list):
+        timer.steps = len(result["steps"])
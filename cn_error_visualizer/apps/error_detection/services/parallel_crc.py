@@ -0,0 +1,62 @@
+from multiprocessing import parent_process
+
+from django.conf import settings
+
+from ..algorithms.crc_engine import crc_combine, crc_register, parse_generator, table_mod2div
+from .bit_vector import BitVector
+from .process_pool import get_process_pool, worker_count
+
+
+def _chunk_register(data, poly, width):
+    # Runs in a pool worker: register of one byte-aligned chunk, started from zero
+    return crc_register(BitVector.from_bytes(data), poly, width)
+
+
+def parallel_crc_register(bits, poly, width, chunk_bits, pool, register=0):
+    """
+    crc_register(bits, poly, width, register) with the work spread over `pool`.
+    The leading bits that do not fill a byte are fed serially; the rest is cut
+    into chunks of `chunk_bits` (rounded down to whole bytes), whose registers
+    are computed independently and merged in order with crc_combine.
+    """
+    bits = BitVector.coerce(bits)
+    head = len(bits) % 8
+    body_len = len(bits) - head
+    if head:
+        register = crc_register(BitVector(bits.value >> body_len, head), poly, width, register)
+    if not body_len:
+        return register
+
+    body = (bits.value & ((1 << body_len) - 1)).to_bytes(body_len // 8, 'big')
+    chunk_bytes = max(chunk_bits // 8, 1)
+    pieces = [body[i:i + chunk_bytes] for i in range(0, len(body), chunk_bytes)]
+    registers = pool.map(_chunk_register, pieces, [poly] * len(pieces), [width] * len(pieces))
+    for piece, piece_register in zip(pieces, registers):
+        register = crc_combine(register, piece_register, 8 * len(piece), poly, width)
+    return register
+
+
+def _use_pool(length):
+    # Pool workers never fan out again: batch and async jobs already run in one
+    if length < getattr(settings, 'ERROR_DETECTION_CRC_PARALLEL_MIN_BITS', 1 << 23):
+        return False
+    return worker_count() > 1 and parent_process() is None
+
+
+def parallel_mod2div(dividend, divisor):
+    """
+    Same remainder as table_mod2div (and mod2div), in the type of `dividend`.
+    Dividends of at least ERROR_DETECTION_CRC_PARALLEL_MIN_BITS are split into
+    ERROR_DETECTION_CRC_CHUNK_BITS chunks for the shared process pool, which
+    has ERROR_DETECTION_BATCH_WORKERS workers; smaller ones, and single-core
+    hosts, use the serial table engine.
+    """
+    bits = BitVector.coerce(dividend)
+    poly, width = parse_generator(str(divisor))
+    if not width or not _use_pool(len(bits)):
+        return table_mod2div(dividend, divisor)
+
+    chunk_bits = getattr(settings, 'ERROR_DETECTION_CRC_CHUNK_BITS', 1 << 20)
+    register = parallel_crc_register(bits[:-width], poly, width, chunk_bits, get_process_pool())
+    result = BitVector(register ^ (bits.value & ((1 << width) - 1)), width)
+    return result if isinstance(dividend, BitVector) else str(result)
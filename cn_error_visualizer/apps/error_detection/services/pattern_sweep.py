@@ -0,0 +1,122 @@
+from collections import Counter, defaultdict
+from math import comb
+
+from .algorithm_factory import AlgorithmFactory
+from .bit_utils import default_block_size
+from .syndromes import build_check
+
+MAX_WEIGHT = 3
+
+
+def _count_zero_sums(check, weight):
+    """
+    Number of position sets of the given size whose syndromes add up to 0.
+    Works on syndrome value counts rather than positions: ordered tuples are
+    counted over values, tuples that reuse a position are removed by
+    inclusion-exclusion, and the result is divided by the orderings.
+    """
+    counts = Counter(check.syndromes)
+    combine, negate = check.combine, check.negate
+
+    if weight == 1:
+        return counts.get(0, 0)
+
+    if weight == 2:
+        ordered = sum(c * counts.get(negate(u), 0) for u, c in counts.items())
+        repeated = sum(c for u, c in counts.items() if combine(u, u) == 0)
+        return (ordered - repeated) // 2
+
+    # weight == 3
+    ordered = 0
+    for u, cu in counts.items():
+        for v, cv in counts.items():
+            cw = counts.get(negate(combine(u, v)), 0)
+            if cw:
+                ordered += cu * cv * cw
+    # i == j: s_k must cancel 2*s_i (three ways to pick the repeated pair)
+    pair = sum(c * counts.get(negate(combine(u, u)), 0) for u, c in counts.items())
+    triple = sum(c for u, c in counts.items() if combine(combine(u, u), u) == 0)
+    return (ordered - 3 * pair + 2 * triple) // 6
+
+
+def _zero_sum_patterns(check, weight):
+    # Yields position sets (ascending) whose syndromes add up to 0
+    syndromes = check.syndromes
+    combine, negate = check.combine, check.negate
+    positions_by_value = defaultdict(list)
+    for pos, value in enumerate(syndromes):
+        positions_by_value[value].append(pos)
+
+    n = check.length
+    if weight == 1:
+        for pos in positions_by_value.get(0, ()):
+            yield [pos]
+    elif weight == 2:
+        for i in range(n):
+            for j in positions_by_value.get(negate(syndromes[i]), ()):
+                if j > i:
+                    yield [i, j]
+    else:
+        for i in range(n):
+            for j in range(i + 1, n):
+                for k in positions_by_value.get(negate(combine(syndromes[i], syndromes[j])), ()):
+                    if k > j:
+                        yield [i, j, k]
+
+
+def sweep_check(check, max_weight=MAX_WEIGHT, max_examples=5):
+    """
+    Exact detection counts for every error pattern of weight 1..max_weight.
+    :param check: Receiver model from syndromes.build_check.
+    :param max_examples: Undetected patterns (bit positions) listed per weight.
+    """
+    blind = check.blind_pattern()
+    rows = []
+    for weight in range(1, max_weight + 1):
+        undetected = _count_zero_sums(check, weight)
+        skip = None
+        if blind is not None and len(blind) == weight:
+            # Zero-sum pattern the receiver still rejects (checksum: all-zero frame)
+            undetected -= 1
+            skip = blind
+
+        examples = []
+        if undetected and max_examples:
+            for pattern in _zero_sum_patterns(check, weight):
+                if pattern != skip:
+                    examples.append(pattern)
+                    if len(examples) >= max_examples:
+                        break
+
+        total = comb(check.length, weight)
+        rows.append({
+            "weight": weight,
+            "patterns": total,
+            "detected": total - undetected,
+            "undetected": undetected,
+            "undetected_fraction": undetected / total if total else 0.0,
+            "undetected_examples": examples,
+        })
+    return rows
+
+
+def run_sweep(techniques, data, max_weight=MAX_WEIGHT, max_examples=5, generator=None, block_size=None):
+    """
+    Sweeps low-weight error patterns over the codeword each technique sends
+    for `data`. Only the checksum result depends on the data bits themselves.
+    """
+    reports = []
+    for technique in techniques:
+        effective_block = block_size or default_block_size(len(data))
+        # Internal codeword: kept out of the result cache, the run store and the metrics
+        codeword = AlgorithmFactory.run_algorithm(
+            technique, data, generator=generator, block_size=effective_block, trace='off', use_cache=False,
+        )['transmitted_data']
+        check = build_check(technique, codeword, generator=generator, block_size=effective_block)
+        reports.append({
+            "technique": technique,
+            "codeword_bits": check.length,
+            "linear": check.linear,
+            "weights": sweep_check(check, max_weight, max_examples),
+        })
+    return reports
@@ -0,0 +1,23 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def worker_count():
+    return getattr(settings, 'ERROR_DETECTION_BATCH_WORKERS', None) or os.cpu_count() or 1
+
+
+def get_process_pool():
+    # Lazily created and shared by all requests of this worker process
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=worker_count())
+            atexit.register(_pool.shutdown)
+        return _pool
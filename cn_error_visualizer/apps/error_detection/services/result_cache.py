@@ -0,0 +1,158 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .bit_utils import default_block_size
+
+# Part of every result key (and so of stored runs and HTTP ETags): bump it
+# whenever an algorithm's output or trace changes for the same inputs.
+ALGORITHM_VERSION = 1
+
+# Rough per-step cost used by the byte budget; measuring every trace exactly
+# would cost as much as rendering it.
+STEP_SIZE_ESTIMATE = 160
+
+
+def canonical_params(technique, data, generator=None, engine=None, introduce_error=False, trace="full",
+                     block_size=None, parity_bits=None, secded=False, **_):
+    """
+    The inputs that determine an algorithm's output, normalized.
+    Parameters a technique ignores (generator/engine outside CRC) are dropped
+    and defaults are filled in (LRC/checksum block size from the data length),
+    so equivalent requests compare equal.
+    """
+    technique = technique.lower()
+    canonical = {
+        "technique": technique,
+        "data": str(data),
+        "introduce_error": bool(introduce_error),
+        "trace": trace or "full",
+    }
+    if technique == "crc":
+        canonical["generator"] = generator or "1001"
+        canonical["engine"] = engine or "auto"
+    elif technique in ("lrc", "checksum"):
+        canonical["block_size"] = block_size or default_block_size(len(data))
+    elif technique == "hamming":
+        canonical["parity_bits"] = parity_bits or 3
+        canonical["secded"] = bool(secded)
+    return canonical
+
+
+def canonical_key(technique, data, **kwargs):
+    # Hash of canonical_params and the algorithm version, so equivalent requests share one entry
+    canonical = dict(canonical_params(technique, data, **kwargs), version=ALGORITHM_VERSION)
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def estimate_size(result):
+    size = sum(len(value) for value in result.values() if isinstance(value, str))
+    return size + STEP_SIZE_ESTIMATE * len(result.get("steps") or ())
+
+
+class ResultCache:
+    """
+    In-process LRU of algorithm results, bounded by entry count and an estimated
+    byte budget. When `backend_alias` names a Django cache, entries are also
+    written there so other worker processes can reuse them.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024, backend_alias=None, timeout=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backend_alias = backend_alias
+        self.timeout = timeout
+        self._entries = OrderedDict()  # key -> (result, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            max_entries=getattr(settings, 'ERROR_DETECTION_RESULT_CACHE_ENTRIES', 512),
+            max_bytes=getattr(settings, 'ERROR_DETECTION_RESULT_CACHE_BYTES', 64 * 1024 * 1024),
+            backend_alias=getattr(settings, 'ERROR_DETECTION_RESULT_CACHE_ALIAS', None),
+            timeout=getattr(settings, 'ERROR_DETECTION_RESULT_CACHE_TIMEOUT', 3600),
+        )
+
+    def _backend_key(self, key):
+        return f"error_detection:result:{key}"
+
+    def get(self, key):
+        # Returns a shallow copy so callers can add top-level fields safely
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+
+        if self.backend_alias:
+            result = caches[self.backend_alias].get(self._backend_key(key))
+            if result is not None:
+                self._store_local(key, result)
+                with self._lock:
+                    self.hits += 1
+                return dict(result)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, result):
+        self._store_local(key, result)
+        if self.backend_alias:
+            caches[self.backend_alias].set(self._backend_key(key), result, timeout=self.timeout)
+
+    def _store_local(self, key, result):
+        size = estimate_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "shared_backend": self.backend_alias,
+            }
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache.from_settings()
+        return _result_cache
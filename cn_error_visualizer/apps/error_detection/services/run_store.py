@@ -0,0 +1,298 @@
+import atexit
+import queue
+import threading
+import time
+import zlib
+from multiprocessing import parent_process
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from . import json_backend
+from .result_cache import canonical_params, estimate_size
+
+# Result strings up to this length are copied into the run's summary
+SUMMARY_MAX_CHARS = 128
+# Columns returned by the history endpoint; the payload is only read by id
+HISTORY_FIELDS = ("id", "created_at", "input_hash", "technique", "params", "data_bits", "error_detected",
+                  "step_count", "duration", "summary")
+
+# Measured cost of decompressing and parsing a stored payload, per
+# uncompressed byte (orjson and json are within a few percent of each other)
+DECODE_SECONDS_PER_BYTE = 4e-8
+
+# Queue markers: write the pending batch now / write it and stop
+_FLUSH = object()
+_STOP = object()
+
+
+def enabled():
+    # Pool workers leave persistence to the parent process, which owns the writer
+    return getattr(settings, 'ERROR_DETECTION_RUN_STORE', False) and parent_process() is None
+
+
+def encode_payload(result):
+    """
+    JSON of a full result as (bytes, compressed, uncompressed size), or
+    (None, False, size) when it is larger than
+    ERROR_DETECTION_RUN_STORE_MAX_PAYLOAD_BYTES even compressed.
+    Small payloads are stored as they are; compressing them gains nothing.
+    """
+    data = json_backend.dumps(result)
+    size = len(data)
+    compressed = size >= getattr(settings, 'ERROR_DETECTION_RUN_STORE_COMPRESS_MIN_BYTES', 1024)
+    if compressed:
+        # Traces repeat the same keys and bit patterns, so the fastest level already shrinks them ~10x
+        data = zlib.compress(data, 1)
+    if len(data) > getattr(settings, 'ERROR_DETECTION_RUN_STORE_MAX_PAYLOAD_BYTES', 16 * 1024 * 1024):
+        return None, False, size
+    return data, compressed, size
+
+
+def decode_payload(payload, compressed):
+    # BinaryField reads back as bytes or memoryview depending on the database
+    data = bytes(payload)
+    if compressed:
+        data = zlib.decompress(data)
+    return json_backend.loads(data)
+
+
+def summarize(result):
+    return {name: value for name, value in result.items()
+            if name != "steps" and (value is None or isinstance(value, (bool, int, float))
+                                    or isinstance(value, str) and len(value) <= SUMMARY_MAX_CHARS)}
+
+
+def build_run(key, params, result, duration, created_at):
+    from ..models import DetectionRun
+
+    payload, compressed, payload_size = encode_payload(result)
+    # The inputs the hash covers, apart from the data itself
+    stored_params = canonical_params(**params)
+    del stored_params["technique"], stored_params["data"]
+    return DetectionRun(
+        input_hash=key,
+        technique=params["technique"].lower(),
+        params=stored_params,
+        data_bits=len(params["data"]),
+        error_detected=bool(result.get("error_detected")),
+        step_count=len(result.get("steps") or ()),
+        summary=summarize(result),
+        payload=payload,
+        compressed=compressed,
+        payload_size=payload_size,
+        duration=duration,
+        created_at=created_at,
+    )
+
+
+class RunWriter:
+    """
+    Buffers finished runs and inserts them with bulk_create from a background
+    thread: a batch is written once it holds `batch_size` runs or `interval`
+    seconds after its first run arrived. Payloads are encoded and compressed
+    there too, so requests only pay for a queue put. When `max_pending` runs,
+    or an estimated `max_pending_bytes` of results, are already waiting, new
+    ones are dropped (and counted) instead of blocking requests; a failed
+    insert (e.g. migrations not applied) is counted and never reaches the
+    request either.
+    """
+
+    def __init__(self, batch_size=200, interval=2.0, max_pending=10000, max_pending_bytes=64 * 1024 * 1024):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending_bytes = max_pending_bytes
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending_bytes = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            batch_size=getattr(settings, 'ERROR_DETECTION_RUN_STORE_BATCH', 200),
+            interval=getattr(settings, 'ERROR_DETECTION_RUN_STORE_FLUSH_INTERVAL', 2.0),
+            max_pending=getattr(settings, 'ERROR_DETECTION_RUN_STORE_MAX_PENDING', 10000),
+            max_pending_bytes=getattr(settings, 'ERROR_DETECTION_RUN_STORE_MAX_PENDING_BYTES', 64 * 1024 * 1024),
+        )
+
+    def submit(self, key, params, result, duration=None):
+        self._start()
+        # Queued results stay referenced until written, so they count against the byte budget
+        size = estimate_size(result)
+        with self._lock:
+            if self._pending_bytes + size > self.max_pending_bytes:
+                self.dropped += 1
+                return
+            self._pending_bytes += size
+        try:
+            self._queue.put_nowait((size, (key, params, result, duration, timezone.now())))
+        except queue.Full:
+            with self._lock:
+                self._pending_bytes -= size
+                self.dropped += 1
+
+    def flush(self):
+        # Blocks until every run submitted so far has been written (or has failed)
+        if self._thread is not None:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout=10)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "pending": self._queue.qsize(),
+                "pending_bytes": self._pending_bytes,
+            }
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='error-detection-run-store', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _loop(self):
+        running = True
+        while running:
+            batch = []
+            item = self._queue.get()
+            taken = 1
+            deadline = time.monotonic() + self.interval
+            while True:
+                if item is _STOP:
+                    running = False
+                    break
+                if item is _FLUSH:
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                taken += 1
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+
+    def _write(self, batch):
+        from ..models import DetectionRun
+
+        # This thread keeps its own connection; drop it if it went stale
+        close_old_connections()
+        try:
+            runs = [build_run(*run) for _, run in batch]
+            DetectionRun.objects.bulk_create(runs, batch_size=self.batch_size)
+        except Exception:
+            # Persistence is best effort: detection results never depend on it
+            with self._lock:
+                self.failed += len(batch)
+        else:
+            with self._lock:
+                self.written += len(runs)
+        finally:
+            with self._lock:
+                self._pending_bytes -= sum(size for size, _ in batch)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = RunWriter.from_settings()
+        return _writer
+
+
+def record(key, params, result, duration=None):
+    """
+    Queues a computed run for the store and returns at once.
+    :param key: canonical_key of the run's inputs.
+    :param params: The run_algorithm keyword arguments (technique, data, ...).
+    :param duration: Seconds the algorithm took; runs without one are kept
+                     for history and audit but never served by lookup.
+    """
+    if enabled():
+        get_writer().submit(key, params, result, duration)
+
+
+def lookup(key, data_bits):
+    """
+    Stored result of an earlier run with the same inputs, or None. Only inputs
+    of at least ERROR_DETECTION_RUN_STORE_LOOKUP_MIN_BITS are looked up: for
+    smaller ones recomputing costs less than the query. A stored result is
+    only used when its run took longer than decoding the payload is expected
+    to; parsing a long trace back into step objects can cost more than
+    recomputing it (VRC and CRC traces, for example).
+    """
+    if not enabled() or data_bits < getattr(settings, 'ERROR_DETECTION_RUN_STORE_LOOKUP_MIN_BITS', 65536):
+        return None
+    from ..models import DetectionRun
+
+    try:
+        row = (DetectionRun.objects
+               .filter(input_hash=key, payload__isnull=False,
+                       duration__gt=F('payload_size') * DECODE_SECONDS_PER_BYTE)
+               .order_by('-id').values_list('payload', 'compressed').first())
+    except DatabaseError:
+        return None
+    return decode_payload(*row) if row is not None else None
+
+
+def run_history(technique=None, error_detected=None, input_hash=None, since=None, until=None, cursor=None,
+                limit=50):
+    """
+    One page of stored runs, newest first, and the cursor of the next page
+    (None on the last one). Keyset pagination: the cursor is the last id
+    returned and the next page starts below it, so a page costs one index
+    range scan however deep it is, where an OFFSET scans every row before it.
+    """
+    from ..models import DetectionRun
+
+    runs = DetectionRun.objects.all()
+    if technique:
+        runs = runs.filter(technique=technique)
+    if error_detected is not None:
+        runs = runs.filter(error_detected=error_detected)
+    if input_hash:
+        runs = runs.filter(input_hash=input_hash)
+    if since:
+        runs = runs.filter(created_at__gte=since)
+    if until:
+        runs = runs.filter(created_at__lt=until)
+    if cursor:
+        runs = runs.filter(id__lt=cursor)
+    rows = list(runs.order_by('-id').values(*HISTORY_FIELDS)[:limit + 1])
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def load_stored_run(run_id):
+    # One stored run with its full result (None if the payload was not kept)
+    from ..models import DetectionRun
+
+    row = DetectionRun.objects.filter(id=run_id).values(*HISTORY_FIELDS, "payload", "compressed").first()
+    if row is None:
+        return None
+    payload, compressed = row.pop("payload"), row.pop("compressed")
+    row["result"] = decode_payload(payload, compressed) if payload is not None else None
+    return row
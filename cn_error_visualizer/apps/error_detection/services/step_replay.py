@@ -0,0 +1,60 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .algorithm_factory import AlgorithmFactory
+from .step_tracker import StepTracker, TraceWindowComplete
+
+RUN_CACHE_KEY = "error_detection:run:{}"
+
+
+def _cache():
+    # Must be shared by every worker process, or a later step request may miss the run
+    return caches[getattr(settings, 'ERROR_DETECTION_RUN_CACHE', 'default')]
+
+
+def run_paged(params, step_limit):
+    """
+    Runs an algorithm with a full trace but keeps only the first `step_limit` steps.
+    Loop checkpoints are stored with the run so any later window can be replayed
+    without recomputing (or storing) the whole trace.
+    :param params: AlgorithmFactory.run_algorithm keyword arguments.
+    """
+    tracker = StepTracker(
+        window=(0, step_limit),
+        checkpoint_interval=getattr(settings, 'ERROR_DETECTION_CHECKPOINT_INTERVAL', 256),
+    )
+    result = AlgorithmFactory.run_algorithm(tracker=tracker, **params)
+
+    run_id = uuid.uuid4().hex
+    _cache().set(RUN_CACHE_KEY.format(run_id), {
+        "params": params,
+        "checkpoints": tracker.checkpoints,
+        "total_steps": tracker.count,
+    }, timeout=getattr(settings, 'ERROR_DETECTION_RUN_TTL', 3600))
+
+    result["run_id"] = run_id
+    result["total_steps"] = tracker.count
+    return result
+
+
+def load_run(run_id):
+    return _cache().get(RUN_CACHE_KEY.format(run_id))
+
+
+def replay_steps(run, start, stop):
+    """
+    Regenerates steps [start, stop) of a stored run by restarting each loop
+    from its nearest checkpoint and stopping as soon as the window is filled.
+    """
+    stop = min(stop, run["total_steps"])
+    if start >= stop:
+        return []
+
+    tracker = StepTracker(window=(start, stop), checkpoints=run["checkpoints"], stop_after_window=True)
+    try:
+        AlgorithmFactory.run_algorithm(tracker=tracker, **run["params"])
+    except TraceWindowComplete:
+        pass
+    return tracker.get_steps()
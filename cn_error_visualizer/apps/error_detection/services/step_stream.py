@@ -0,0 +1,239 @@
+import asyncio
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import json_backend
+from .algorithm_factory import AlgorithmFactory
+from .step_tracker import StepTracker
+
+STEPS = "steps"
+RESULT = "result"
+ERROR = "error"
+
+
+# Longest a blocked wait goes without checking whether the stream was cancelled
+_POLL_SECONDS = 0.5
+
+
+class StreamCancelled(Exception):
+    """Raised inside the algorithm when the client has gone away."""
+
+
+class StreamsBusy(Exception):
+    """Raised by StepStream.start when ERROR_DETECTION_SSE_MAX_STREAMS streams are already running."""
+
+
+_producers = None
+_waiters = None
+_pools_lock = threading.Lock()
+_active = 0
+
+
+def _max_streams():
+    return getattr(settings, 'ERROR_DETECTION_SSE_MAX_STREAMS', 16)
+
+
+def _get_pools():
+    """
+    Producer threads run the algorithms; waiter threads block on the event
+    queues for aiter_events, so idle clients never occupy the event loop's
+    default executor. Both are sized to the stream limit: only admitted
+    streams produce, and only their clients wait for long.
+    """
+    global _producers, _waiters
+    with _pools_lock:
+        if _producers is None:
+            _producers = ThreadPoolExecutor(max_workers=_max_streams(), thread_name_prefix='error-detection-stream')
+            _waiters = ThreadPoolExecutor(max_workers=_max_streams(), thread_name_prefix='error-detection-stream-wait')
+            atexit.register(_producers.shutdown, wait=False)
+            atexit.register(_waiters.shutdown, wait=False)
+        return _producers, _waiters
+
+
+def _admit():
+    global _active
+    with _pools_lock:
+        if _active >= _max_streams():
+            return False
+        _active += 1
+        return True
+
+
+def _release():
+    global _active
+    with _pools_lock:
+        _active -= 1
+
+
+def active_streams():
+    with _pools_lock:
+        return _active
+
+
+class StepStream:
+    """
+    Runs a detection in its own thread and hands its steps to the response
+    as they are produced. The tracker's sink groups steps into chunks, sent
+    when `chunk_steps` are waiting or `flush_interval` seconds after the last
+    send; the first step goes out on its own so the client sees progress at
+    once. Chunks pass through a queue of `max_chunks`: when the client reads
+    slower than the algorithm produces, the algorithm blocks on it
+    (backpressure), so the server holds at most max_chunks * chunk_steps
+    steps, however long the trace.
+    """
+
+    def __init__(self, chunk_steps=256, flush_interval=0.05, max_chunks=8):
+        self.chunk_steps = chunk_steps
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._pending = []
+        self._last_flush = None
+        self._sent = 0
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            chunk_steps=getattr(settings, 'ERROR_DETECTION_SSE_CHUNK_STEPS', 256),
+            flush_interval=getattr(settings, 'ERROR_DETECTION_SSE_FLUSH_INTERVAL', 0.05),
+            max_chunks=getattr(settings, 'ERROR_DETECTION_SSE_MAX_CHUNKS', 8),
+        )
+
+    def start(self, params):
+        """
+        Runs the algorithm on the shared producer pool.
+        :param params: AlgorithmFactory.run_algorithm keyword arguments.
+        Raises StreamsBusy when ERROR_DETECTION_SSE_MAX_STREAMS streams are
+        already producing; the slot is freed when the algorithm finishes or
+        its client goes away.
+        """
+        if not _admit():
+            raise StreamsBusy(f"At most {_max_streams()} step streams can run at once; retry shortly.")
+        try:
+            _get_pools()[0].submit(self._run, params)
+        except Exception:
+            _release()
+            raise
+
+    def cancel(self):
+        # The algorithm stops at its next step; blocked puts and waits give up within _POLL_SECONDS
+        self._cancelled.set()
+
+    def next_event(self, timeout):
+        # (kind, payload), or None when nothing arrived within `timeout` seconds or the stream was cancelled
+        deadline = time.monotonic() + timeout
+        while not self._cancelled.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                return self._queue.get(timeout=min(remaining, _POLL_SECONDS))
+            except queue.Empty:
+                continue
+        return None
+
+    def _run(self, params):
+        try:
+            self._produce(params)
+        finally:
+            _release()
+
+    def _produce(self, params):
+        tracker = StepTracker(params.get('trace') or StepTracker.FULL, sink=self._add)
+        try:
+            result = AlgorithmFactory.run_algorithm(tracker=tracker, **params)
+            self._flush()
+            result = {key: value for key, value in result.items() if key != "steps"}
+            result["total_steps"] = self._sent
+            self._put((RESULT, result))
+        except StreamCancelled:
+            pass
+        except Exception as e:
+            try:
+                self._put((ERROR, {"error": str(e)}))
+            except StreamCancelled:
+                pass
+
+    def _add(self, step):
+        self._pending.append(step)
+        now = time.monotonic()
+        if (len(self._pending) >= self.chunk_steps or self._last_flush is None
+                or now - self._last_flush >= self.flush_interval):
+            self._flush(now)
+
+    def _flush(self, now=None):
+        if self._pending:
+            chunk, self._pending = self._pending, []
+            self._put((STEPS, {"from": self._sent, "steps": chunk}))
+            self._sent += len(chunk)
+        self._last_flush = now if now is not None else time.monotonic()
+
+    def _put(self, event):
+        while True:
+            if self._cancelled.is_set():
+                raise StreamCancelled()
+            try:
+                self._queue.put(event, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+
+def format_event(kind, payload):
+    # One Server-Sent Event; the compact JSON encoding never contains a newline
+    return b"event: " + kind.encode() + b"\ndata: " + json_backend.dumps(payload) + b"\n\n"
+
+
+# SSE comment line: keeps proxies from closing an idle connection
+KEEPALIVE = b": keep-alive\n\n"
+
+
+def _heartbeat():
+    return getattr(settings, 'ERROR_DETECTION_SSE_HEARTBEAT', 15)
+
+
+def iter_events(stream, encode=None):
+    """
+    Server-Sent Events of a started StepStream, ending with a `result` or
+    `error` event. Closing the iterator (client disconnect) cancels the run.
+    :param encode: Optional function applied to the final result (data encoding).
+    """
+    try:
+        while True:
+            event = stream.next_event(_heartbeat())
+            if event is None:
+                yield KEEPALIVE
+                continue
+            kind, payload = event
+            if kind == RESULT and encode is not None:
+                payload = encode(payload)
+            yield format_event(kind, payload)
+            if kind != STEPS:
+                return
+    finally:
+        stream.cancel()
+
+
+async def aiter_events(stream, encode=None):
+    # Async form of iter_events for ASGI: each wait for a chunk runs on the dedicated waiter pool
+    loop = asyncio.get_running_loop()
+    waiters = _get_pools()[1]
+    try:
+        while True:
+            event = await loop.run_in_executor(waiters, stream.next_event, _heartbeat())
+            if event is None:
+                yield KEEPALIVE
+                continue
+            kind, payload = event
+            if kind == RESULT and encode is not None:
+                payload = encode(payload)
+            yield format_event(kind, payload)
+            if kind != STEPS:
+                return
+    finally:
+        stream.cancel()
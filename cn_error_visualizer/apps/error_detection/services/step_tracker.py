@@ -1,6 +1,43 @@
+from bisect import bisect_right
+
+
+class TraceWindowComplete(Exception):
+    """Raised by a tracker with stop_after_window once every requested step is collected."""
+
+
 class StepTracker:
-    def __init__(self):
+    FULL = "full"
+    SUMMARY = "summary"
+    OFF = "off"
+    MODES = (FULL, SUMMARY, OFF)
+
+    def __init__(self, mode=FULL, window=None, checkpoint_interval=None, checkpoints=None,
+                 stop_after_window=False, sink=None):
+        """
+        :param mode: 'full' records every step, 'summary' only phase boundaries,
+                     'off' records nothing (result only).
+        :param window: Optional (start, stop) step range; steps outside it are counted but not kept.
+        :param checkpoint_interval: Record loop state every this many steps (see checkpoint()).
+        :param checkpoints: Checkpoints from an earlier run of the same input, used by resume().
+        :param stop_after_window: Raise TraceWindowComplete as soon as the window is filled.
+        :param sink: Called with each kept step instead of storing it, so the
+                     tracker's memory does not grow with the trace.
+        Algorithms check `enabled` / `verbose` before formatting a step, so the
+        reduced modes skip building descriptions and state dicts altogether.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown trace mode: {mode}")
+        self.mode = mode
+        self.enabled = mode != self.OFF
+        self.verbose = mode == self.FULL
         self.steps = []
+        self.count = 0  # index of the next step, kept or not
+        self.window = window
+        self.stop_after_window = stop_after_window
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoints = checkpoints if checkpoints is not None else {}
+        self._next_checkpoint = 0
+        self.sink = sink
 
     def add_step(self, title, description, state=None):
         """
@@ -9,11 +46,69 @@ class StepTracker:
         :param description: Human readable explanation.
         :param state: Optional dictionary containing current variables/bits for valid visualization.
         """
-        self.steps.append({
+        index = self.count
+        self.count += 1
+        if self.window is not None:
+            start, stop = self.window
+            if not start <= index < stop:
+                return
+        step = {
             "title": title,
             "description": description,
             "state": state or {}
-        })
+        }
+        if self.sink is not None:
+            self.sink(step)
+        else:
+            self.steps.append(step)
+        if self.stop_after_window and self.count >= self.window[1]:
+            raise TraceWindowComplete()
+
+    def wants_step(self):
+        """
+        True if the next step falls inside the window and should be built.
+        Otherwise the step is counted as skipped, so loops call this before
+        formatting a per-iteration step.
+        """
+        if self.window is None:
+            return True
+        start, stop = self.window
+        if start <= self.count < stop:
+            return True
+        self.count += 1
+        if self.stop_after_window and self.count >= stop:
+            raise TraceWindowComplete()
+        return False
+
+    def checkpoint_due(self):
+        return self.checkpoint_interval is not None and self.count >= self._next_checkpoint
+
+    def checkpoint(self, key, state):
+        """
+        Saves the state a loop needs to restart at the current step index.
+        :param key: Identifies the loop (e.g. 'mod2div:Sender').
+        :param state: Small dict of loop variables (position, running count, register...).
+        """
+        self.checkpoints.setdefault(key, []).append((self.count, state))
+        self._next_checkpoint = self.count + self.checkpoint_interval
+
+    def resume(self, key):
+        """
+        Returns the state of the latest checkpoint of loop `key` that is not past
+        the window start, and fast-forwards the step counter to it.
+        Returns None when the loop has to run from its beginning.
+        """
+        if self.window is None:
+            return None
+        points = self.checkpoints.get(key)
+        if not points:
+            return None
+        pos = bisect_right([index for index, _ in points], self.window[0]) - 1
+        if pos < 0 or points[pos][0] < self.count:
+            return None
+        index, state = points[pos]
+        self.count = index
+        return state
 
     def get_steps(self):
         return self.steps
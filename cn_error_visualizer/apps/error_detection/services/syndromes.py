@@ -0,0 +1,119 @@
+from ..algorithms.crc_engine import parse_generator
+
+
+class LinearCheck:
+    """
+    Receiver check of a linear code (VRC, LRC, CRC).
+    The check of codeword XOR e only depends on e: an error pattern goes
+    unnoticed exactly when the XOR of its per-position syndromes is 0.
+    """
+    linear = True
+
+    def __init__(self, syndromes):
+        self.syndromes = syndromes
+        self.length = len(syndromes)
+
+    @staticmethod
+    def combine(a, b):
+        return a ^ b
+
+    @staticmethod
+    def negate(a):
+        return a
+
+    def syndrome(self, positions):
+        syndromes = self.syndromes
+        value = 0
+        for pos in positions:
+            value ^= syndromes[pos]
+        return value
+
+    def detects(self, positions):
+        return self.syndrome(positions) != 0
+
+    def blind_pattern(self):
+        # Zero-syndrome pattern that is detected anyway; linear codes have none
+        return None
+
+
+class ChecksumCheck:
+    """
+    Receiver check of the one's complement checksum. It is not linear over XOR:
+    flipping a bit adds +2^b to the word sum when the bit was 0 and -2^b when it
+    was 1, so syndromes are per-position deltas modulo 2^k - 1 that depend on
+    the codeword. A pattern is accepted when its deltas add up to 0, except
+    the one that clears every 1 bit: an all-zero frame sums to 0, not all 1s.
+    """
+    linear = False
+
+    def __init__(self, codeword, block_size):
+        codeword = str(codeword)
+        self.block_size = block_size
+        self.length = len(codeword)
+        self.modulus = modulus = (1 << block_size) - 1
+        self.syndromes = []
+        ones = []
+        for pos, bit in enumerate(codeword):
+            # The codeword is a whole number of words, so position p is bit k-1-(p % k)
+            weight = 1 << (block_size - 1 - pos % block_size)
+            if bit == '1':
+                ones.append(pos)
+                self.syndromes.append(modulus - weight)
+            else:
+                self.syndromes.append(weight)
+        self.ones = ones
+        self._ones_set = frozenset(ones)
+
+    def combine(self, a, b):
+        return (a + b) % self.modulus
+
+    def negate(self, a):
+        return -a % self.modulus
+
+    def syndrome(self, positions):
+        syndromes = self.syndromes
+        return sum(syndromes[pos] for pos in positions) % self.modulus
+
+    def detects(self, positions):
+        if self.syndrome(positions) != 0:
+            return True
+        return len(positions) == len(self.ones) and self._ones_set.issuperset(positions)
+
+    def blind_pattern(self):
+        return self.ones
+
+
+def crc_syndromes(length, generator):
+    # Syndrome of position p is x^(length-1-p) mod G, built from the last position backwards
+    poly, width = parse_generator(generator)
+    if width == 0:
+        return [0] * length
+    top = 1 << width
+    reduce_by = top | poly
+    syndromes = [0] * length
+    value = 1
+    for pos in range(length - 1, -1, -1):
+        syndromes[pos] = value
+        value <<= 1
+        if value & top:
+            value ^= reduce_by
+    return syndromes
+
+
+def build_check(technique, codeword, generator=None, block_size=None):
+    """
+    Receiver-side detection model for a transmitted codeword.
+    :param codeword: Transmitted data as produced by the technique's run_* function.
+    :param block_size: Effective LRC/checksum block size (already resolved).
+    """
+    length = len(codeword)
+    if technique == 'vrc':
+        return LinearCheck([1] * length)
+    if technique == 'lrc':
+        # The codeword is a whole number of rows, so position p sits in column p % k
+        return LinearCheck([1 << (block_size - 1 - pos % block_size) for pos in range(length)])
+    if technique == 'crc':
+        return LinearCheck(crc_syndromes(length, generator or '1001'))
+    if technique == 'checksum':
+        return ChecksumCheck(codeword, block_size)
+    raise ValueError(f"Unknown technique: {technique}")
@@ -0,0 +1,127 @@
+import re
+
+COLUMNAR = "columnar"
+STEPS = "steps"
+FORMATS = (STEPS, COLUMNAR)
+COLUMNAR_VERSION = 1
+
+# Numbers and bit strings inside titles and descriptions become template arguments
+_ARGUMENT = re.compile(r'(\d+)')
+# Strings at least this long are stored once in the shared string table
+INTERN_MIN_LENGTH = 8
+_MISSING = object()
+
+
+def encode_columnar(steps):
+    """
+    Compact, lossless form of a step list (decode_columnar restores it).
+    - Titles and descriptions are template ids plus the numbers/bit strings
+      cut out of them; templates are sent once.
+    - Each state is a delta from the previous step's state: changed keys
+      (`state_set`, or `state_refs` for long strings), and removed keys
+      (`state_unset`, only for the steps that remove any).
+    - Long strings (bit strings of chunks, divisors, dividends) appear once
+      in `strings`, however many steps, texts and states mention them.
+    """
+    strings, string_index = [], {}
+    templates, template_index = [], {}
+    titles, title_args = [], []
+    descriptions, description_args = [], []
+    state_set, state_refs, state_unset = [], [], {}
+    split = _ARGUMENT.split
+
+    def ref(value):
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(strings)
+            strings.append(value)
+        return index
+
+    def template(text, ids, arg_lists):
+        # "Bit 12 is 1" -> template ["Bit ", " is ", ""] and args ["12", "1"]
+        parts = split(text)
+        key = tuple(parts[0::2])
+        tid = template_index.get(key)
+        if tid is None:
+            tid = template_index[key] = len(templates)
+            templates.append(list(key))
+        ids.append(tid)
+        if len(parts) == 1:
+            arg_lists.append([])
+        else:
+            arg_lists.append([ref(value) if len(value) >= INTERN_MIN_LENGTH else value
+                              for value in parts[1::2]])
+
+    previous = {}
+    for i, step in enumerate(steps):
+        template(step["title"], titles, title_args)
+        template(step["description"], descriptions, description_args)
+
+        state = step["state"]
+        # Keys whose value changed; the type check keeps True distinct from 1
+        changed = {key: value for key, value in state.items()
+                   if previous.get(key, _MISSING) != value or type(previous[key]) is not type(value)}
+        refs = {}
+        for key, value in changed.items():
+            if isinstance(value, str) and len(value) >= INTERN_MIN_LENGTH:
+                refs[key] = ref(value)
+        for key in refs:
+            del changed[key]
+        if len(previous) > len(state) - len(changed) - len(refs):
+            removed = [key for key in previous if key not in state]
+            if removed:
+                state_unset[str(i)] = removed
+        state_set.append(changed)
+        state_refs.append(refs)
+        previous = state
+
+    return {
+        "format": COLUMNAR,
+        "version": COLUMNAR_VERSION,
+        "count": len(steps),
+        "strings": strings,
+        "templates": templates,
+        "title": titles,
+        "title_args": title_args,
+        "description": descriptions,
+        "description_args": description_args,
+        "state_set": state_set,
+        "state_refs": state_refs,
+        "state_unset": state_unset,
+    }
+
+
+def _fill(segments, args, strings):
+    parts = [segments[0]]
+    for arg, segment in zip(args, segments[1:]):
+        parts.append(strings[arg] if isinstance(arg, int) else arg)
+        parts.append(segment)
+    return "".join(parts)
+
+
+def decode_columnar(trace):
+    # Inverse of encode_columnar
+    strings, templates = trace["strings"], trace["templates"]
+    unset = trace["state_unset"]
+    steps = []
+    state = {}
+    for i in range(trace["count"]):
+        state = dict(state)
+        for key in unset.get(str(i), ()):
+            del state[key]
+        state.update(trace["state_set"][i])
+        for key, ref in trace["state_refs"][i].items():
+            state[key] = strings[ref]
+        steps.append({
+            "title": _fill(templates[trace["title"][i]], trace["title_args"][i], strings),
+            "description": _fill(templates[trace["description"][i]], trace["description_args"][i], strings),
+            "state": state,
+        })
+    return steps
+
+
+def encode_result(result, trace_format):
+    # Returns the result with its `steps` in the requested format
+    if trace_format != COLUMNAR or not isinstance(result.get("steps"), list):
+        return result
+    return dict(result, steps=encode_columnar(result["steps"]))
@@ -0,0 +1,82 @@
+"""
+Character-by-character reference implementations, as the algorithms were
+written before they moved to packed BitVectors. Tests compare the fast
+paths against these, and share a few assertions through this module.
+"""
+import random
+from unittest import mock
+
+from ..services import run_store
+from ..services.algorithm_factory import AlgorithmFactory
+
+
+def random_bits(rng, length):
+    return ''.join(rng.choice('01') for _ in range(length))
+
+
+def xor(a, b):
+    return ''.join('0' if x == y else '1' for x, y in zip(a, b))
+
+
+def mod2div(dividend, divisor):
+    # Long division one pulled-down bit at a time; the remainder has len(divisor) - 1 bits
+    pick = len(divisor)
+    tmp = dividend[:pick]
+    while pick < len(dividend):
+        tmp = (xor(divisor, tmp) if tmp[0] == '1' else tmp)[1:] + dividend[pick]
+        pick += 1
+    return (xor(divisor, tmp) if tmp[0] == '1' else tmp)[1:]
+
+
+def full_adder(a, b):
+    # Ripple-carry addition from the rightmost bit; returns (sum, carry out)
+    result, carry = [], 0
+    for x, y in zip(reversed(a), reversed(b)):
+        total = int(x) + int(y) + carry
+        result.append(str(total & 1))
+        carry = total >> 1
+    return ''.join(reversed(result)), carry
+
+
+def ones_complement_sum(bits, size):
+    # Left-pads to whole blocks and adds them one by one with end-around carry
+    bits = '0' * (-len(bits) % size) + bits
+    blocks = [bits[i:i + size] for i in range(0, len(bits), size)]
+    total = blocks[0]
+    for block in blocks[1:]:
+        total, carry = full_adder(total, block)
+        while carry:
+            total, carry = full_adder(total, '0' * (size - 1) + '1')
+    return total
+
+
+def column_parities(bits, size):
+    # Right-pads to whole rows and counts the 1s of every column
+    bits = bits + '0' * (-len(bits) % size)
+    rows = [bits[i:i + size] for i in range(0, len(bits), size)]
+    return ''.join(str([row[col] for row in rows].count('1') % 2) for col in range(size))
+
+
+# Non-default parameters for each technique, enough to exercise every loop of its trace
+TECHNIQUE_PARAMS = {
+    'vrc': {},
+    'lrc': {'block_size': 8},
+    'crc': {'generator': '1011', 'engine': 'bitwise'},
+    'checksum': {'block_size': 8},
+    'hamming': {'parity_bits': 3},
+}
+
+
+def seeded(seed=2024):
+    return random.Random(seed)
+
+
+def assert_bypasses_cache_and_run_store(test, func, *args, **kwargs):
+    # Simulations evaluate thousands of throwaway codewords; none may reach the result cache or the run store
+    before = AlgorithmFactory.cache_stats()
+    with mock.patch.object(run_store, 'record') as record:
+        func(*args, **kwargs)
+    after = AlgorithmFactory.cache_stats()
+    record.assert_not_called()
+    for name in ('hits', 'misses', 'entries'):
+        test.assertEqual(before[name], after[name], name)
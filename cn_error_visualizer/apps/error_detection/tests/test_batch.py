@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..services.algorithm_factory import AlgorithmFactory
+
+
+@override_settings(ERROR_DETECTION_RUN_STORE=False)
+class BatchDetectErrorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def post(self, *items):
+        return self.client.post('/api/detect-error/batch/', {'items': list(items)}, format='json')
+
+    def test_results_match_single_runs(self):
+        items = [
+            {'technique': 'vrc', 'data': '1011001'},
+            {'technique': 'crc', 'data': '1101011011', 'generator': '1011', 'introduce_error': True},
+            {'technique': 'checksum', 'data': 'abcd', 'encoding': 'hex', 'block_size': 8, 'trace': 'off'},
+        ]
+        response = self.post(*items)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['succeeded'], response.data['failed']), (3, 0))
+        self.assertEqual([item['index'] for item in response.data['results']], [0, 1, 2])
+        for item, outcome in zip(items, response.data['results']):
+            single = self.client.post('/api/detect-error/', item, format='json')
+            self.assertEqual(outcome['result'], single.data, item)
+        self.assertEqual(response.data['results'][0]['result']['transmitted_data'],
+                         AlgorithmFactory.run_algorithm('vrc', '1011001')['transmitted_data'])
+
+    def test_invalid_items_reported_on_their_own(self):
+        response = self.post(
+            {'technique': 'crc', 'data': '1011', 'generator': '102'},
+            {'technique': 'vrc', 'data': '1011'},
+            {'technique': 'lrc', 'data': '1011', 'step_limit': 2},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['succeeded'], response.data['failed']), (1, 2))
+        invalid, valid, paged = response.data['results']
+        self.assertIn('generator', invalid['errors'])
+        self.assertEqual(valid['result']['transmitted_data'], '10111')
+        self.assertEqual(paged['index'], 2)
+        self.assertIn('step_limit', paged['errors'])
+        self.assertNotIn('result', paged)
+
+    @override_settings(ERROR_DETECTION_BATCH_MAX_ITEMS=2)
+    def test_batch_size_limit(self):
+        response = self.post(*[{'technique': 'vrc', 'data': '1'}] * 3)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('items', response.data)
+        self.assertEqual(self.post().status_code, 400)
@@ -0,0 +1,47 @@
+from django.test import SimpleTestCase
+
+from .. import benchmarks
+from . import reference
+
+
+def suite(**results):
+    return {"results": results}
+
+
+class BenchmarkTests(SimpleTestCase):
+
+    def test_case_names_are_unique(self):
+        names = [case.name for case in benchmarks.build_cases(benchmarks.QUICK_SIZES)]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_benchmarked_division_matches_reference(self):
+        for case in benchmarks.build_cases((16, 256)):
+            if case.name.startswith("mod2div/"):
+                self.assertEqual(case(), reference.mod2div(*case.args), case.name)
+
+    def test_run_suite_records_payload_cases(self):
+        cases = [case for case in benchmarks.build_cases((16,)) if case.name.startswith("run_vrc/")]
+        results = benchmarks.run_suite(cases, min_time=0, repeat=1)["results"]
+        self.assertEqual(set(results), {case.name for case in cases})
+        full = results["run_vrc/bits=16/trace=full"]
+        self.assertGreater(full["ops_per_sec"], 0)
+        self.assertGreater(full["steps"], 0)
+        self.assertGreater(full["payload_bytes"], 0)
+
+    def test_compare_flags_slowdown_and_memory_growth(self):
+        baseline = suite(a={"ops_per_sec": 100, "peak_bytes": 100000}, b={"ops_per_sec": 100, "peak_bytes": 100000})
+        current = suite(a={"ops_per_sec": 70, "peak_bytes": 100000}, b={"ops_per_sec": 100, "peak_bytes": 130000})
+        regressions, improvements = benchmarks.compare(baseline, current, threshold=0.2)
+        self.assertEqual({(entry["case"], entry["metric"]) for entry in regressions},
+                         {("a", "ops_per_sec"), ("b", "peak_bytes")})
+        self.assertEqual(improvements, [])
+
+    def test_compare_ignores_noise_and_unmatched_cases(self):
+        baseline = suite(a={"ops_per_sec": 100, "peak_bytes": 1000}, gone={"ops_per_sec": 100, "peak_bytes": 0})
+        current = suite(a={"ops_per_sec": 90, "peak_bytes": 3000}, new={"ops_per_sec": 1, "peak_bytes": 0})
+        self.assertEqual(benchmarks.compare(baseline, current), ([], []))
+
+    def test_compare_reports_improvements(self):
+        regressions, improvements = benchmarks.compare(suite(a={"ops_per_sec": 100}), suite(a={"ops_per_sec": 200}))
+        self.assertEqual(regressions, [])
+        self.assertEqual([entry["case"] for entry in improvements], ["a"])
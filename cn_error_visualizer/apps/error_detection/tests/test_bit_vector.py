@@ -0,0 +1,97 @@
+from django.test import SimpleTestCase
+
+from ..algorithms.crc import mod2div
+from ..services.bit_utils import calculate_parity, xor
+from ..services.bit_vector import BitVector
+from . import reference
+from .reference import random_bits
+
+
+class BitVectorTests(SimpleTestCase):
+    """Packed operations give the same bits as the '0'/'1' string operations they replace."""
+
+    def setUp(self):
+        self.rng = reference.seeded()
+        self.samples = [random_bits(self.rng, length) for length in (1, 2, 7, 8, 9, 31, 64, 65, 200) for _ in range(5)]
+
+    def test_round_trip(self):
+        for bits in self.samples + ['']:
+            self.assertEqual(BitVector.from_string(bits).to_string(), bits)
+            self.assertEqual(len(BitVector.from_string(bits)), len(bits))
+
+    def test_indexing_and_iteration(self):
+        for bits in self.samples:
+            vector = BitVector.from_string(bits)
+            self.assertEqual([vector[i] for i in range(len(bits))], [int(bit) for bit in bits])
+            self.assertEqual(list(vector), [int(bit) for bit in bits])
+            self.assertEqual(vector[-1], int(bits[-1]))
+
+    def test_slicing(self):
+        for bits in self.samples:
+            vector = BitVector.from_string(bits)
+            for _ in range(10):
+                start, stop = sorted(self.rng.randrange(len(bits) + 1) for _ in range(2))
+                self.assertEqual(str(vector[start:stop]), bits[start:stop])
+            self.assertEqual(str(vector[:-1]), bits[:-1])
+
+    def test_bitwise_operators(self):
+        for bits in self.samples:
+            other = random_bits(self.rng, len(bits))
+            a, b = BitVector.from_string(bits), BitVector.from_string(other)
+            self.assertEqual(str(a ^ b), reference.xor(bits, other))
+            self.assertEqual(str(a & b), ''.join('1' if x == y == '1' else '0' for x, y in zip(bits, other)))
+            self.assertEqual(str(a | b), ''.join('1' if '1' in (x, y) else '0' for x, y in zip(bits, other)))
+            self.assertEqual(str(~a), ''.join('1' if x == '0' else '0' for x in bits))
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            BitVector.from_string('101') ^ BitVector.from_string('10')
+
+    def test_shifts_concatenation_and_padding(self):
+        for bits in self.samples:
+            vector = BitVector.from_string(bits)
+            count = self.rng.randrange(len(bits) + 1)
+            self.assertEqual(str(vector << count), (bits[count:] + '0' * count)[:len(bits)])
+            self.assertEqual(str(vector >> count), ('0' * count + bits)[:len(bits)])
+            self.assertEqual(str(vector + BitVector.from_string('101')), bits + '101')
+            self.assertEqual(str(vector.pad_left(3)), '000' + bits)
+            self.assertEqual(str(vector.pad_right(3)), bits + '000')
+
+    def test_count_parity_and_flip(self):
+        for bits in self.samples:
+            vector = BitVector.from_string(bits)
+            self.assertEqual(vector.count(), bits.count('1'))
+            self.assertEqual(vector.parity(), bits.count('1') % 2)
+            index = self.rng.randrange(len(bits))
+            flipped = bits[:index] + ('0' if bits[index] == '1' else '1') + bits[index + 1:]
+            self.assertEqual(str(vector.flip(index)), flipped)
+
+    def test_blocks(self):
+        for bits in self.samples:
+            for size in (1, 3, 4, 8):
+                self.assertEqual([str(block) for block in BitVector.from_string(bits).blocks(size)],
+                                 [bits[i:i + size] for i in range(0, len(bits), size)])
+
+    def test_bytes(self):
+        data = bytes(self.rng.randrange(256) for _ in range(9))
+        as_string = ''.join(format(byte, '08b') for byte in data)
+        self.assertEqual(str(BitVector.from_bytes(data)), as_string)
+        self.assertEqual(str(BitVector.from_bytes(data, 29)), as_string[:29])
+        self.assertEqual(BitVector.from_string(as_string[:29]).to_bytes(), int(as_string[:29] + '000', 2).to_bytes(4, 'big'))
+        with self.assertRaises(ValueError):
+            BitVector.from_bytes(data, 73)
+
+    def test_bit_utils_accept_both_forms(self):
+        for bits in self.samples:
+            other = random_bits(self.rng, len(bits))
+            self.assertEqual(xor(bits, other), reference.xor(bits, other))
+            self.assertEqual(xor(bits, BitVector.from_string(other)), BitVector.from_string(reference.xor(bits, other)))
+            self.assertEqual(calculate_parity(bits), '1' if bits.count('1') % 2 else '0')
+
+    def test_mod2div_matches_string_division(self):
+        for bits in self.samples:
+            for divisor in ('11', '1001', '110101'):
+                dividend = bits + '0' * (len(divisor) - 1)
+                expected = reference.mod2div(dividend, divisor)
+                self.assertEqual(mod2div(dividend, divisor), expected)
+                self.assertEqual(mod2div(BitVector.from_string(dividend), divisor), BitVector.from_string(expected))
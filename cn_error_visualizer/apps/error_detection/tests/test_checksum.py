@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase
+
+from ..algorithms.checksum import full_adder, run_checksum, verify_checksum
+from ..services.bit_utils import default_block_size
+from ..services.bit_vector import BitVector
+from ..services.step_tracker import StepTracker
+from . import reference
+from .reference import random_bits
+
+
+class ChecksumTests(SimpleTestCase):
+    """The modular one's complement sum matches the block-by-block ripple-carry addition."""
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def test_full_adder(self):
+        for size in (1, 4, 8, 16, 33):
+            for _ in range(20):
+                a, b = random_bits(self.rng, size), random_bits(self.rng, size)
+                self.assertEqual(full_adder(a, b), reference.full_adder(a, b))
+                packed, carry = full_adder(BitVector.from_string(a), BitVector.from_string(b))
+                self.assertEqual((str(packed), carry), reference.full_adder(a, b))
+
+    def test_ones_complement_sum(self):
+        for size in (2, 4, 8, 16, 32):
+            for length in (1, size - 1, size, size + 1, 5 * size, 5 * size + 3):
+                for _ in range(10):
+                    bits = random_bits(self.rng, max(length, 1))
+                    expected = int(reference.ones_complement_sum(bits, size), 2)
+                    self.assertEqual(BitVector.from_string(bits).ones_complement_sum(size), expected)
+
+    def test_edge_sums(self):
+        # All-zero data sums to 0; non-zero data that cancels out sums to all 1s, never 0
+        self.assertEqual(BitVector.from_string('0' * 16).ones_complement_sum(8), 0)
+        self.assertEqual(BitVector.from_string('1' * 16).ones_complement_sum(8), 0xFF)
+        self.assertEqual(BitVector.from_string('0000111111110000').ones_complement_sum(8), 0xFF)
+
+    def test_sender_matches_reference(self):
+        for length in (3, 8, 16, 17, 64, 250):
+            for block_size in (None, 4, 8, 16):
+                bits = random_bits(self.rng, length)
+                size = block_size or default_block_size(length)
+                checksum = ''.join('1' if bit == '0' else '0' for bit in reference.ones_complement_sum(bits, size))
+                expected = '0' * (-length % size) + bits + checksum
+                for trace in StepTracker.MODES:
+                    result = run_checksum(bits, tracker=StepTracker(trace), block_size=block_size)
+                    self.assertEqual(result["transmitted_data"], expected)
+                    self.assertFalse(result["error_detected"])
+
+    def test_receiver(self):
+        for length in (16, 40, 128):
+            for block_size in (None, 16):
+                codeword = run_checksum(random_bits(self.rng, length), block_size=block_size)["transmitted_data"]
+                clean = verify_checksum(codeword, block_size=block_size)
+                self.assertFalse(clean["error_detected"])
+                self.assertEqual(set(clean["syndrome"]), {'0'})
+                corrupted = codeword[:3] + ('0' if codeword[3] == '1' else '1') + codeword[4:]
+                self.assertTrue(verify_checksum(corrupted, block_size=block_size)["error_detected"])
+
+    def test_receiver_rejects_partial_words(self):
+        with self.assertRaises(ValueError):
+            verify_checksum('1' * 20, block_size=8)
@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..services import algorithm_factory, run_store
+from ..services.algorithm_factory import TECHNIQUES, AlgorithmFactory
+from ..services.result_cache import ResultCache, canonical_key
+from . import reference
+from .reference import random_bits
+
+PARAMS = {'generator': '1011', 'block_size': 8, 'parity_bits': 3, 'introduce_error': True}
+
+
+@override_settings(ERROR_DETECTION_RUN_STORE=False)
+class CompareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.rng = reference.seeded()
+        self.client = APIClient()
+
+    def assertMatchesSingleRuns(self, data, outcomes, techniques=TECHNIQUES):
+        self.assertEqual(list(outcomes), list(techniques))
+        for technique, (result, seconds) in outcomes.items():
+            self.assertEqual(result, AlgorithmFactory.run_algorithm(technique, data, use_cache=False, **PARAMS),
+                             technique)
+            self.assertGreaterEqual(seconds, 0)
+
+    def test_results_match_single_runs(self):
+        data = random_bits(self.rng, 40)
+        self.assertMatchesSingleRuns(data, AlgorithmFactory.compare(data, **PARAMS))
+        # Second time round every technique comes from the result cache
+        self.assertMatchesSingleRuns(data, AlgorithmFactory.compare(data, **PARAMS))
+        self.assertMatchesSingleRuns(data, AlgorithmFactory.compare(data, techniques=('crc', 'vrc'), **PARAMS),
+                                     ('crc', 'vrc'))
+
+    @override_settings(ERROR_DETECTION_BATCH_WORKERS=2, ERROR_DETECTION_COMPARE_PARALLEL_MIN_BITS=16)
+    def test_parallel_results_match_single_runs(self):
+        data = random_bits(self.rng, 40)
+        with mock.patch.object(run_store, 'record') as record:
+            self.assertMatchesSingleRuns(data, AlgorithmFactory.compare(data, **PARAMS))
+        self.assertEqual([call.args[1]['technique'] for call in record.call_args_list], list(TECHNIQUES))
+
+    @override_settings(ERROR_DETECTION_BATCH_WORKERS=2, ERROR_DETECTION_COMPARE_PARALLEL_MIN_BITS=16)
+    def test_parallel_compare_reads_run_store(self):
+        # A technique the store can serve is neither recomputed on the pool nor recorded again
+        data = random_bits(self.rng, 40)
+        stored_key = canonical_key('crc', data, **PARAMS)
+        stored = {'transmitted_data': 'stored'}
+
+        def lookup(key, data_bits):
+            return dict(stored) if key == stored_key else None
+
+        # A private result cache, so the stand-in result never reaches other tests
+        with mock.patch.object(algorithm_factory, 'get_result_cache', return_value=ResultCache()), \
+                mock.patch.object(run_store, 'lookup', side_effect=lookup), \
+                mock.patch.object(run_store, 'record') as record:
+            outcomes = AlgorithmFactory.compare(data, **PARAMS)
+            self.assertEqual(AlgorithmFactory.run_algorithm('crc', data, **PARAMS), stored)
+        self.assertEqual(outcomes['crc'][0], stored)
+        self.assertNotIn('crc', [call.args[1]['technique'] for call in record.call_args_list])
+        self.assertEqual(len(record.call_args_list), len(TECHNIQUES) - 1)
+
+    def test_response_shape(self):
+        data = random_bits(self.rng, 24)
+        response = self.client.post('/api/detect-error/', dict(PARAMS, technique='all', data=data), format='json')
+        self.assertEqual(response.status_code, 200)
+        body = response.data
+        self.assertEqual(set(body), {'original_data', 'techniques', 'seconds', 'results'})
+        self.assertEqual((body['original_data'], body['techniques']), (data, list(TECHNIQUES)))
+        self.assertEqual(list(body['results']), list(TECHNIQUES))
+        for technique, result in body['results'].items():
+            single = AlgorithmFactory.run_algorithm(technique, data, **PARAMS)
+            del single['original_data']
+            seconds = result.pop('seconds')
+            self.assertIsInstance(seconds, float)
+            self.assertEqual(result, single, technique)
+
+    def test_techniques_narrowing(self):
+        body = {'technique': 'all', 'data': '10110011', 'generator': '1011', 'techniques': ['hamming', 'vrc']}
+        response = self.client.post('/api/detect-error/', body, format='json')
+        self.assertEqual(response.status_code, 200)
+        # Reported in the fixed technique order, whatever the request order
+        self.assertEqual(response.data['techniques'], ['vrc', 'hamming'])
+        self.assertEqual(list(response.data['results']), ['vrc', 'hamming'])
+
+        response = self.client.get('/api/detect-error/', {'technique': 'all', 'data': '1011', 'techniques': 'crc,lrc'})
+        self.assertEqual(response.status_code, 301)
+        self.assertIn('techniques=lrc%2Ccrc', response['Location'])
+
+        response = self.client.post('/api/detect-error/', dict(body, techniques=['md5']), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('techniques', response.data)
+
+    def test_single_result_endpoints_reject_all(self):
+        body = {'technique': 'all', 'data': '1011', 'generator': '1011'}
+        response = self.client.post('/api/detect-error/async/', body, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('technique', response.json())
+
+        response = self.client.post('/api/detect-error/stream/', body, format='json', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('technique', response.data)
+
+        response = self.client.post('/api/detect-error/batch/', {'items': [body]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('technique', response.data['results'][0]['errors'])
+
+        response = self.client.post('/api/detect-error/', dict(body, step_limit=2), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('step_limit', response.data)
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase, override_settings
+
+from ..algorithms.crc import mod2div, run_crc, verify_crc
+from ..algorithms.crc_engine import CRC_PRESETS, crc_combine, crc_register, parse_generator, table_mod2div
+from ..services.bit_vector import BitVector
+from ..services.parallel_crc import parallel_crc_register, parallel_mod2div
+from ..services.step_tracker import StepTracker
+from . import reference
+from .reference import random_bits
+
+# Degree 1 to 64, a leading 0 (mod2div treats the top bit as 1 regardless) and the presets
+GENERATORS = ['11', '10', '1001', '1011', '0101', '111010101', '1' + '0' * 63 + '1'] + sorted(CRC_PRESETS.values())
+
+
+class TableCRCTests(SimpleTestCase):
+    """The byte-table engine and its parallel split give mod2div's remainders bit for bit."""
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def test_reference_division(self):
+        # mod2div itself against the string long division, before the faster engines are compared to it
+        for generator in GENERATORS[:5]:
+            for length in (1, 7, 30):
+                dividend = random_bits(self.rng, length) + '0' * (len(generator) - 1)
+                self.assertEqual(mod2div(dividend, generator), reference.mod2div(dividend, generator))
+
+    def test_table_matches_mod2div(self):
+        for generator in GENERATORS:
+            for length in (1, 7, 8, 9, 64, 203):
+                dividend = random_bits(self.rng, length) + random_bits(self.rng, len(generator) - 1)
+                expected = mod2div(dividend, generator)
+                self.assertEqual(table_mod2div(dividend, generator), expected, (generator, dividend))
+                self.assertEqual(table_mod2div(BitVector.from_string(dividend), generator),
+                                 BitVector.from_string(expected))
+
+    def test_register_continues_from_initial_value(self):
+        for generator in GENERATORS:
+            poly, width = parse_generator(generator)
+            first, second = random_bits(self.rng, 37), random_bits(self.rng, 51)
+            register = crc_register(first, poly, width)
+            self.assertEqual(crc_register(second, poly, width, register), crc_register(first + second, poly, width))
+
+    def test_combine(self):
+        for generator in GENERATORS:
+            poly, width = parse_generator(generator)
+            for length_a, length_b in ((0, 8), (8, 0), (13, 64), (200, 17)):
+                a, b = random_bits(self.rng, length_a), random_bits(self.rng, length_b)
+                combined = crc_combine(crc_register(a, poly, width), crc_register(b, poly, width), length_b, poly, width)
+                self.assertEqual(combined, crc_register(a + b, poly, width), (generator, length_a, length_b))
+
+    def test_parallel_register(self):
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for generator in GENERATORS:
+                poly, width = parse_generator(generator)
+                for length in (5, 64, 1000, 4099):
+                    bits = random_bits(self.rng, length)
+                    initial = self.rng.getrandbits(width) if width else 0
+                    for chunk_bits in (8, 24, 1000):
+                        self.assertEqual(parallel_crc_register(bits, poly, width, chunk_bits, pool, initial),
+                                         crc_register(bits, poly, width, initial), (generator, length, chunk_bits))
+
+    @override_settings(ERROR_DETECTION_BATCH_WORKERS=2, ERROR_DETECTION_CRC_PARALLEL_MIN_BITS=256,
+                       ERROR_DETECTION_CRC_CHUNK_BITS=64)
+    def test_parallel_division_on_process_pool(self):
+        for generator in ('1011', CRC_PRESETS['crc-32']):
+            dividend = random_bits(self.rng, 2000) + '0' * (len(generator) - 1)
+            self.assertEqual(parallel_mod2div(dividend, generator), mod2div(dividend, generator))
+
+    def test_engines_agree_end_to_end(self):
+        for generator in ('1011', CRC_PRESETS['crc-16-ccitt']):
+            bits = random_bits(self.rng, 100)
+            bitwise = run_crc(bits, generator, engine='bitwise', tracker=StepTracker(StepTracker.OFF))
+            table = run_crc(bits, generator, engine='table', tracker=StepTracker(StepTracker.OFF))
+            self.assertEqual(bitwise["transmitted_data"], table["transmitted_data"])
+            corrupted = run_crc(bits, generator, introduce_error=True, engine='table')
+            self.assertTrue(corrupted["error_detected"])
+            self.assertEqual(verify_crc(bitwise["transmitted_data"], generator, engine='table')["syndrome"],
+                             '0' * (len(generator) - 1))
@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..services.result_cache import ALGORITHM_VERSION
+
+
+@override_settings(ERROR_DETECTION_RUN_STORE=False)
+class DetectErrorAuthenticationTests(TestCase):
+    body = {'technique': 'vrc', 'data': '1011'}
+
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_login(get_user_model().objects.create_user('student', password='unused'))
+
+    def test_post_enforces_csrf_for_session_users(self):
+        response = self.client.post('/api/detect-error/', self.body, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('CSRF', response.data['detail'])
+
+    def test_post_without_session(self):
+        response = APIClient(enforce_csrf_checks=True).post('/api/detect-error/', self.body, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_ignores_the_session(self):
+        response = self.client.get(f'/api/detect-error/?data=1011&technique=vrc&v={ALGORITHM_VERSION}')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Cookie', response['Vary'])
+
+
+@override_settings(ERROR_DETECTION_RUN_STORE=False)
+class CanonicalQueryTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def canonical(self, query):
+        # Follows the redirect and checks that the canonical URL is served directly
+        response = self.client.get(f'/api/detect-error/?{query}')
+        if response.status_code == 301:
+            location = response['Location']
+            response = self.client.get(location)
+        else:
+            location = f'/api/detect-error/?{query}'
+        self.assertEqual(response.status_code, 200, location)
+        return location, response['ETag']
+
+    def test_spellings_of_the_same_bits_converge(self):
+        for group in (
+            ['data=AB&encoding=hex&technique=crc', 'data=ab&encoding=hex&technique=crc',
+             'data=aB&encoding=hex&technique=crc&bit_length=8'],
+            ['data=q80%3D&encoding=base64&technique=vrc', 'data=q80=&encoding=base64&technique=vrc&bit_length=16'],
+            ['data=10110&technique=lrc', 'data=1011011&technique=lrc&bit_length=5', 'technique=lrc&data=10110',
+             'data=10110&technique=lrc&block_size=4'],
+        ):
+            targets = {self.canonical(query) for query in group}
+            self.assertEqual(len(targets), 1, targets)
+
+    def test_partial_bytes_keep_bit_length(self):
+        location, _ = self.canonical('data=ABCD&encoding=hex&technique=vrc&bit_length=12')
+        self.assertEqual(location,
+                         f'/api/detect-error/?bit_length=12&data=abc0&encoding=hex&technique=vrc&v={ALGORITHM_VERSION}')
+
+    def test_encodings_stay_distinct(self):
+        # The encoding also selects the response encoding, so it is part of the URL
+        self.assertNotEqual(self.canonical('data=10101011&technique=vrc'),
+                            self.canonical('data=ab&encoding=hex&technique=vrc'))
+
+    def test_version_moves_canonical_url(self):
+        location, etag = self.canonical('data=1011&technique=vrc')
+        with mock.patch('apps.error_detection.api.serializers.ALGORITHM_VERSION', ALGORITHM_VERSION + 1):
+            response = self.client.get(location)
+            self.assertEqual(response.status_code, 301)
+            self.assertEqual(response['Location'],
+                             f'/api/detect-error/?data=1011&technique=vrc&v={ALGORITHM_VERSION + 1}')
+            self.assertNotEqual(self.client.get(response['Location'])['ETag'], etag)
+
+    def test_cache_headers(self):
+        redirect = self.client.get('/api/detect-error/?technique=vrc&data=1011')
+        self.assertEqual(redirect.status_code, 301)
+        self.assertEqual(redirect['Cache-Control'], 'public, max-age=3600')
+        response = self.client.get(redirect['Location'])
+        self.assertEqual(response['Cache-Control'], f'public, immutable, max-age={365 * 24 * 60 * 60}')
+        not_modified = self.client.get(redirect['Location'], HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual((not_modified.status_code, not_modified['Cache-Control']), (304, response['Cache-Control']))
+
+    def test_step_limit_is_post_only(self):
+        for query in ('data=1011&technique=vrc&step_limit=2',
+                      f'data=1011&technique=vrc&v={ALGORITHM_VERSION}&step_limit=2'):
+            response = self.client.get(f'/api/detect-error/?{query}')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data['step_limit'], ['Paged steps are only available with POST.'])
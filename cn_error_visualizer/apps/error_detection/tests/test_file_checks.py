@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from ..algorithms.checksum import run_checksum
+from ..algorithms.crc import run_crc
+from ..algorithms.crc_engine import CRC_PRESETS
+from ..algorithms.lrc import run_lrc
+from ..services.bit_vector import BitVector
+from ..services.file_checks import build_digests, check_file, iter_file_chunks, run_checks
+from ..services.step_tracker import StepTracker
+from . import reference
+
+# zlib, binascii and the table engine for CRC; block sizes below, equal to and not dividing a byte
+SETTINGS = [
+    (CRC_PRESETS['crc-32'], 16),
+    (CRC_PRESETS['crc-16-ccitt'], 12),
+    ('1011', 5),
+    ('100000111', 8),
+]
+SIZES = (1, 3, 7, 1000, 4099)
+CHUNK_SIZES = (1, 3, 5, 1024, 1 << 20)
+
+
+def one_shot(data, generator, block_size):
+    # Check values the visualised algorithms append to the same bits
+    bits = BitVector.from_bytes(data)
+    off = StepTracker.OFF
+    width = len(generator) - 1
+    return {
+        "crc": run_crc(bits, generator, engine='table', tracker=StepTracker(off))["transmitted_data"][-width:],
+        "checksum": run_checksum(bits, tracker=StepTracker(off), block_size=block_size)["transmitted_data"][-block_size:],
+        "lrc": run_lrc(bits, tracker=StepTracker(off), block_size=block_size)["transmitted_data"][-block_size:],
+    }
+
+
+class FileCheckTests(SimpleTestCase):
+
+    def setUp(self):
+        self.rng = reference.seeded()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, data):
+        path = os.path.join(self.directory.name, 'data.bin')
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_matches_one_shot_algorithms(self):
+        for size in SIZES:
+            data = self.rng.randbytes(size)
+            path = self.write(data)
+            for generator, block_size in SETTINGS:
+                expected = one_shot(data, generator, block_size)
+                for chunk_size in CHUNK_SIZES:
+                    report = check_file(path, generator=generator, block_size=block_size, chunk_size=chunk_size)
+                    self.assertEqual(report["bytes"], size)
+                    self.assertEqual(report["chunks"], -(-size // chunk_size))
+                    results = {name: result["bits"] for name, result in report["results"].items()}
+                    self.assertEqual(results, expected, (size, generator, block_size, chunk_size))
+
+    def test_in_memory_chunks_match_file(self):
+        # The upload path feeds bytes instead of memoryviews
+        data = self.rng.randbytes(777)
+        path = self.write(data)
+        for generator, block_size in SETTINGS:
+            chunks = [data[i:i + 10] for i in range(0, len(data), 10)]
+            in_memory = run_checks(chunks, build_digests(('crc', 'checksum', 'lrc'), generator, block_size))
+            from_file = check_file(path, generator=generator, block_size=block_size, chunk_size=10)
+            self.assertEqual(in_memory["results"], from_file["results"])
+
+    def test_sidecar_has_each_chunks_own_values(self):
+        data = self.rng.randbytes(50)
+        path = self.write(data)
+        sidecar = os.path.join(self.directory.name, 'chunks.jsonl')
+        check_file(path, generator='1011', block_size=5, chunk_size=15, sidecar=sidecar)
+        with open(sidecar) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([(line["offset"], line["length"]) for line in lines], [(0, 15), (15, 15), (30, 15), (45, 5)])
+        for line in lines:
+            chunk = data[line["offset"]:line["offset"] + line["length"]]
+            results = {name: result["bits"] for name, result in line["results"].items()}
+            self.assertEqual(results, one_shot(chunk, '1011', 5))
+
+    def test_empty_file(self):
+        path = self.write(b'')
+        self.assertEqual(list(iter_file_chunks(path)), [])
+        report = check_file(path, generator='1011', block_size=8)
+        # Zero remainder and parity; the checksum is the complement of an empty (zero) sum
+        self.assertEqual((report["bytes"], report["chunks"]), (0, 0))
+        self.assertEqual({name: result["bits"] for name, result in report["results"].items()},
+                         {"crc": "000", "checksum": "11111111", "lrc": "00000000"})
@@ -0,0 +1,100 @@
+from itertools import combinations
+
+from django.test import SimpleTestCase
+
+from ..algorithms.hamming import CORRECTED, OK, UNCORRECTABLE, HammingCode, hamming_code, run_hamming, verify_hamming
+from ..services.step_tracker import StepTracker
+from . import reference
+from .reference import random_bits
+
+# (parity_bits, extended): Hamming(3,1) to Hamming(63,57), with and without the overall parity bit
+CODES = [(r, extended) for r in range(2, 7) for extended in (False, True)]
+
+
+def flip(bits, *positions):
+    bits = list(bits)
+    for position in positions:
+        bits[position] = '1' if bits[position] == '0' else '0'
+    return ''.join(bits)
+
+
+class HammingTests(SimpleTestCase):
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def data_words(self, code, count=8):
+        if code.k <= 8:
+            return range(1 << code.k)
+        return [self.rng.getrandbits(code.k) for _ in range(count)]
+
+    def test_codewords_have_zero_syndrome(self):
+        for r, extended in CODES:
+            code = HammingCode(r, extended)
+            for data in self.data_words(code):
+                self.assertEqual(code.decode(code.encode(data)), (data, 0, OK, None))
+
+    def test_every_single_error_corrected(self):
+        for r, extended in CODES:
+            code = HammingCode(r, extended)
+            for data in self.data_words(code):
+                word = code.encode(data)
+                for position in range(code.n):
+                    decoded, syndrome, status, corrected = code.decode(word ^ (1 << (code.n - 1 - position)))
+                    self.assertEqual((decoded, status, corrected), (data, CORRECTED, position), (r, extended, data))
+                    self.assertNotEqual(syndrome, 0)
+
+    def test_every_double_error_detected_by_secded(self):
+        for r in range(2, 7):
+            code = HammingCode(r, True)
+            for data in self.data_words(code, count=2):
+                word = code.encode(data)
+                for first, second in combinations(range(code.n), 2):
+                    error = (1 << (code.n - 1 - first)) | (1 << (code.n - 1 - second))
+                    _, syndrome, status, position = code.decode(word ^ error)
+                    self.assertEqual((status, position), (UNCORRECTABLE, None), (r, first, second))
+                    self.assertNotEqual(syndrome, 0)
+
+    def test_double_errors_miscorrected_without_secded(self):
+        # A plain Hamming code decodes two errors as a (wrong) single correction
+        code = HammingCode(3)
+        word = code.encode(0b1011)
+        decoded, _, status, _ = code.decode(word ^ 0b1100000)
+        self.assertEqual(status, CORRECTED)
+        self.assertNotEqual(decoded, 0b1011)
+
+    def test_tables_match_direct_decoding(self):
+        for r, extended in CODES:
+            code = HammingCode(r, extended)
+            if code.n > 16:
+                continue
+            for word in range(1 << code.n):
+                data, syndrome, status, position = code.decode(word)
+                expected = (format(data, f'0{code.k}b'), format(syndrome, code.syndrome_format), status, position)
+                self.assertEqual(code.decode_table[format(word, f'0{code.n}b')], expected)
+
+    def test_messages(self):
+        for r, extended in CODES:
+            code = hamming_code(r, extended)
+            text = random_bits(self.rng, code.k * 5)
+            encoded = code.encode_message(text)
+            self.assertEqual(encoded, ''.join(format(code.encode(int(text[i:i + code.k], 2)), f'0{code.n}b')
+                                              for i in range(0, len(text), code.k)))
+            errors = [i * code.n + self.rng.randrange(code.n) for i in range(5)]
+            decoded, _, statuses, _ = code.decode_message(flip(encoded, *errors))
+            self.assertEqual(decoded, text)
+            self.assertEqual(set(statuses), {CORRECTED})
+
+    def test_run_and_verify(self):
+        for trace in StepTracker.MODES:
+            result = run_hamming('1011001', introduce_error=True, tracker=StepTracker(trace), parity_bits=3)
+            self.assertEqual(result["corrected_data"], '1011001')
+            self.assertEqual((result["error_detected"], result["error_corrected"], result["corrections"]),
+                             (True, True, 1))
+        codeword = run_hamming('10110011', parity_bits=3, extended=True)["transmitted_data"]
+        self.assertFalse(verify_hamming(codeword, parity_bits=3, extended=True)["error_detected"])
+        double = verify_hamming(flip(codeword, 0, 1), parity_bits=3, extended=True)
+        self.assertEqual((double["error_detected"], double["error_corrected"], double["uncorrectable_blocks"]),
+                         (True, False, 1))
+        with self.assertRaises(ValueError):
+            verify_hamming(codeword[:-1], parity_bits=3, extended=True)
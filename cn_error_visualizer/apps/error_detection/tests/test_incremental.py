@@ -0,0 +1,77 @@
+from django.test import SimpleTestCase
+
+from ..algorithms.checksum import run_checksum, verify_checksum
+from ..algorithms.crc import run_crc, verify_crc
+from ..algorithms.crc_engine import CRC_PRESETS
+from ..services.bit_utils import default_block_size
+from ..services.incremental import ENCODE, VERIFY, finalize, new_state, update
+from . import reference
+from .reference import random_bits
+
+
+class IncrementalTests(SimpleTestCase):
+    """Feeding a stream chunk by chunk gives the one-shot result, however it is split."""
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def chunks(self, bits):
+        # Random cut points, including empty and single-bit chunks
+        cuts = sorted(self.rng.randrange(len(bits) + 1) for _ in range(self.rng.randrange(6)))
+        bounds = [0] + cuts + [len(bits)]
+        return [bits[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+    def stream(self, state, bits, mode):
+        for chunk in self.chunks(bits):
+            update(state, chunk)
+        return finalize(state, mode)
+
+    def test_crc_encode(self):
+        for generator in ('11', '1011', CRC_PRESETS['crc-8'], CRC_PRESETS['crc-32']):
+            for length in (1, 5, 8, 33, 300):
+                bits = random_bits(self.rng, length)
+                expected = run_crc(bits, generator, engine='table')["transmitted_data"][length:]
+                result = self.stream(new_state('crc', generator), bits, ENCODE)
+                self.assertEqual(result["remainder"], expected)
+
+    def test_crc_verify(self):
+        for generator in ('1011', CRC_PRESETS['crc-16-ccitt']):
+            for length in (4, 40, 300):
+                codeword = run_crc(random_bits(self.rng, length), generator, engine='table')["transmitted_data"]
+                corrupted = ('1' if codeword[0] == '0' else '0') + codeword[1:]
+                for received in (codeword, corrupted):
+                    expected = verify_crc(received, generator, engine='table')
+                    result = self.stream(new_state('crc', generator), received, VERIFY)
+                    self.assertEqual(result["syndrome"], expected["syndrome"])
+                    self.assertEqual(result["error_detected"], expected["error_detected"])
+
+    def test_checksum_encode(self):
+        for block_size in (None, 4, 8, 16):
+            for length in (1, 7, 16, 17, 100, 333):
+                bits = random_bits(self.rng, length)
+                size = block_size or default_block_size(length)
+                expected = run_checksum(bits, block_size=block_size)["transmitted_data"][-size:]
+                result = self.stream(new_state('checksum', block_size=block_size), bits, ENCODE)
+                self.assertEqual((result["checksum"], result["block_size"]), (expected, size))
+
+    def test_checksum_verify(self):
+        for block_size in (None, 8, 16):
+            for length in (8, 16, 64, 200):
+                codeword = run_checksum(random_bits(self.rng, length), block_size=block_size)["transmitted_data"]
+                corrupted = codeword[:-1] + ('0' if codeword[-1] == '1' else '1')
+                for received in (codeword, corrupted):
+                    expected = verify_checksum(received, block_size=block_size)
+                    result = self.stream(new_state('checksum', block_size=block_size), received, VERIFY)
+                    self.assertEqual(result["syndrome"], expected["syndrome"])
+                    self.assertEqual(result["error_detected"], expected["error_detected"])
+
+    def test_all_zero_stream(self):
+        result = self.stream(new_state('checksum', block_size=8), '0' * 24, ENCODE)
+        self.assertEqual(result["checksum"], run_checksum('0' * 24, block_size=8)["transmitted_data"][-8:])
+
+    def test_empty_and_short_streams(self):
+        with self.assertRaises(ValueError):
+            finalize(new_state('crc', '1011'))
+        state = update(new_state('crc', '1011'), '10')
+        with self.assertRaises(ValueError):
+            finalize(state, VERIFY)
@@ -0,0 +1,49 @@
+from django.test import SimpleTestCase
+
+from ..algorithms.lrc import run_lrc, verify_lrc
+from ..services.bit_utils import default_block_size
+from ..services.bit_vector import BitVector
+from ..services.step_tracker import StepTracker
+from . import reference
+from .reference import random_bits
+
+
+class LRCTests(SimpleTestCase):
+    """The XOR fold gives the same column parities as counting each column."""
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def test_xor_fold(self):
+        for size in (1, 2, 4, 8, 13, 64):
+            for rows in (1, 2, 3, 7, 8, 33):
+                for _ in range(5):
+                    bits = random_bits(self.rng, size * rows)
+                    self.assertEqual(format(BitVector.from_string(bits).xor_fold(size), f'0{size}b'),
+                                     reference.column_parities(bits, size))
+
+    def test_sender_matches_reference(self):
+        for length in (3, 8, 16, 17, 64, 250):
+            for block_size in (None, 4, 8, 16):
+                bits = random_bits(self.rng, length)
+                size = block_size or default_block_size(length)
+                padded = bits + '0' * (-length % size)
+                for trace in StepTracker.MODES:
+                    result = run_lrc(bits, tracker=StepTracker(trace), block_size=block_size)
+                    self.assertEqual(result["transmitted_data"], padded + reference.column_parities(padded, size))
+                    self.assertFalse(result["error_detected"])
+
+    def test_full_trace_reports_each_column(self):
+        result = run_lrc('1011001110001111', tracker=StepTracker(StepTracker.FULL))
+        parities = [step["state"]["parity_bit"] for step in result["steps"] if "highlight_col" in step["state"]]
+        self.assertEqual(''.join(parities), reference.column_parities('1011001110001111', 4))
+
+    def test_receiver(self):
+        for length in (16, 40, 128):
+            codeword = run_lrc(random_bits(self.rng, length))["transmitted_data"]
+            clean = verify_lrc(codeword)
+            self.assertFalse(clean["error_detected"])
+            self.assertEqual(clean["syndrome"], reference.column_parities(codeword, len(clean["syndrome"])))
+            index = self.rng.randrange(len(codeword))
+            corrupted = codeword[:index] + ('0' if codeword[index] == '1' else '1') + codeword[index + 1:]
+            self.assertTrue(verify_lrc(corrupted)["error_detected"])
@@ -0,0 +1,43 @@
+from django.test import SimpleTestCase, override_settings
+
+from ..api.serializers import PatternSweepRequestSerializer
+from ..services.pattern_sweep import run_sweep
+from . import reference
+
+
+class PatternSweepTests(SimpleTestCase):
+
+    def test_single_errors_detected(self):
+        for report in run_sweep(['vrc', 'lrc', 'crc', 'checksum'], '1011001110001111', max_weight=2):
+            self.assertEqual(report["weights"][0]["undetected"], 0)
+
+    def test_vrc_misses_every_double_error(self):
+        weights = run_sweep(['vrc'], '10110011', max_weight=3)[0]["weights"]
+        self.assertEqual([weight["undetected_fraction"] for weight in weights], [0.0, 1.0, 0.0])
+
+    def test_codewords_bypass_cache_and_run_store(self):
+        reference.assert_bypasses_cache_and_run_store(self, run_sweep, ['vrc', 'lrc', 'crc', 'checksum'],
+                                                      '110100111010', max_weight=1)
+
+
+@override_settings(ERROR_DETECTION_SWEEP_MAX_BITS=64)
+class PatternSweepRequestTests(SimpleTestCase):
+
+    def test_frame_length_builds_zero_frame(self):
+        serializer = PatternSweepRequestSerializer(data={'frame_length': 64})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['data'], '0' * 64)
+
+    def test_frame_length_limited_before_frame_is_built(self):
+        # A frame this long would not fit in memory if it were built first
+        serializer = PatternSweepRequestSerializer(data={'frame_length': 10 ** 12})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('frame_length', serializer.errors)
+
+    def test_data_limited(self):
+        serializer = PatternSweepRequestSerializer(data={'data': '1' * 65})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('data', serializer.errors)
+
+    def test_data_or_frame_length_required(self):
+        self.assertFalse(PatternSweepRequestSerializer(data={}).is_valid())
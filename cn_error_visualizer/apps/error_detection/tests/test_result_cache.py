@@ -0,0 +1,87 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from ..services.result_cache import STEP_SIZE_ESTIMATE, ResultCache, canonical_key, estimate_size
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+}
+
+
+def result(size, steps=0):
+    # A result whose estimated size is `size` bytes plus its steps
+    return {"transmitted_data": "1" * size, "steps": [{"title": ""}] * steps}
+
+
+class ResultCacheTests(SimpleTestCase):
+
+    def test_estimate_size(self):
+        self.assertEqual(estimate_size(result(10, steps=3)), 10 + 3 * STEP_SIZE_ESTIMATE)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResultCache(max_entries=2)
+        cache.set('a', result(1))
+        cache.set('b', result(1))
+        cache.get('a')
+        cache.set('c', result(1))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual((cache.stats()['entries'], cache.stats()['evictions']), (2, 1))
+
+    def test_byte_budget(self):
+        cache = ResultCache(max_bytes=100)
+        for key in 'abc':
+            cache.set(key, result(40))
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['bytes'], stats['evictions']), (2, 80, 1))
+        self.assertIsNone(cache.get('a'))
+
+        # Replacing an entry releases its old size first
+        cache.set('b', result(60))
+        self.assertEqual(cache.stats()['bytes'], 100)
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_oversize_entries_skipped(self):
+        cache = ResultCache(max_bytes=100)
+        cache.set('small', result(50))
+        cache.set('large', result(60, steps=1))
+        self.assertIsNone(cache.get('large'))
+        self.assertIsNotNone(cache.get('small'))
+        self.assertEqual(cache.stats()['evictions'], 0)
+
+    def test_get_returns_shallow_copy(self):
+        cache = ResultCache()
+        cache.set('a', result(4))
+        cache.get('a')['cache_hit'] = True
+        self.assertNotIn('cache_hit', cache.get('a'))
+
+    @override_settings(CACHES=TEST_CACHES)
+    def test_backend_alias_shared_between_caches(self):
+        caches['shared'].clear()
+        writer, reader = ResultCache(backend_alias='shared'), ResultCache(backend_alias='shared')
+        writer.set('a', result(4))
+        self.assertIsNone(ResultCache().get('a'))
+
+        found = reader.get('a')
+        self.assertEqual(found, result(4))
+        found['cache_hit'] = True
+        self.assertEqual(reader.stats()['entries'], 1)
+        caches['shared'].clear()
+        # Served from the local copy now, which the caller's change did not touch
+        self.assertEqual(reader.get('a'), result(4))
+        self.assertEqual((reader.stats()['hits'], reader.stats()['misses']), (2, 0))
+
+    def test_canonical_key_fills_default_block_size(self):
+        for technique in ('lrc', 'checksum'):
+            short, long = '1' * 12, '1' * 40
+            self.assertEqual(canonical_key(technique, short), canonical_key(technique, short, block_size=4))
+            self.assertEqual(canonical_key(technique, long), canonical_key(technique, long, block_size=8))
+            self.assertNotEqual(canonical_key(technique, long), canonical_key(technique, long, block_size=16))
+
+    def test_canonical_key_drops_ignored_params(self):
+        self.assertEqual(canonical_key('vrc', '1011'), canonical_key('vrc', '1011', block_size=8, generator='1011'))
+        self.assertEqual(canonical_key('crc', '1011', generator='1011'),
+                         canonical_key('crc', '1011', generator='1011', block_size=8))
+        self.assertNotEqual(canonical_key('crc', '1011', generator='1011'), canonical_key('crc', '1011'))
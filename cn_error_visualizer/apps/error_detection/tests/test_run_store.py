@@ -0,0 +1,155 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from ..models import DetectionRun
+from ..services import run_store
+from ..services.algorithm_factory import AlgorithmFactory
+from ..services.result_cache import canonical_key, estimate_size
+from ..services.run_store import RunWriter, build_run, decode_payload, encode_payload, load_stored_run, lookup, run_history
+from . import reference
+from .reference import random_bits
+
+
+def compute(technique, data, **params):
+    # (key, run_algorithm params, result) of a run computed outside the cache
+    params = dict(params, technique=technique, data=data)
+    return canonical_key(**params), params, AlgorithmFactory._run(**params)
+
+
+def json_round_trip(value):
+    return json.loads(json.dumps(value))
+
+
+@override_settings(ERROR_DETECTION_RUN_STORE=True, ERROR_DETECTION_RUN_STORE_LOOKUP_MIN_BITS=32)
+class RunStoreTests(TestCase):
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def store(self, technique, data, duration=1.0, **params):
+        key, params, result = compute(technique, data, **params)
+        run = build_run(key, params, result, duration, timezone.now())
+        run.save()
+        return key, result, run.id
+
+    def test_payload_round_trip(self):
+        for length in (8, 400):
+            _, _, result = compute('crc', random_bits(self.rng, length), generator='1011')
+            payload, compressed, size = encode_payload(result)
+            self.assertEqual(compressed, size >= 1024)
+            self.assertEqual(decode_payload(payload, compressed), json_round_trip(result))
+            self.assertEqual(decode_payload(memoryview(payload), compressed), json_round_trip(result))
+
+    @override_settings(ERROR_DETECTION_RUN_STORE_MAX_PAYLOAD_BYTES=200)
+    def test_oversize_payload_not_kept(self):
+        _, _, result = compute('vrc', random_bits(self.rng, 64))
+        payload, compressed, size = encode_payload(result)
+        self.assertEqual((payload, compressed), (None, False))
+        self.assertEqual(size, len(json.dumps(result, separators=(",", ":")).encode()))
+
+        _, _, run_id = self.store('vrc', random_bits(self.rng, 64))
+        stored = load_stored_run(run_id)
+        self.assertIsNone(stored["result"])
+        self.assertEqual(stored["step_count"], len(result["steps"]))
+
+    def test_history_pages(self):
+        for index in range(9):
+            technique = ('vrc', 'crc', 'checksum')[index % 3]
+            self.store(technique, random_bits(self.rng, 12), generator='1011', introduce_error=index % 2 == 0)
+        for filters in ({}, {'technique': 'crc'}, {'error_detected': True}, {'technique': 'vrc', 'error_detected': False}):
+            expected = list(DetectionRun.objects.filter(**filters).order_by('-id').values_list('id', flat=True))
+            self.assertTrue(expected, filters)
+            for limit in (1, 2, len(expected), len(expected) + 1):
+                seen, cursor = [], None
+                while True:
+                    rows, next_cursor = run_history(cursor=cursor, limit=limit, **filters)
+                    self.assertLessEqual(len(rows), limit)
+                    seen += [row["id"] for row in rows]
+                    if next_cursor is None:
+                        break
+                    self.assertEqual(next_cursor, rows[-1]["id"])
+                    cursor = next_cursor
+                self.assertEqual(seen, expected, (filters, limit))
+
+    def test_lookup_thresholds(self):
+        data = random_bits(self.rng, 40)
+        key, result, _ = self.store('checksum', data, duration=10.0, block_size=8)
+        self.assertEqual(lookup(key, len(data)), json_round_trip(result))
+        # Below LOOKUP_MIN_BITS the store is not queried at all
+        with self.assertNumQueries(0):
+            self.assertIsNone(lookup(key, 31))
+        with override_settings(ERROR_DETECTION_RUN_STORE=False), self.assertNumQueries(0):
+            self.assertIsNone(lookup(key, len(data)))
+
+        # Runs faster than decoding their payload are recomputed instead
+        fast_key, _, _ = self.store('vrc', data, duration=0.0)
+        self.assertIsNone(lookup(fast_key, len(data)))
+        untimed_key, _, _ = self.store('lrc', data, duration=None)
+        self.assertIsNone(lookup(untimed_key, len(data)))
+
+    def test_lookup_serves_cache_misses(self):
+        data = random_bits(self.rng, 40)
+        key, result, _ = self.store('crc', data, duration=10.0, generator='1011')
+        with mock.patch.object(AlgorithmFactory, '_run') as run:
+            served = AlgorithmFactory.run_algorithm('crc', data, generator='1011', use_cache=True)
+        run.assert_not_called()
+        self.assertEqual(served, json_round_trip(result))
+
+
+class RunWriterTests(TransactionTestCase):
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def held_writer(self, **kwargs):
+        # A writer whose thread has not started yet, so queued runs stay pending
+        writer = RunWriter(interval=0.01, **kwargs)
+        self.addCleanup(writer.close)
+        patcher = mock.patch.object(writer, '_start')
+        patcher.start()
+        return writer, patcher
+
+    def test_flush_writes_every_submitted_run(self):
+        writer = RunWriter(batch_size=2, interval=0.01)
+        self.addCleanup(writer.close)
+        runs = [compute('vrc', random_bits(self.rng, 16)) for _ in range(5)]
+        for key, params, result in runs:
+            writer.submit(key, params, result, 0.001)
+        writer.flush()
+        self.assertEqual(writer.stats(), {"written": 5, "dropped": 0, "failed": 0, "pending": 0, "pending_bytes": 0})
+        self.assertEqual(sorted(DetectionRun.objects.values_list('input_hash', flat=True)),
+                         sorted(key for key, _, _ in runs))
+
+    def test_full_queue_drops_runs(self):
+        writer, patcher = self.held_writer(max_pending=2)
+        for _ in range(3):
+            writer.submit(*compute('vrc', random_bits(self.rng, 16)))
+        self.assertEqual((writer.stats()["pending"], writer.stats()["dropped"]), (2, 1))
+
+        patcher.stop()
+        writer._start()
+        writer.flush()
+        self.assertEqual((writer.stats()["written"], DetectionRun.objects.count()), (2, 2))
+
+    def test_byte_budget_drops_runs(self):
+        key, params, result = compute('crc', random_bits(self.rng, 64), generator='1011')
+        size = estimate_size(result)
+        writer, patcher = self.held_writer(max_pending_bytes=size * 3 // 2)
+        writer.submit(key, params, result)
+        writer.submit(key, params, result)
+        self.assertEqual(writer.stats()["dropped"], 1)
+        self.assertEqual(writer.stats()["pending_bytes"], size)
+
+        patcher.stop()
+        writer._start()
+        writer.flush()
+        self.assertEqual((writer.stats()["written"], writer.stats()["pending_bytes"]), (1, 0))
+
+    @override_settings(ERROR_DETECTION_RUN_STORE=False)
+    def test_disabled_store_records_nothing(self):
+        with mock.patch.object(run_store, 'get_writer') as get_writer:
+            run_store.record('key', {'technique': 'vrc', 'data': '1'}, {})
+        get_writer.assert_not_called()
@@ -0,0 +1,78 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..algorithms.crc import run_crc
+from ..services.incremental import SESSION_LOCK_KEY, SessionError, append_chunk, create_session, load_session
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES, ERROR_DETECTION_SESSION_CACHE='sessions')
+class SessionTests(SimpleTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        caches['sessions'].clear()
+
+    def open(self, **body):
+        response = self.client.post('/api/sessions/', dict({'technique': 'crc', 'generator': '1011'}, **body),
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['session_id']
+
+    def send(self, session_id, data, **body):
+        return self.client.post(f'/api/sessions/{session_id}/chunks/', dict(body, data=data), format='json')
+
+    def test_chunks_match_one_shot(self):
+        session_id = self.open()
+        for offset, chunk in ((0, '1101'), (4, '0011'), (8, '101')):
+            self.assertEqual(self.send(session_id, chunk, offset=offset).status_code, 200)
+        response = self.client.post(f'/api/sessions/{session_id}/finalize/', format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['remainder'], run_crc('11010011101', '1011')['transmitted_data'][11:])
+        self.assertEqual(self.send(session_id, '1').status_code, 404)
+
+    def test_sessions_use_configured_cache(self):
+        session_id = self.open()
+        self.assertIsNotNone(caches['sessions'].get(f'error_detection:session:{session_id}'))
+        self.assertIsNone(caches['default'].get(f'error_detection:session:{session_id}'))
+
+    def test_wrong_offset_conflicts(self):
+        session_id = self.open()
+        self.send(session_id, '1101')
+        response = self.send(session_id, '0011', offset=0)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['bits_received'], 4)
+
+    def test_concurrent_append_is_refused(self):
+        # A chunk arriving while another request holds the session lock must not overwrite its update
+        session_id = self.open()
+        self.send(session_id, '1101')
+        caches['sessions'].add(SESSION_LOCK_KEY.format(session_id), 'other-request')
+        response = self.send(session_id, '0011')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['bits_received'], 4)
+        with self.assertRaises(SessionError):
+            append_chunk(session_id, '0011')
+        self.assertEqual(self.client.post(f'/api/sessions/{session_id}/finalize/').status_code, 409)
+        self.assertEqual(self.client.delete(f'/api/sessions/{session_id}/').status_code, 409)
+
+        caches['sessions'].delete(SESSION_LOCK_KEY.format(session_id))
+        self.assertEqual(self.send(session_id, '0011', offset=4).data['bits_received'], 8)
+
+    def test_lock_released_after_errors(self):
+        session_id = create_session('checksum', 'verify', block_size=8)
+        append_chunk(session_id, '1' * 4)
+        self.assertEqual(self.client.post(f'/api/sessions/{session_id}/finalize/').status_code, 400)
+        self.assertEqual(append_chunk(session_id, '1' * 12), 16)
+        self.assertIsNone(caches['sessions'].get(SESSION_LOCK_KEY.format(session_id)))
+
+    def test_delete(self):
+        session_id = self.open()
+        self.assertEqual(self.client.delete(f'/api/sessions/{session_id}/').status_code, 204)
+        self.assertIsNone(load_session(session_id))
+        self.assertEqual(self.client.delete(f'/api/sessions/{session_id}/').status_code, 404)
@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase
+
+from ..services.ber_simulator import BURST, run_simulation
+from . import reference
+
+
+class SimulationTests(SimpleTestCase):
+
+    def test_seeded_runs_repeat(self):
+        kwargs = dict(techniques=['vrc', 'crc'], data='1011001110001111', values=(0.01, 0.1), trials=2000, seed=7)
+        self.assertEqual(run_simulation(**kwargs), run_simulation(**kwargs))
+
+    def test_short_bursts_always_detected_by_crc(self):
+        # A CRC with an r-bit remainder catches every burst of length <= r
+        points = run_simulation(['crc'], '1011001110001111', channel=BURST, values=(1, 2, 3), trials=500,
+                                generator='1011', seed=1)
+        self.assertEqual([point["undetected"] for point in points], [0, 0, 0])
+
+    def test_codewords_bypass_cache_and_run_store(self):
+        reference.assert_bypasses_cache_and_run_store(self, run_simulation, ['vrc', 'lrc', 'crc', 'checksum'],
+                                                      '110100111010', values=(0.05,), trials=100, seed=3)
@@ -0,0 +1,41 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from ..services.algorithm_factory import AlgorithmFactory
+from ..services.step_replay import RUN_CACHE_KEY, load_run, replay_steps, run_paged
+from ..services.step_tracker import StepTracker
+from . import reference
+from .reference import TECHNIQUE_PARAMS, random_bits
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'runs': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'runs'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES, ERROR_DETECTION_RUN_CACHE='runs', ERROR_DETECTION_CHECKPOINT_INTERVAL=8)
+class StepReplayTests(SimpleTestCase):
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def test_windows_match_full_trace(self):
+        # Every window replayed from the checkpoints is the matching slice of one uninterrupted run
+        for technique, extra in TECHNIQUE_PARAMS.items():
+            params = dict(extra, technique=technique, data=random_bits(self.rng, 56), introduce_error=True,
+                          trace='full')
+            full = AlgorithmFactory._run(tracker=StepTracker(), **params)["steps"]
+            first = run_paged(params, 10)
+            self.assertEqual(first["steps"], full[:10], technique)
+            self.assertEqual(first["total_steps"], len(full), technique)
+
+            run = load_run(first["run_id"])
+            total = len(full)
+            for start, stop in ((0, 5), (10, 30), (17, 18), (total // 2, total - 3), (total - 7, total + 5)):
+                self.assertEqual(replay_steps(run, start, stop), full[start:stop], (technique, start, stop))
+            self.assertEqual(replay_steps(run, total, total + 5), [])
+
+    def test_runs_use_configured_cache(self):
+        run_id = run_paged({'technique': 'vrc', 'data': '1011001', 'trace': 'full'}, 2)["run_id"]
+        self.assertIsNotNone(caches['runs'].get(RUN_CACHE_KEY.format(run_id)))
+        self.assertIsNone(caches['default'].get(RUN_CACHE_KEY.format(run_id)))
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import time
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..services.algorithm_factory import AlgorithmFactory
+from ..services.step_stream import (
+    RESULT, STEPS, StepStream, StreamsBusy, active_streams, aiter_events, iter_events,
+)
+from ..services.step_tracker import StepTracker
+
+
+def parse(events):
+    # (kind, payload) of every event, keep-alive comments skipped
+    parsed = []
+    for event in events:
+        if event.startswith(b':'):
+            continue
+        kind, data = event.decode().strip().split('\n')
+        parsed.append((kind[len('event: '):], json.loads(data[len('data: '):])))
+    return parsed
+
+
+def wait_until_idle(timeout=5):
+    deadline = time.monotonic() + timeout
+    while active_streams() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return active_streams() == 0
+
+
+class StepStreamTests(SimpleTestCase):
+    params = {'technique': 'crc', 'data': '1101011011', 'generator': '1011', 'engine': 'bitwise', 'trace': 'full'}
+
+    def tearDown(self):
+        self.assertTrue(wait_until_idle())
+
+    def test_streamed_steps_match_full_trace(self):
+        stream = StepStream(chunk_steps=4)
+        stream.start(self.params)
+        events = parse(iter_events(stream))
+        expected = AlgorithmFactory._run(tracker=StepTracker(), **self.params)
+        steps = [step for kind, payload in events if kind == STEPS for step in payload["steps"]]
+        self.assertEqual(steps, expected["steps"])
+        kind, result = events[-1]
+        self.assertEqual((kind, result["total_steps"]), (RESULT, len(expected["steps"])))
+        self.assertEqual(result["transmitted_data"], expected["transmitted_data"])
+
+    def test_async_events_match(self):
+        async def collect(stream):
+            return [event async for event in aiter_events(stream)]
+
+        stream = StepStream(chunk_steps=4)
+        stream.start(self.params)
+        sync_stream = StepStream(chunk_steps=4)
+        sync_stream.start(self.params)
+        self.assertEqual(parse(asyncio.run(collect(stream)))[-1], parse(iter_events(sync_stream))[-1])
+
+    @override_settings(ERROR_DETECTION_SSE_MAX_STREAMS=1)
+    def test_streams_beyond_limit_are_refused(self):
+        # One step per chunk and one chunk of buffer: the unread stream stays blocked in its producer
+        held = StepStream(chunk_steps=1, max_chunks=1)
+        held.start(self.params)
+        with self.assertRaises(StreamsBusy):
+            StepStream().start(self.params)
+        response = APIClient().get('/api/detect-error/stream/', self.params, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+        # Dropping the client frees the slot
+        events = iter_events(held)
+        next(events)
+        events.close()
+        self.assertTrue(wait_until_idle())
+        stream = StepStream()
+        stream.start(self.params)
+        self.assertEqual(parse(iter_events(stream))[-1][0], RESULT)
+
+    def test_cancel_ends_a_blocked_wait(self):
+        stream = StepStream()
+        start = time.monotonic()
+        stream.cancel()
+        self.assertIsNone(stream.next_event(10))
+        self.assertLess(time.monotonic() - start, 1)
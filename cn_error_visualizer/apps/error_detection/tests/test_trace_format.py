@@ -0,0 +1,58 @@
+import json
+
+from django.test import SimpleTestCase
+
+from ..services.algorithm_factory import AlgorithmFactory
+from ..services.step_tracker import StepTracker
+from ..services.trace_format import COLUMNAR, STEPS, decode_columnar, encode_columnar, encode_result
+from . import reference
+from .reference import TECHNIQUE_PARAMS, random_bits
+
+
+def json_round_trip(value):
+    return json.loads(json.dumps(value))
+
+
+class ColumnarTraceTests(SimpleTestCase):
+
+    def setUp(self):
+        self.rng = reference.seeded()
+
+    def assertRoundTrips(self, steps):
+        encoded = encode_columnar(steps)
+        self.assertEqual(decode_columnar(encoded), steps)
+        # What a client decodes after the JSON response (string keys, lists for tuples)
+        self.assertEqual(decode_columnar(json_round_trip(encoded)), json_round_trip(steps))
+        return encoded
+
+    def test_every_technique_trace(self):
+        for technique, extra in TECHNIQUE_PARAMS.items():
+            for introduce_error in (False, True):
+                steps = AlgorithmFactory._run(technique, random_bits(self.rng, 70), tracker=StepTracker(),
+                                              introduce_error=introduce_error, **extra)["steps"]
+                self.assertTrue(steps, technique)
+                encoded = self.assertRoundTrips(steps)
+                self.assertEqual(encoded["count"], len(steps))
+
+    def test_removed_and_retyped_state_keys(self):
+        long_bits = '1011001110001111'
+        steps = [
+            {"title": "Step 1", "description": f"Load {long_bits}", "state": {"a": 1, "b": long_bits, "c": True}},
+            {"title": "Step 2", "description": "Drop b", "state": {"a": 1, "c": True}},
+            {"title": "Step 3", "description": "Retype", "state": {"a": True, "c": 1}},
+            {"title": "Step 4", "description": "Empty", "state": {}},
+            {"title": "Step 5", "description": f"Back {long_bits}", "state": {"b": long_bits, "d": [1, 0]}},
+        ]
+        encoded = self.assertRoundTrips(steps)
+        self.assertEqual(encoded["state_unset"], {"1": ["b"], "3": ["a", "c"]})
+        self.assertEqual(encoded["strings"], [long_bits])
+        self.assertEqual(len(encoded["templates"]), 6)
+
+    def test_empty_trace(self):
+        self.assertEqual(self.assertRoundTrips([])["count"], 0)
+
+    def test_encode_result(self):
+        result = {"transmitted_data": "10110", "steps": [{"title": "t", "description": "d", "state": {}}]}
+        self.assertIs(encode_result(result, STEPS), result)
+        self.assertEqual(decode_columnar(encode_result(result, COLUMNAR)["steps"]), result["steps"])
+        self.assertEqual(encode_result({"steps": None}, COLUMNAR), {"steps": None})
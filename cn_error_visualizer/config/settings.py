@@ -56,6 +56,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so the render phase it measures contains nothing but rendering
+    'apps.error_detection.middleware.PhaseTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -125,6 +127,128 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# DRF: JSON through the error_detection fast backend (orjson when installed)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.error_detection.api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.error_detection.api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Error detection API
+# Paged traces: steps between checkpoints, lifetime of a stored run (seconds),
+# the largest step window one request may fetch, and the Django cache alias
+# holding the runs. With several worker processes the alias must name a
+# shared backend (Redis, Memcached, database): the default LocMemCache is
+# private to each process.
+ERROR_DETECTION_CHECKPOINT_INTERVAL = 256
+ERROR_DETECTION_RUN_TTL = 60 * 60
+ERROR_DETECTION_MAX_STEP_WINDOW = 5000
+ERROR_DETECTION_RUN_CACHE = 'default'
+
+# Batch endpoint: process pool size (None = one per CPU), largest accepted
+# batch, and the batch size below which items run inline.
+ERROR_DETECTION_BATCH_WORKERS = None
+ERROR_DETECTION_BATCH_MAX_ITEMS = 10000
+ERROR_DETECTION_BATCH_PARALLEL_MIN = 8
+
+# Memoized results: in-process LRU limits, plus an optional Django cache
+# alias (e.g. 'default' backed by Redis/Memcached) shared across workers.
+ERROR_DETECTION_RESULT_CACHE_ENTRIES = 512
+ERROR_DETECTION_RESULT_CACHE_BYTES = 64 * 1024 * 1024
+ERROR_DETECTION_RESULT_CACHE_ALIAS = None
+ERROR_DETECTION_RESULT_CACHE_TIMEOUT = 60 * 60
+
+# Table CRC engine: dividends of at least this many bits are split into chunks
+# of CRC_CHUNK_BITS, computed in the batch process pool and merged with a GF(2)
+# combine. Only used with more than one worker.
+ERROR_DETECTION_CRC_PARALLEL_MIN_BITS = 1 << 23
+ERROR_DETECTION_CRC_CHUNK_BITS = 1 << 20
+
+# BER simulator: trials per technique/channel point, points per sweep, and
+# trials per worker task (each task has its own seeded RNG stream).
+ERROR_DETECTION_SIMULATION_MAX_TRIALS = 10_000_000
+ERROR_DETECTION_SIMULATION_MAX_POINTS = 64
+ERROR_DETECTION_SIMULATION_BATCH = 50_000
+
+# Exhaustive low-weight error-pattern sweep: largest frame accepted.
+ERROR_DETECTION_SWEEP_MAX_BITS = 2048
+
+# Async detection endpoint (ASGI): thread pool size for ordinary inputs, input
+# size (bits) from which runs move to the process pool, and the default and
+# maximum per-request timeout in seconds.
+ERROR_DETECTION_ASYNC_THREADS = 4
+ERROR_DETECTION_ASYNC_PROCESS_MIN_BITS = 65536
+ERROR_DETECTION_ASYNC_TIMEOUT = 30
+
+# Request instrumentation: paths timed by PhaseTimingMiddleware and whether
+# the per-phase durations are sent back in a Server-Timing header.
+ERROR_DETECTION_METRICS_PREFIX = '/api/'
+ERROR_DETECTION_SERVER_TIMING = True
+
+# Incremental CRC/checksum sessions: seconds a session lives after its last
+# chunk, the Django cache alias that holds them and the seconds after which a
+# session lock left by a dead worker expires. With several worker processes
+# the alias must name a shared backend (Redis, Memcached, database): the
+# default LocMemCache is private to each process.
+ERROR_DETECTION_SESSION_TTL = 15 * 60
+ERROR_DETECTION_SESSION_CACHE = 'default'
+ERROR_DETECTION_SESSION_LOCK_TIMEOUT = 60
+
+# File checks (upload endpoint): bytes read per chunk.
+ERROR_DETECTION_FILE_CHUNK_BYTES = 1 << 20
+
+# JSON backend ('auto': orjson if installed, 'orjson' or 'json') and the
+# trace length from which detection responses are streamed in chunks.
+ERROR_DETECTION_JSON_BACKEND = 'auto'
+ERROR_DETECTION_STREAM_MIN_STEPS = 5000
+
+# technique='all': input size (bits) from which the compared techniques run
+# concurrently on the process pool.
+ERROR_DETECTION_COMPARE_PARALLEL_MIN_BITS = 65536
+
+# Cacheable GET detections: Cache-Control max-age (seconds) of responses and
+# of the redirects to their canonical URL (which change with the algorithm
+# version), body size from which responses are compressed, and the gzip level /
+# brotli quality (brotli is used when the optional package is installed).
+ERROR_DETECTION_GET_MAX_AGE = 365 * 24 * 60 * 60
+ERROR_DETECTION_GET_REDIRECT_MAX_AGE = 60 * 60
+ERROR_DETECTION_COMPRESS_MIN_BYTES = 1024
+ERROR_DETECTION_GZIP_LEVEL = 5
+ERROR_DETECTION_BROTLI_QUALITY = 4
+
+# Streamed steps (Server-Sent Events): steps per event, seconds before a
+# partial chunk is sent anyway, chunks buffered before the algorithm waits for
+# the client, seconds of silence before a keep-alive comment, and streams
+# producing at once per process (further requests get a 503).
+ERROR_DETECTION_SSE_CHUNK_STEPS = 256
+ERROR_DETECTION_SSE_FLUSH_INTERVAL = 0.05
+ERROR_DETECTION_SSE_MAX_CHUNKS = 8
+ERROR_DETECTION_SSE_HEARTBEAT = 15
+ERROR_DETECTION_SSE_MAX_STREAMS = 16
+
+# Persisted runs (DetectionRun): whether computed runs are stored (off by
+# default: every run, small ones included, is queued with its full trace), the
+# input size (bits) from which a cache miss is looked up in the store, the bulk
+# insert batch size, seconds a partial batch waits, runs and estimated result
+# bytes queued before new ones are dropped, payload size from which results
+# are compressed, largest stored payload (bytes, after compression), and the
+# largest history page.
+ERROR_DETECTION_RUN_STORE = False
+ERROR_DETECTION_RUN_STORE_LOOKUP_MIN_BITS = 65536
+ERROR_DETECTION_RUN_STORE_BATCH = 200
+ERROR_DETECTION_RUN_STORE_FLUSH_INTERVAL = 2.0
+ERROR_DETECTION_RUN_STORE_MAX_PENDING = 10000
+ERROR_DETECTION_RUN_STORE_MAX_PENDING_BYTES = 64 * 1024 * 1024
+ERROR_DETECTION_RUN_STORE_COMPRESS_MIN_BYTES = 1024
+ERROR_DETECTION_RUN_STORE_MAX_PAYLOAD_BYTES = 16 * 1024 * 1024
+ERROR_DETECTION_RUN_HISTORY_MAX_LIMIT = 200
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 